@@ -2,14 +2,17 @@
 FILE: app.py
 PURPOSE: Pagrindinis Streamlit aplikacijos taškas.
 RELATIONSHIPS:
-  - Inicijuoja src.library.Library
+  - Inicijuoja src.library.Library (vieną visam procesui, bendrą visoms sesijoms)
   - Nukreipia į src.web.auth, admin_ui arba reader_ui
 """
 
 import streamlit as st
 from src.library import Library
+from src.data_manager import setup_logging
 from src.web import auth, admin_ui, reader_ui
 
+setup_logging()
+
 # --- KONFIGŪRACIJA ---
 st.set_page_config(
     page_title="JK Biblioteka",
@@ -17,9 +20,18 @@ st.set_page_config(
     layout="wide"
 )
 
+# --- BENDRA BIBLIOTEKA ---
+@st.cache_resource
+def get_library():
+    """
+    Viena Library visam procesui: duomenys įkeliami vieną kartą, o ne kiekvienai sesijai,
+    ir visos sesijos mato tuos pačius pakeitimus. Gijų saugumą užtikrina Library.lock.
+    """
+    return Library()
+
 # --- SESIJOS INICIJAVIMAS ---
 if 'library' not in st.session_state:
-    st.session_state.library = Library()
+    st.session_state.library = get_library()
 
 if 'user' not in st.session_state:
     st.session_state.user = None
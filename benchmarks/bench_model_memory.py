@@ -0,0 +1,100 @@
+"""
+FILE: benchmarks/bench_model_memory.py
+PURPOSE: Matuoja, kiek atminties užima viena knyga ir viena paskola (baitai/objektui).
+RELATIONSHIPS:
+  - Lygina src/models.py (Book su slots, Loan, BookTable) su ankstesniu modeliu
+    (paprastas @dataclass su __dict__ ir paskola-žodynas), kuris atkartotas šiame faile.
+CONTEXT:
+  - Paleidimas: python -m benchmarks.bench_model_memory [knygų_kiekis]  (numatyta 1 000 000)
+  - Įrašai generuojami taip, kaip juos pateikia json.load: kiekvienas tekstas - naujas
+    objektas (todėl matosi, ką sutaupo autorių/žanrų internavimas).
+  - Matuojama tracemalloc: visa atmintis, likusi po sąrašo sukūrimo (objektai + tekstai).
+"""
+
+import gc
+import random
+import sys
+import tracemalloc
+import uuid
+from dataclasses import dataclass, field
+
+from src.models import Book, BookTable, Loan
+
+@dataclass
+class LegacyBook:
+    """Knygos modelis iki slots/internavimo (toks, koks buvo src/models.py)."""
+    title: str
+    author: str
+    year: int
+    genre: str
+    total_copies: int = 1
+    available_copies: int = 1
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+
+GENRES = ["Romanas", "Poezija", "Fantastika", "Detektyvas", "Istorija", "Vaikams"]
+
+def book_records(count, seed=42):
+    """Generatorius: knygų žodynai su "šviežiais" tekstais (kaip po json.load)."""
+    rnd = random.Random(seed)
+    authors = count // 20 + 1
+    for i in range(count):
+        yield {
+            "id": f"{i:08d}-book",
+            "title": f"Knyga Nr. {i}",
+            "author": "Autorius " + str(rnd.randrange(authors)),
+            "year": rnd.randint(1800, 2025),
+            "genre": "".join(rnd.choice(GENRES)), # join -> naujas teksto objektas
+            "total_copies": 3,
+            "available_copies": rnd.randint(0, 3),
+        }
+
+def loan_records(count, seed=7):
+    rnd = random.Random(seed)
+    for i in range(count):
+        yield {
+            "book_id": f"{rnd.randrange(count):08d}-book",
+            "title": "Knyga Nr. " + str(i % 1000), # Populiarios knygos kartojasi
+            "due_date": f"2026-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+        }
+
+def measure(build):
+    """Grąžina (objektas, baitai), kiek atminties liko po build() iškvietimo."""
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    result = build()
+    gc.collect()
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, end - start
+
+def bench(count):
+    loans = max(count // 10, 1)
+    cases = [
+        ("Book (senas @dataclass)", count,
+         lambda: [LegacyBook(**r) for r in book_records(count)]),
+        ("Book (slots + intern)", count,
+         lambda: [Book(**r) for r in book_records(count)]),
+        ("BookTable (stulpeliai)", count,
+         lambda: BookTable.from_books(Book(**r) for r in book_records(count))),
+        ("paskola (dict)", loans,
+         lambda: [dict(r) for r in loan_records(loans)]),
+        ("Loan (slots + ordinal)", loans,
+         lambda: [Loan.from_dict(r) for r in loan_records(loans)]),
+    ]
+    rows = []
+    for name, n, build in cases:
+        result, size = measure(build)
+        rows.append((name, n, size))
+        del result
+    return rows
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"Knygų: {count}, paskolų: {max(count // 10, 1)}")
+    print(f"{'Modelis':<26}{'Viso, MB':>10}{'B/objektui':>12}")
+    for name, n, size in bench(count):
+        print(f"{name:<26}{size / 1e6:>10.1f}{size / n:>12.0f}")
+
+if __name__ == "__main__":
+    main()
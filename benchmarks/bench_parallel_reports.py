@@ -0,0 +1,48 @@
+"""
+FILE: benchmarks/bench_parallel_reports.py
+PURPOSE: Matuoja paskolų istorijos ataskaitos (populiariausios knygos) trukmę su 1, 2, 4, 8 procesais.
+RELATIONSHIPS:
+  - Naudoja src/services/parallel_reports.py (scan_history) ir LoanJournal įvykių formatą.
+CONTEXT:
+  - Paleidimas: python -m benchmarks.bench_parallel_reports [įvykių_kiekis]  (numatyta 2 000 000)
+  - Sintetinė istorija sugeneruojama laikiname aplanke (apie 130 B vienam įvykiui).
+  - Pagreitis ribojamas fizinių branduolių: daugiau procesų nei os.cpu_count() nepadeda.
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from src.services.parallel_reports import scan_history
+
+def write_history(path, count, seed=3):
+    rnd = random.Random(seed)
+    ops = ["borrow", "borrow", "return", "renew"]
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            book = rnd.randrange(50_000)
+            event = {"ts": "2025-01-01T12:00:00", "op": ops[i % 4], "user_id": f"RD{i % 9999:04d}",
+                     "book_id": f"{book:08d}-book", "title": f"Knyga Nr. {book}", "due_date": "2025-01-15"}
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "loan_history.jsonl")
+        write_history(path, count)
+        size = os.path.getsize(path)
+        print(f"Įvykių: {count}, failas: {size / 1e6:.0f} MB, branduolių (os.cpu_count): {os.cpu_count()}")
+        print(f"{'Procesai':<10}{'Laikas, s':>10}{'Pagreitis':>11}")
+        baseline = None
+        for workers in (1, 2, 4, 8):
+            start = time.perf_counter()
+            scan_history([path], workers=workers)
+            seconds = time.perf_counter() - start
+            baseline = baseline or seconds
+            print(f"{workers:<10}{seconds:>10.2f}{baseline / seconds:>10.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+FILE: benchmarks/bench_sqlite_concurrency.py
+PURPOSE: Lygiagretaus skaitymo/rašymo SQLite matavimas: naujas ryšys kiekvienai operacijai
+         (senasis get_connection() be WAL) prieš gijų ryšių telkinį su WAL (database.connection()).
+RELATIONSHIPS:
+  - Naudoja src/database.py (initialize_db, connection, close_all, bulk_upsert).
+  - Duomenys - benchmarks/synthetic.py (generate), DB - laikiname aplanke.
+CONTEXT:
+  - Paleidimas: python -m benchmarks.bench_sqlite_concurrency [knygų_kiekis] [skaitytojų_gijų] [sekundės]
+  - Skaitytojų gijos kartoja tipines užklausas (paieška pagal autorių, skaitytojo paskolos,
+    vėluojančios paskolos), viena rašytojo gija keičia knygų kopijų kiekius po 20 eilučių.
+  - "fresh" režimas atkartoja ankstesnį elgesį: sqlite3.connect + journal_mode=DELETE kiekvienai
+    operacijai, todėl rašymo metu skaitytojai laukia užrakto (busy_timeout).
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.synthetic import generate
+from src import database
+
+READ_QUERIES = [
+    ("SELECT id, title FROM books WHERE author = ?", 'author'),
+    ("SELECT book_id, due_date FROM loans WHERE user_id = ?", 'user'),
+    ("SELECT COUNT(*) FROM loans WHERE due_date < ?", 'date'),
+]
+
+SQLITE_TIMEOUT_S = 5.0 # Kaip config.SQLITE_BUSY_TIMEOUT_MS
+
+def fill_db(db_file, n_books, seed=0):
+    """Sukuria DB su sintetinėmis knygomis, vartotojais ir paskolomis. Grąžina užklausų parametrus."""
+    books, users = generate(n_books, max(10, n_books // 10), n_books // 5, seed=seed)
+    database.initialize_db(db_file)
+    with database.connection(db_file) as conn:
+        database.bulk_upsert(conn, "books", ('id', 'title', 'author', 'year', 'genre',
+                                             'total_copies', 'available_copies'),
+                             [(b.id, b.title, b.author, b.year, b.genre, b.total_copies,
+                               b.available_copies) for b in books])
+        database.bulk_upsert(conn, "users", ('id', 'username', 'role', 'password'),
+                             [(u.id, u.username, u.role, getattr(u, 'password', None)) for u in users])
+        database.bulk_insert(conn, "loans", ('user_id', 'book_id', 'due_date'),
+                             [(u.id, loan.book_id, loan.due_date)
+                              for u in users for loan in getattr(u, 'active_loans', [])])
+    database.close_all(db_file)
+    return {
+        'author': sorted({b.author for b in books}),
+        'user': [u.id for u in users if u.role == 'reader'],
+        'date': ["2024-01-01", time.strftime("%Y-%m-%d")],
+        'book': [b.id for b in books],
+    }
+
+def _fresh_connection(db_file):
+    """Ankstesnis elgesys: naujas ryšys, numatytasis (rollback) žurnalas."""
+    conn = sqlite3.connect(db_file, timeout=SQLITE_TIMEOUT_S)
+    conn.execute("PRAGMA journal_mode=DELETE")
+    return conn
+
+def run_mode(mode, db_file, params, readers, seconds, seed=0):
+    """Grąžina (skaitymų/s, rašymų/s, klaidų kiekis) vienam režimui ('fresh' arba 'pool')."""
+    if mode == 'pool':
+        with database.connection(db_file) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+    else:
+        database.close_all(db_file)
+        conn = sqlite3.connect(db_file)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.close()
+
+    stop = threading.Event()
+    counts = {'read': 0, 'write': 0, 'errors': 0}
+    counts_lock = threading.Lock()
+
+    def reader(index):
+        rnd = random.Random(seed + index)
+        done = errors = 0
+        while not stop.is_set():
+            sql, kind = rnd.choice(READ_QUERIES)
+            args = (rnd.choice(params[kind]),)
+            try:
+                if mode == 'pool':
+                    database.connection(db_file).execute(sql, args).fetchall()
+                else:
+                    conn = _fresh_connection(db_file)
+                    try:
+                        conn.execute(sql, args).fetchall()
+                    finally:
+                        conn.close()
+                done += 1
+            except sqlite3.OperationalError:
+                errors += 1 # database is locked
+        with counts_lock:
+            counts['read'] += done
+            counts['errors'] += errors
+
+    def writer():
+        rnd = random.Random(seed - 1)
+        done = errors = 0
+        sql = "UPDATE books SET available_copies = ? WHERE id = ?"
+        while not stop.is_set():
+            rows = [(rnd.randint(0, 3), rnd.choice(params['book'])) for _ in range(20)]
+            try:
+                if mode == 'pool':
+                    with database.connection(db_file) as conn:
+                        conn.executemany(sql, rows)
+                else:
+                    conn = _fresh_connection(db_file)
+                    try:
+                        with conn:
+                            conn.executemany(sql, rows)
+                    finally:
+                        conn.close()
+                done += 1
+            except sqlite3.OperationalError:
+                errors += 1
+        with counts_lock:
+            counts['write'] += done
+            counts['errors'] += errors
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    database.close_all(db_file)
+    return counts['read'] / elapsed, counts['write'] / elapsed, counts['errors']
+
+def main():
+    n_books = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 3.0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = os.path.join(tmp_dir, "bench.db")
+        params = fill_db(db_file, n_books)
+        print(f"Knygų: {n_books}, skaitytojų gijų: {readers}, trukmė: {seconds:g} s")
+        print(f"{'Režimas':<10}{'Skaitymai/s':>13}{'Rašymai/s':>11}{'Klaidos':>9}")
+        for mode in ('fresh', 'pool'):
+            reads, writes, errors = run_mode(mode, db_file, params, readers, seconds)
+            print(f"{mode:<10}{reads:>13.0f}{writes:>11.0f}{errors:>9}")
+
+if __name__ == "__main__":
+    main()
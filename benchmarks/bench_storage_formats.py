@@ -0,0 +1,58 @@
+"""
+FILE: benchmarks/bench_storage_formats.py
+PURPOSE: Matuoja knygų failo įrašymo/nuskaitymo laiką kiekvienu saugojimo formatu.
+RELATIONSHIPS:
+  - Naudoja src/data_manager.py (CODECS, save_data, load_data) ir src/models.py (Book).
+CONTEXT:
+  - Paleidimas: python -m benchmarks.bench_storage_formats [knygų_kiekis]
+  - "save" = Book -> dict + save_data; "load" = load_data + Book(**item), kaip BookRepository.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from src import data_manager
+from src.models import Book
+
+def make_books(count, seed=42):
+    """Deterministinis sintetinis katalogas."""
+    rnd = random.Random(seed)
+    genres = ["Romanas", "Poezija", "Fantastika", "Detektyvas", "Istorija", "Vaikams"]
+    return [
+        Book(f"Knyga Nr. {i} – Žalgirio šešėlis", f"Autorius {rnd.randrange(count // 10 + 1)}",
+             rnd.randint(1800, 2025), rnd.choice(genres),
+             total_copies=3, available_copies=rnd.randint(0, 3), id=f"{i:08d}-book")
+        for i in range(count)
+    ]
+
+def bench(count):
+    books = make_books(count)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for fmt in data_manager.CODECS:
+            path = os.path.join(tmp_dir, data_manager.get_store_filename("books.json", fmt))
+
+            start = time.perf_counter()
+            data_manager.save_data(path, [b.to_dict() for b in books], backup=False, fmt=fmt)
+            save_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            loaded = [Book(**item) for item in data_manager.load_data(path, fmt=fmt)]
+            load_s = time.perf_counter() - start
+
+            assert len(loaded) == count
+            rows.append((fmt, os.path.getsize(path), save_s, load_s))
+    return rows
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"Knygų: {count}")
+    print(f"{'Formatas':<14}{'Dydis, MB':>11}{'Save, ms':>11}{'Load, ms':>11}")
+    for fmt, size, save_s, load_s in bench(count):
+        print(f"{fmt:<14}{size / 1e6:>11.1f}{save_s * 1000:>11.0f}{load_s * 1000:>11.0f}")
+
+if __name__ == "__main__":
+    main()
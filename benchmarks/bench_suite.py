@@ -0,0 +1,342 @@
+"""
+FILE: benchmarks/bench_suite.py
+PURPOSE: Viso kelio (end-to-end) matavimai per Library: įkėlimas, įrašymas, paieška,
+         skolinimas/grąžinimas, statistika ir admin lentelių (DataFrame) kūrimas.
+RELATIONSHIPS:
+  - Duomenys - benchmarks/synthetic.py (deterministiniai, laikiname aplanke).
+  - Lentelės kuriamos taip pat, kaip admin_ui (src/web/frame_cache: knygų puslapis - page_frame,
+    vartotojai - VersionedFrame).
+CONTEXT:
+  - Paleidimas:
+      python -m benchmarks.bench_suite                      (1k ir 100k)
+      python -m benchmarks.bench_suite --scales 1k,100k,1m --repeat 3
+  - Kiekvienas veiksmas kartojamas --repeat kartų; saugoma mediana, min ir max (ms).
+  - Rezultatai: lentelė ekrane ir bench_output.txt, JSON - bench_results.json
+    (su --save-baseline dar ir benchmarks/baseline.json - palyginimo pagrindas).
+  - Palyginimas (regresijų vartai):
+      python -m benchmarks.bench_suite --compare [baseline.json] [--tolerance 0.3]
+    Paleidžia tuos pačius mastus (ir su ta pačia saugykla, --repeat), kaip pagrinde, ir palygina
+    medianas. Jei kuris nors veiksmas lėtesnis daugiau nei tolerancija (ir daugiau nei
+    --min-delta-ms), išspausdinama lentelė ir grąžinamas kodas 1.
+  - Pagrindas priklauso nuo mašinos: meta saugo saugyklą, procesorių kiekį, architektūrą,
+    OS ir Python versiją. Jei jie nesutampa su dabartine aplinka, palyginimas atsisakomas
+    (kodas 2) - reikia perrašyti pagrindą (--save-baseline) arba priverstinai lyginti su
+    --force (tada tik įspėjama).
+  - --backend memory: Library be disko (src/repositories/memory_repository.py) - matuojama
+    tik logika (paieška, skolinimas, statistika), o failų įkėlimas/įrašymas praleidžiamas.
+  - Skolinimas/grąžinimas įrašo abu failus kiekvienai operacijai (kaip programoje),
+    todėl 1m mastu tai trunka sekundes - tam ir matuojama.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import generate, free_readers, search_words, data_dir
+from src.config import WEB_PAGE_SIZE
+from src.library import Library
+from src.repositories.book_repository import BookRepository
+from src.repositories.user_repository import UserRepository
+
+# Mastas: (knygos, skaitytojai, aktyvios paskolos)
+SCALES = {
+    "1k": (1_000, 200, 300),
+    "100k": (100_000, 20_000, 30_000),
+    "1m": (1_000_000, 200_000, 300_000),
+}
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Palyginimo numatytieji: leidžiama +30% (dvigubas sulėtėjimas tikrai pagaunamas),
+# o mažesni nei 0.1 ms skirtumai laikomi triukšmu
+DEFAULT_TOLERANCE = 0.3
+DEFAULT_MIN_DELTA_MS = 0.1
+
+# Meta laukai, kurie turi sutapti, kad palyginimas būtų prasmingas
+COMPARED_META = ("backend", "cpu_count", "machine", "system", "python")
+
+def _book_row(book):
+    item = book.to_dict()
+    item["Šalinti"] = False
+    return item
+
+def _user_row(user):
+    return {"id": user.id, "Vardas": user.username,
+            "Rolė": "Skaitytojas" if user.role == 'reader' else "Admin", "Kortelė": user.id}
+
+try:
+    # Tos pačios eilučių funkcijos, kaip admin lentelėse (jei streamlit įdiegtas)
+    from src.web.admin_ui import _book_row, _user_row
+except ImportError:
+    pass
+
+def measure(func, repeat, setup=None):
+    """Paleidžia func() 'repeat' kartų (prieš kiekvieną - setup(), jis nematuojamas)."""
+    times = []
+    for i in range(repeat):
+        if setup is not None:
+            setup(i)
+        start = time.perf_counter()
+        func(i)
+        times.append(time.perf_counter() - start)
+    return {
+        "median_ms": round(statistics.median(times) * 1000, 4),
+        "min_ms": round(min(times) * 1000, 4),
+        "max_ms": round(max(times) * 1000, 4),
+        "runs": repeat,
+    }
+
+def run_scale(scale, repeat=5, seed=0, log=print, backend="json"):
+    """Vieno masto matavimai: {veiksmas: {median_ms, min_ms, max_ms, runs}}."""
+    n_books, n_readers, n_loans = SCALES[scale]
+    start = time.perf_counter()
+    books, users = generate(n_books, n_readers, n_loans, seed=seed)
+    log(f"[{scale}] sugeneruota: {len(books)} knygų, {len(users)} vartotojų "
+        f"per {time.perf_counter() - start:.1f} s")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir, data_dir(tmp_dir):
+        if backend == "memory":
+            library = Library(backend="memory", books=books, users=users)
+        else:
+            library = Library(backend="json")
+            library.book_repository.books = books
+            library.user_repository.users = users
+            library.book_repository.save()
+            library.user_repository.save()
+
+        def bench(name, func, setup=None, runs=repeat):
+            results[name] = measure(func, runs, setup)
+            log(f"[{scale}] {name:<38} {results[name]['median_ms']:>12.3f} ms")
+
+        # --- Repozitorijos (failai) ---
+        if backend == "json":
+            bench("BookRepository._load", lambda i: BookRepository().ensure_loaded())
+            bench("UserRepository._load", lambda i: UserRepository().ensure_loaded())
+            bench("BookRepository.save", lambda i: library.book_repository.save())
+            bench("UserRepository.save", lambda i: library.user_repository.save())
+
+        # --- Paieška (kiekvienas paleidimas - kita užklausa) ---
+        queries = search_words(max(repeat, 20), seed=seed)
+        bench("BookRepository.search", lambda i: library.book_repository.search(queries[i]),
+              runs=len(queries))
+
+        # --- Skolinimas ir grąžinimas (laisvi skaitytojai, populiarios knygos) ---
+        readers = free_readers(library.user_repository.get_all())[:repeat]
+        titles = sorted(library.book_repository.get_all(), key=lambda b: -b.available_copies)[:repeat]
+        pairs = [(reader.id, book.id) for reader, book in zip(readers, titles)]
+        if pairs:
+            def borrow(i):
+                ok, message = library.borrow_book(*pairs[i])
+                assert ok, message
+            def return_(i):
+                ok, message = library.return_book(*pairs[i])
+                assert ok, message
+            bench("LoanService.borrow_book", borrow, runs=len(pairs))
+            bench("LoanService.return_book", return_, runs=len(pairs))
+
+        # --- Statistika (rebuild - suvestinių skaičiavimas iš naujo, kaip pirmą kartą) ---
+        bench("StatsService.rebuild", lambda i: library.stats_service.rebuild())
+        bench("StatsService.get_advanced_statistics",
+              lambda i: library.get_advanced_statistics())
+        bench("StatsService.get_all_overdue_report",
+              lambda i: library.stats_service.get_all_overdue_report())
+
+        # --- Admin lentelės (kaip pirmą kartą atidarius: knygų puslapis, visi vartotojai) ---
+        try:
+            from src.web.frame_cache import VersionedFrame, page_frame
+            import pandas # noqa: F401 - tik patikrinimui, ar įdiegta
+        except ImportError:
+            log(f"[{scale}] pandas neįdiegtas - lentelių matavimai praleisti")
+        else:
+            bench("admin_ui: knygų puslapio DataFrame",
+                  lambda i: page_frame(library.book_repository.page(i * WEB_PAGE_SIZE, WEB_PAGE_SIZE).items,
+                                       _book_row))
+            bench("admin_ui: vartotojų DataFrame",
+                  lambda i: VersionedFrame(library.user_repository, _user_row).get())
+    return results
+
+def format_results(all_results):
+    """Lentelė tekstu: viena eilutė - vienas veiksmas, stulpeliai - mastai."""
+    scales = list(all_results)
+    names = []
+    for results in all_results.values():
+        names.extend(name for name in results if name not in names)
+    width = max(len(name) for name in names) if names else 20
+    lines = [f"{'Veiksmas (mediana, ms)':<{width}}" + "".join(f"{s:>14}" for s in scales)]
+    lines.append("-" * len(lines[0]))
+    for name in names:
+        cells = []
+        for scale in scales:
+            value = all_results[scale].get(name)
+            cells.append(f"{value['median_ms']:>14.3f}" if value else f"{'-':>14}")
+        lines.append(f"{name:<{width}}" + "".join(cells))
+    return lines
+
+def run_suite(scales, repeat=5, seed=0, log=print, backend="json"):
+    """Visi mastai; grąžina JSON struktūrą (meta + rezultatai)."""
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "system": platform.system(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "repeat": repeat,
+            "seed": seed,
+            "backend": backend,
+        },
+        "results": {scale: run_scale(scale, repeat, seed, log, backend) for scale in scales},
+    }
+
+def write_outputs(report, output, json_path):
+    lines = format_results(report["results"])
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write(f"# {report['meta']['created']}, Python {report['meta']['python']}, "
+                f"{report['meta']['platform']}, CPU: {report['meta']['cpu_count']}, "
+                f"saugykla: {report['meta']['backend']}\n")
+        f.write("\n".join(lines) + "\n")
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return lines
+
+def environment_mismatches(baseline_meta, current_meta):
+    """
+    Aplinkos skirtumai, dėl kurių matavimai nepalyginami: [(laukas, pagrinde, dabar)].
+    Python lyginama tik major.minor (pataisų versijos greičio nekeičia).
+    """
+    mismatches = []
+    for key in COMPARED_META:
+        before, now = baseline_meta.get(key), current_meta.get(key)
+        if key == "python" and before and now:
+            before, now = before.rsplit(".", 1)[0], now.rsplit(".", 1)[0]
+        if before != now:
+            mismatches.append((key, baseline_meta.get(key), current_meta.get(key)))
+    return mismatches
+
+def compare_results(baseline, current, tolerance=DEFAULT_TOLERANCE,
+                    min_delta_ms=DEFAULT_MIN_DELTA_MS):
+    """
+    Palygina medianas {mastas: {veiksmas: {...}}}. Grąžina (lentelės eilutės, regresijų kiekis).
+    Regresija: dabar > pagrindas * (1 + tolerance) IR skirtumas > min_delta_ms.
+    """
+    rows = []
+    regressions = 0
+    for scale, base_ops in baseline.items():
+        current_ops = current.get(scale, {})
+        for name, base in base_ops.items():
+            now = current_ops.get(name)
+            if now is None:
+                rows.append((scale, name, base["median_ms"], None, None, "NĖRA"))
+                continue
+            before, after = base["median_ms"], now["median_ms"]
+            change = (after - before) / before if before else 0.0
+            if after > before * (1 + tolerance) and after - before > min_delta_ms:
+                status = "REGRESIJA"
+                regressions += 1
+            elif before > after * (1 + tolerance) and before - after > min_delta_ms:
+                status = "greičiau"
+            else:
+                status = "ok"
+            rows.append((scale, name, before, after, change, status))
+
+    width = max([len(row[1]) for row in rows] + [8])
+    lines = [f"{'Mastas':<7}{'Veiksmas':<{width}}{'Pagrindas':>12}{'Dabar':>12}{'Pokytis':>10}  Būsena"]
+    lines.append("-" * (len(lines[0]) + 4))
+    for scale, name, before, after, change, status in rows:
+        after_text = f"{after:>12.3f}" if after is not None else f"{'-':>12}"
+        change_text = f"{change:>+10.0%}" if change is not None else f"{'-':>10}"
+        lines.append(f"{scale:<7}{name:<{width}}{before:>12.3f}{after_text}{change_text}  {status}")
+    return lines, regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bibliotekos našumo matavimai su sintetiniais duomenimis.")
+    parser.add_argument("--scales", default=None,
+                        help=f"Mastai per kablelį (galimi: {', '.join(SCALES)}; numatyta 1k,100k "
+                             f"arba, palyginant, pagrindo mastai)")
+    parser.add_argument("--repeat", type=int, default=None,
+                        help="Kiek kartų kartoti kiekvieną veiksmą (numatyta 5 arba, palyginant, "
+                             "kaip pagrinde)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", choices=("json", "memory"), default=None,
+                        help="Saugykla (numatyta json arba, palyginant, pagrindo saugykla)")
+    parser.add_argument("--output", default="bench_output.txt")
+    parser.add_argument("--json", dest="json_path", default="bench_results.json")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help=f"Rezultatus įrašyti ir kaip palyginimo pagrindą ({BASELINE_PATH})")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_PATH, default=None, metavar="BASELINE",
+                        help="Palyginti su pagrindu; regresijos atveju grąžinamas kodas 1")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Leidžiamas sulėtėjimas (0.3 = +30%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help="Mažesni skirtumai (ms) laikomi triukšmu")
+    parser.add_argument("--force", action="store_true",
+                        help="Lyginti net jei pagrindas įrašytas kitoje aplinkoje (tik įspėti)")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare, encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            parser.error(f"Nepavyko nuskaityti pagrindo {args.compare}: {e}")
+
+    if args.scales:
+        scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    elif baseline is not None:
+        scales = list(baseline["results"])
+    else:
+        scales = ["1k", "100k"]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        parser.error(f"Nežinomi mastai: {', '.join(unknown)}")
+
+    baseline_meta = (baseline or {}).get("meta", {})
+    backend = args.backend or baseline_meta.get("backend", "json")
+    repeat = args.repeat or baseline_meta.get("repeat", 5)
+    if baseline is not None:
+        # Aplinka tikrinama prieš matavimus - 1m mastas trunka ilgai
+        current_meta = {"backend": backend, "cpu_count": os.cpu_count(),
+                        "machine": platform.machine(), "system": platform.system(),
+                        "python": platform.python_version()}
+        mismatches = environment_mismatches(baseline_meta, current_meta)
+        if mismatches:
+            print(f"{'ĮSPĖJIMAS' if args.force else 'KLAIDA'}: pagrindas {args.compare} "
+                  f"įrašytas kitoje aplinkoje:")
+            for key, before, now in mismatches:
+                print(f"  {key}: pagrinde {before!r}, dabar {now!r}")
+            if not args.force:
+                print("Perrašykite pagrindą (--save-baseline) arba lyginkite su --force.")
+                return 2
+
+    report = run_suite(scales, repeat, args.seed, backend=backend)
+    for line in write_outputs(report, args.output, args.json_path):
+        print(line)
+    if args.save_baseline:
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Palyginimo pagrindas įrašytas: {BASELINE_PATH}")
+
+    if baseline is not None:
+        base_results = {scale: ops for scale, ops in baseline["results"].items() if scale in scales}
+        lines, regressions = compare_results(base_results, report["results"],
+                                             args.tolerance, args.min_delta_ms)
+        print()
+        print(f"Palyginimas su {args.compare} (tolerancija +{args.tolerance:.0%}):")
+        for line in lines:
+            print(line)
+        if regressions:
+            print(f"\nREGRESIJŲ: {regressions}")
+            return 1
+        print("\nRegresijų nėra.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+FILE: benchmarks/synthetic.py
+PURPOSE: Deterministiniai sintetiniai duomenys: N knygų, M skaitytojų, K aktyvių paskolų.
+RELATIONSHIPS:
+  - Naudoja src/models.py (Book, Reader, Librarian, Loan).
+  - Naudojama benchmarks/bench_suite.py (ir tinka kitiems matavimams).
+CONTEXT:
+  - Tas pats seed -> tie patys duomenys (ID, pavadinimai, terminai), todėl skirtingų
+    versijų matavimai palyginami.
+  - Pavadinimai ir autoriai lietuviški (su diakritikais) - paieškos normalizavimas
+    dirba tiek pat, kiek su tikrais duomenimis.
+  - Populiarumas iškreiptas (Zipf): nedaug knygų turi daug paskolų, kaip tikroje bibliotekoje.
+  - Maždaug trečdalis paskolų vėluoja; dalis skaitytojų paskolų neturi (jie gali skolintis).
+  - data_dir() laikinai nukreipia data/ failus į kitą aplanką (tikri duomenys neliečiami).
+"""
+
+import os
+import random
+from contextlib import contextmanager
+from datetime import date, timedelta
+from itertools import accumulate
+
+from src import data_manager
+from src.config import MAX_BOOKS_PER_USER
+from src.models import Book, Librarian, Loan, Reader
+
+ADJECTIVES = ["Tylūs", "Žalieji", "Šaltas", "Pamiršti", "Auksinė", "Ilgoji", "Vėlyvas",
+              "Mėlynasis", "Senoji", "Nematomas", "Paskutinė", "Gintarinis", "Rūstus",
+              "Baltoji", "Lietuviškas", "Šviesūs", "Juodasis", "Sidabrinė", "Ramus", "Užburta"]
+NOUNS = ["miškas", "vėjas", "ąžuolas", "Nemunas", "žiema", "pilis", "laukas", "sodžius",
+         "kelias", "ežeras", "šaltinis", "dvaras", "kalnas", "vasara", "giria", "žvaigždė",
+         "upė", "sodas", "jūra", "naktis", "rytas", "varpas", "tiltas", "žemė"]
+SUFFIXES = ["", "", "", " ir kitos istorijos", " prie Baltijos", " ruduo", " sakmė",
+            " kronikos", " dienoraštis", " (II dalis)"]
+FIRST_NAMES = ["Jonas", "Ona", "Petras", "Marija", "Antanas", "Žydrūnė", "Kęstutis",
+               "Rūta", "Vytautas", "Aušra", "Gintaras", "Eglė", "Šarūnas", "Jūratė"]
+SURNAMES = ["Kazlauskas", "Petrauskienė", "Jankauskas", "Žukauskaitė", "Butkus",
+            "Paulauskienė", "Vasiliauskas", "Šimkus", "Balčiūnaitė", "Urbonas",
+            "Navickienė", "Mažeika", "Čepulis", "Grigaitė"]
+GENRES = ["Romanas", "Poezija", "Fantastika", "Detektyvas", "Istorija", "Vaikams",
+          "Biografija", "Mokslas", "Drama", "Apsakymai"]
+
+# Paskolų terminai: nuo prieš 60 dienų iki po 14 dienų (apie 1/3 vėluoja)
+DUE_FROM_DAYS, DUE_TO_DAYS = -60, 14
+
+def generate(n_books, n_readers, n_loans, seed=0, today=None, zipf=1.1):
+    """
+    Grąžina (knygos, vartotojai). vartotojai[0] - bibliotekininkas 'admin'.
+    Paskolos priskiriamos tik pirmiems ~60% skaitytojų, likusieji - be paskolų.
+    Jei laisvų kopijų ar skaitytojų limito neužtenka, paskolų sukuriama mažiau nei n_loans.
+    """
+    rnd = random.Random(seed)
+    today = today or date.today()
+
+    authors = [f"{rnd.choice(FIRST_NAMES)} {rnd.choice(SURNAMES)}"
+               for _ in range(max(1, n_books // 20))]
+    books = []
+    for i in range(n_books):
+        title = f"{rnd.choice(ADJECTIVES)} {rnd.choice(NOUNS)}{rnd.choice(SUFFIXES)}"
+        copies = rnd.randint(1, 5)
+        books.append(Book(title, rnd.choice(authors), rnd.randint(1850, 2025), rnd.choice(GENRES),
+                          total_copies=copies, available_copies=copies, id=f"{i:08d}-book"))
+
+    users = [Librarian("admin", "librarian", id="LIB0001", password="admin")]
+    readers = [Reader(f"skaitytojas{i}", "reader", id=f"RD{i:06d}") for i in range(n_readers)]
+    users.extend(readers)
+
+    # Zipf: knygos i svoris 1/(i+1)^zipf (populiariausios - sąrašo pradžioje)
+    borrowers = readers[:max(1, n_readers * 6 // 10)] if readers else []
+    if books and borrowers:
+        cum_weights = list(accumulate(1.0 / (i + 1) ** zipf for i in range(n_books)))
+        attempts = 0
+        created = 0
+        while created < n_loans and attempts < n_loans * 3:
+            attempts += 1
+            reader = rnd.choice(borrowers)
+            if len(reader.active_loans) >= MAX_BOOKS_PER_USER:
+                continue
+            book = rnd.choices(books, cum_weights=cum_weights)[0]
+            if book.available_copies == 0 or any(l.book_id == book.id for l in reader.active_loans):
+                continue
+            due = today + timedelta(days=rnd.randint(DUE_FROM_DAYS, DUE_TO_DAYS))
+            reader.active_loans.append(Loan(book.id, book.title, due.isoformat()))
+            book.available_copies -= 1
+            created += 1
+    return books, users
+
+def free_readers(users):
+    """Skaitytojai be paskolų (jiems galima skolinti - nėra vėlavimų ir limito)."""
+    return [u for u in users if u.role == 'reader' and not u.active_loans]
+
+def search_words(count, seed=0):
+    """Paieškos užklausos iš tų pačių žodynų (dalis - be diakritikų, kaip rašo vartotojai)."""
+    rnd = random.Random(seed)
+    plain = str.maketrans("ąčęėįšųūžĄČĘĖĮŠŲŪŽ", "aceeisuuzACEEISUUZ")
+    words = []
+    for _ in range(count):
+        word = rnd.choice(NOUNS + SURNAMES + ADJECTIVES)
+        words.append(word.translate(plain).lower() if rnd.random() < 0.5 else word)
+    return words
+
+@contextmanager
+def data_dir(path):
+    """Laikinai nukreipia repozitorijų duomenų failus į 'path' (data/ lieka nepaliestas)."""
+    from src import library
+    from src.repositories import book_repository, user_repository
+    modules = (data_manager, book_repository, user_repository, library)
+    originals = [module.get_data_file_path for module in modules]
+    redirect = lambda filename: os.path.join(path, filename)
+    for module in modules:
+        module.get_data_file_path = redirect
+    try:
+        yield path
+    finally:
+        for module, original in zip(modules, originals):
+            module.get_data_file_path = original
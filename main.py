@@ -1,12 +1,16 @@
-from secrets import choice
+import atexit
 import sys
 from src.library import Library
+from src.data_manager import setup_logging
+from src.config import PERF_DUMP_FILE
+from src import perf
 from src.ui.librarian import main_menu as librarian_ui
 from src.ui.reader import main_menu as reader_ui
 from src.ui.common import pause, clear_screen
 from src.ui.ascii_styler import draw_ascii_menu, print_header
 
-# Sukuriame bibliotekos egzempliorių (vieną kartą visai programai)
+# Sukuriame bibliotekos egzempliorių (vieną kartą visai programai).
+# Duomenų failai čia dar neskaitomi - tik pirmą kartą jų prireikus (config.LAZY_LOADING).
 library = Library()
 
 def bootstrap_system():
@@ -61,6 +65,7 @@ def main():
 
         elif choice == '3':
             clear_screen()
+            library.flush() # Įrašome atidėtus pakeitimus (write-behind režimui)
             print("Viso gero!")
             sys.exit()
         
@@ -68,6 +73,10 @@ def main():
             print("Neteisingas pasirinkimas.")
 
 if __name__ == "__main__":
+    setup_logging()
+    if PERF_DUMP_FILE:
+        # Našumo ataskaita programos pabaigoje (žr. src/perf.py)
+        atexit.register(perf.REGISTRY.dump_json, PERF_DUMP_FILE)
     try:
         main()
     except KeyboardInterrupt:
@@ -18,5 +18,63 @@ BOOKS_FILENAME = 'books.json'
 USERS_FILENAME = 'users.json'
 BACKUP_FILENAME = 'books_backup.json'
 
+# Slenkanti atsarginė kopija: prieš kiekvieną įrašymą sena failo versija
+# nukopijuojama į '<pavadinimas>_backup.json' (pvz., books_backup.json).
+# DĖMESIO: įjungus, books_backup.json (naudojamas restore_backup) bus perrašomas.
+ROLLING_BACKUP = False
+
+# Duomenų saugykla: "json" (data/*.json failai), "sqlite" (data/library.db)
+# arba "memory" (tik atmintyje, niekas neįrašoma - testams ir laikinoms sesijoms)
+STORAGE_BACKEND = "json"
+
+# SQLite nustatymai (src/database.py): journal_mode visada WAL.
+# synchronous: "NORMAL" (greita, saugu su WAL) arba "FULL" (fsync kiekvienai transakcijai).
+SQLITE_SYNCHRONOUS = "NORMAL"
+SQLITE_CACHE_KB = 16 * 1024              # Puslapių podėlis vienam ryšiui
+SQLITE_MMAP_BYTES = 128 * 1024 * 1024    # Skaitymas per atminties atvaizdavimą (mmap)
+SQLITE_BUSY_TIMEOUT_MS = 5000            # Kiek laukti, kai DB užrakinta kito rašytojo
+
+# Failų formatas "json" saugyklai (žr. data_manager.CODECS):
+# "json" (gražus, indent=4), "json-compact", "jsonl" arba "marshal" (dvejetainis).
+# Pakeitus formatą, esamus failus konvertuokite: python -m src.tools.convert_store --to <formatas>
+STORAGE_FORMAT = "json"
+
+# Tingus užkrovimas: repozitorijos duomenų failus skaito ne startuojant, o pirmą kartą
+# jų prireikus (greitesnis programos paleidimas). False - skaitoma iškart konstruktoriuje.
+LAZY_LOADING = True
+
+# Atidėtas įrašymas (write-behind): po kiek sekundžių įrašyti pakeitimus.
+# 0 - rašoma iškart po kiekvienos operacijos (numatytasis elgesys).
+WRITE_BEHIND_SECONDS = 0
+
+# Paskolų žurnalas: skolinimai/grąžinimai rašomi kaip viena eilutė į loan_journal.jsonl,
+# užuot perrašius visą users.json. Po LOAN_JOURNAL_COMPACT_EVERY įvykių users.json
+# įrašomas pilnai, o žurnalas perkeliamas į loan_history.jsonl (istorija statistikai).
+LOAN_JOURNAL_ENABLED = False
+LOAN_JOURNAL_FILENAME = 'loan_journal.jsonl'
+LOAN_HISTORY_FILENAME = 'loan_history.jsonl'
+LOAN_JOURNAL_COMPACT_EVERY = 500
+LOAN_JOURNAL_FSYNC = False # True - kiekvienas įvykis iškart fiziškai diske (lėčiau)
+
+# Lygiagrečios ataskaitos (paskolų istorijos skaičiavimas keliuose procesuose).
+# 0 - išjungta (viename procese). Pvz., 4 - iki 4 procesų, bet tik jei istorijos failai
+# didesni nei REPORT_PARALLEL_MIN_BYTES (mažiems failams procesų paleidimas neatsiperka).
+REPORT_WORKERS = 0
+REPORT_PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+
+# Puslapiavimas: kiek knygų rodoma viename puslapyje (terminale ir naršyklėje).
+# Sąrašai gaunami per BookRepository.page(), todėl rodomas tik matomas puslapis.
+CLI_PAGE_SIZE = 20
+WEB_PAGE_SIZE = 50
+
+# Našumo matavimai (src/perf.py): kvietimų kiekiai, trukmės, įrašyti baitai.
+# Ataskaita - bibliotekininko meniu "Našumo ataskaita". PERF_DUMP_FILE (pvz., 'perf.json') -
+# jei nurodytas, programos pabaigoje ataskaita įrašoma į JSON failą.
+PERF_ENABLED = True
+PERF_DUMP_FILE = None
+
+# Log lygis (debug.log): "DEBUG" - ir detalūs derinimo pranešimai (lėčiau), "INFO" - tik svarbūs
+LOG_LEVEL = "INFO"
+
 # Datos formatai
 DATE_FORMAT = "%Y-%m-%d"
\ No newline at end of file
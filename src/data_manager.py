@@ -11,8 +11,15 @@ KONTEKSTAS:
 
 import sys
 import json
+import marshal
 import os
+import shutil
+import stat
+import tempfile
 import logging
+from collections import namedtuple
+from src.config import ROLLING_BACKUP, STORAGE_FORMAT, LOG_LEVEL
+from src.perf import measure
 
 # --- LOGGING KONFIGŪRACIJA ---
 # Nustatome, kur bus log failas.
@@ -24,18 +31,25 @@ else:
 
 log_file = os.path.join(app_dir, 'debug.log')
 
-# Konfigūruojame logerį
-logging.basicConfig(
-    filename=log_file,
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    encoding='utf-8' # Svarbu lietuviškoms raidėms
-)
-
-# Pirmas įrašas paleidžiant modulį
-logging.info(f"--- SISTEMA STARTUOJA ---")
-logging.info(f"Vykdymo vieta (App Dir): {app_dir}")
-logging.info(f"Ar sukompiliuota (Frozen): {getattr(sys, 'frozen', False)}")
+def setup_logging(filename=None, level=None):
+    """
+    Konfigūruoja logerį. Kviečiama programos paleidimo taške (main.py, app.py),
+    o ne importuojant modulį: importas neturi kurti failų (testai, įrankiai, greitas startas).
+    Pakartotinis kvietimas (pvz., Streamlit perkrovus puslapį) nieko nekeičia.
+    level - None: config.LOG_LEVEL. DEBUG pranešimai žemesniame lygyje net neformatuojami.
+    """
+    if logging.getLogger().handlers:
+        return
+    logging.basicConfig(
+        filename=filename or log_file,
+        level=level or getattr(logging, LOG_LEVEL.upper(), logging.INFO),
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        encoding='utf-8' # Svarbu lietuviškoms raidėms
+    )
+    # Pirmas įrašas paleidžiant programą
+    logging.info(f"--- SISTEMA STARTUOJA ---")
+    logging.info(f"Vykdymo vieta (App Dir): {app_dir}")
+    logging.info(f"Ar sukompiliuota (Frozen): {getattr(sys, 'frozen', False)}")
 
 def get_base_path():
     """
@@ -60,32 +74,148 @@ def get_data_file_path(filename):
     base_path = get_base_path()
     return os.path.join(base_path, 'data', filename)
 
-def load_data(filepath):
+# --- SAUGOJIMO FORMATAI (Codecs) ---
+# Kiekvienas formatas moka įrašyti ir nuskaityti sąrašą žodynų (list of dicts).
+# - "json":         gražus JSON su indent=4 (skaitomas žmogaus, numatytasis)
+# - "json-compact": JSON be tarpų (tas pats .json failas, bet ~2x mažesnis ir greitesnis)
+# - "jsonl":        JSON Lines - vienas įrašas eilutėje
+# - "marshal":      Python dvejetainis formatas (greičiausias, bet ne žmogui skaityti)
+Codec = namedtuple('Codec', ['extension', 'binary', 'dump', 'load'])
+
+# json.dumps + vienas write() yra greitesnis nei json.dump (šis rašo daug mažų gabalų)
+def _dump_json(data, f):
+    f.write(json.dumps(data, indent=4, ensure_ascii=False))
+
+def _dump_json_compact(data, f):
+    f.write(json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+
+def _dump_jsonl(data, f):
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    f.writelines(dumps(item) + "\n" for item in data)
+
+def _load_jsonl(f):
+    loads = json.loads
+    return [loads(line) for line in f if line.strip()]
+
+def _load_marshal(f):
+    # marshal.load(f) skaito failą mažais gabalais ir yra ~10x lėtesnis nei loads(read())
+    return marshal.loads(f.read())
+
+CODECS = {
+    "json": Codec(".json", False, _dump_json, json.load),
+    "json-compact": Codec(".json", False, _dump_json_compact, json.load),
+    "jsonl": Codec(".jsonl", False, _dump_jsonl, _load_jsonl),
+    "marshal": Codec(".marshal", True, marshal.dump, _load_marshal),
+}
+
+def get_store_filename(filename, fmt=None):
+    """
+    Pritaiko failo plėtinį pasirinktam formatui:
+    'books.json' + "marshal" -> 'books.marshal'.
+    """
+    codec = CODECS[fmt or STORAGE_FORMAT]
+    root, _ = os.path.splitext(filename)
+    return root + codec.extension
+
+def _codec_for_path(filepath, fmt=None):
+    """
+    Parenka formatą: aiškiai nurodytą arba pagal failo plėtinį.
+    .json failams naudojamas config formatas, jei jis JSON tipo (json / json-compact).
+    """
+    if fmt:
+        return CODECS[fmt]
+    ext = os.path.splitext(filepath)[1]
+    if ext == ".json":
+        return CODECS[STORAGE_FORMAT] if CODECS[STORAGE_FORMAT].extension == ".json" else CODECS["json"]
+    for codec in CODECS.values():
+        if codec.extension == ext:
+            return codec
+    return CODECS["json"]
+
+def get_backup_path(filepath):
+    """
+    Grąžina atsarginės kopijos kelią pagal BACKUP_FILENAME konvenciją:
+    'data/books.json' -> 'data/books_backup.json'.
+    """
+    root, ext = os.path.splitext(filepath)
+    return f"{root}_backup{ext}"
+
+def _read(filepath, codec):
+    if codec.binary:
+        with open(filepath, 'rb') as f:
+            return codec.load(f)
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return codec.load(f)
+
+# Klaidos, kurias gali mesti sugadintas failas bet kuriame formate
+_READ_ERRORS = (json.JSONDecodeError, IOError, EOFError, ValueError, TypeError)
+
+def load_data(filepath, fmt=None):
     """
-    Nuskaito duomenis iš JSON failo.
+    Nuskaito duomenis iš failo (formatas - pagal plėtinį arba 'fmt').
+    Jei failas sugadintas, bandoma atkurti iš atsarginės kopijos (*_backup.*).
     """
+    codec = _codec_for_path(filepath, fmt)
     if not os.path.exists(filepath):
         # Naudojame logging, kad matytume, jog kuriamas naujas failas
         logging.info(f"Failas nerastas, bus sukurtas naujas: {filepath}")
         return []
 
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return _read(filepath, codec)
             
-    except (json.JSONDecodeError, IOError) as e:
-        # Pakeista iš print į logging.warning
-        logging.warning(f"Failas {filepath} sugadintas arba tuščias ({e}). Pradedama nuo nulio.")
-        return []
+    except _READ_ERRORS as e:
+        logging.error(f"Failas {filepath} sugadintas arba tuščias ({e}).")
+
+    # Sugadinto failo neperrašome tuščiu sąrašu - pasiliekame jo kopiją analizei
+    corrupt_path = filepath + ".corrupt"
+    try:
+        shutil.copy2(filepath, corrupt_path)
+        logging.warning(f"Sugadinto failo kopija: {corrupt_path}")
+    except OSError:
+        pass
+
+    backup_path = get_backup_path(filepath)
+    if os.path.exists(backup_path):
+        try:
+            data = _read(backup_path, codec)
+            logging.warning(f"Duomenys atkurti iš atsarginės kopijos: {backup_path}")
+            return data
+        except _READ_ERRORS as e:
+            logging.error(f"Atsarginė kopija {backup_path} taip pat netinkama ({e}).")
 
-def save_data(filepath, data):
+    logging.warning(f"Pradedama nuo nulio: {filepath}")
+    return []
+
+def save_data(filepath, data, backup=None, fmt=None):
     """
-    Įrašo duomenis į JSON failą.
+    Įrašo duomenis į failą ATOMIŠKAI.
     
     Parametrai:
     - filepath: kur saugoti.
     - data: sąrašas žodynų (list of dicts).
+    - backup: ar prieš perrašant išsaugoti seną versiją į *_backup.json
+      (None - imama iš config.ROLLING_BACKUP).
+    - fmt: formatas iš CODECS (None - pagal plėtinį ir config.STORAGE_FORMAT).
+
+    Veikimo principas: rašome į laikiną failą TAME PAČIAME aplanke, fsync,
+    o tada os.replace() - jis pakeičia failą vienu žingsniu. Nutrūkus programai
+    rašymo metu, senas failas lieka nepaliestas (niekada nematomas pusiau įrašytas).
+
+    Grąžina įrašytų baitų kiekį; 0 - įrašyti nepavyko (klaida įrašoma į log).
     """
+    with measure("data_manager.save_data") as m:
+        m.bytes = _save_data(filepath, data, backup, fmt)
+    return m.bytes
+
+def _save_data(filepath, data, backup, fmt):
+    """save_data() darbas; grąžina įrašytų baitų kiekį (0 - jei įrašyti nepavyko)."""
+    if backup is None:
+        backup = ROLLING_BACKUP
+    codec = _codec_for_path(filepath, fmt)
+    written = 0
+
+    tmp_path = None
     try:
         # 3. Užtikriname, kad egzistuoja direktorija (pvz., 'data/')
         # Jei aplanko 'data' nėra, os.makedirs jį sukurs.
@@ -93,11 +223,69 @@ def save_data(filepath, data):
         if directory and not os.path.exists(directory):
             os.makedirs(directory)
 
-        # 4. Atidarome failą rašymui ('w' - write)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            # indent=4 padaro failą gražų ir skaitomą žmogui (su tarpais)
+        # 4. Rašome į laikiną failą
+        fd, tmp_path = tempfile.mkstemp(
+            dir=directory or None, prefix=os.path.basename(filepath) + ".", suffix=".tmp"
+        )
+        mode_args = ('wb',) if codec.binary else ('w', -1, 'utf-8')
+        with os.fdopen(fd, *mode_args) as f:
+            # "json" formatas: indent=4 padaro failą gražų ir skaitomą žmogui,
             # ensure_ascii=False leidžia įrašyti lietuviškas raides, o ne kodus
-            json.dump(data, f, indent=4, ensure_ascii=False)
+            codec.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno()) # Duomenys tikrai diske, ne tik OS buferyje
+            size = os.fstat(f.fileno()).st_size
+
+        # mkstemp sukuria failą su 0600 - paliekame tokias teises, kokias turėjo senas failas
+        # (kitaip po pirmo įrašymo kitos paskyros, pvz., web UI ar backup, jo nebeperskaitytų)
+        os.chmod(tmp_path, _target_mode(filepath))
+
+        # 5. Slenkanti atsarginė kopija (ankstesnė versija -> *_backup.json)
+        if backup and os.path.exists(filepath):
+            _replace_with_copy(filepath, get_backup_path(filepath))
+
+        # 6. Atominis pakeitimas
+        os.replace(tmp_path, filepath)
+        tmp_path = None
+        _fsync_directory(directory)
+        written = size
             
-    except IOError as e:
-        print(f"Klaida įrašant į failą {filepath}: {e}")
\ No newline at end of file
+    except (IOError, OSError) as e:
+        logging.error(f"Klaida įrašant į failą {filepath}: {e}")
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return written
+
+# umask nuskaitomas vieną kartą importuojant: os.umask() keičia viso proceso būseną,
+# todėl jo nekviečiame rašymo metu (kitos gijos tuo metu gali kurti failus)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def _target_mode(filepath):
+    """Esamo failo teisės arba, jei failo dar nėra, įprastos naujo failo teisės (0666 & ~umask)."""
+    try:
+        return stat.S_IMODE(os.stat(filepath).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+def _replace_with_copy(source, target):
+    """Atomiškai nukopijuoja failą (per laikiną failą), kad ir backup niekada nebūtų pusinis."""
+    tmp_target = target + ".tmp"
+    shutil.copy2(source, tmp_target)
+    os.replace(tmp_target, target)
+
+def _fsync_directory(directory):
+    """Užfiksuoja aplanko įrašą (pervadinimą) diske. Windows to nepalaiko - praleidžiame."""
+    if os.name == 'nt':
+        return
+    try:
+        dir_fd = os.open(directory or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
\ No newline at end of file
@@ -2,33 +2,128 @@
 FILE: src/database.py
 PURPOSE: Valdo tiesioginį ryšį su SQLite duomenų baze ir lentelių kūrimą.
 RELATIONSHIPS:
-  - Naudojamas src/book_manager.py ir src/user_manager.py duomenų operacijoms.
-  - Pakeičia senąjį src/data_manager.py funkcionalumą.
+  - Naudojamas src/repositories/sqlite_book_repository.py ir
+    src/repositories/sqlite_user_repository.py duomenų operacijoms.
+  - Alternatyva src/data_manager.py (JSON) saugyklai, pasirenkama per config.STORAGE_BACKEND.
 CONTEXT:
   - Centralizuota vieta SQL užklausų vykdymui užtikrina, kad nereikia kartoti prisijungimo kodo.
+  - Ryšių telkinys (pool): kiekviena gija turi VIENĄ nuolatinį ryšį kiekvienam DB failui
+    (connection()). Ryšio atidarymas ir PRAGMA nustatymai kainuoja daugiau nei pati užklausa,
+    o sqlite3 paruoštus sakinius (prepared statements) kešuoja ryšyje pagal SQL tekstą -
+    su nuolatiniu ryšiu tas pats INSERT/SELECT kompiliuojamas tik vieną kartą.
+  - WAL žurnalas: skaitytojai netrukdo rašytojui ir atvirkščiai (Streamlit sesijos - gijos).
+    synchronous=NORMAL su WAL - duomenys neprarandami nutrūkus programai (tik dingus elektrai
+    gali prapulti paskutinės transakcijos). Nustatymai - src/config.py (SQLITE_*).
+  - bulk_upsert()/bulk_delete() - executemany su vienu SQL tekstu visoms eilutėms.
 """
 
+import logging
 import sqlite3
 import os
+import threading
+import weakref
+from src.config import SQLITE_SYNCHRONOUS, SQLITE_CACHE_KB, SQLITE_MMAP_BYTES, SQLITE_BUSY_TIMEOUT_MS
 
 # Nustatome DB failo vietą
 DB_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'library.db')
 
-def get_connection():
+# Kiek paruoštų sakinių laikyti kiekviename ryšyje (sqlite3 numatytasis - 128)
+STATEMENT_CACHE_SIZE = 256
+
+class _PooledConnection(sqlite3.Connection):
+    """sqlite3.Connection, į kurį galima laikyti silpną nuorodą (close_all registrui)."""
+
+_all_connections = weakref.WeakSet()    # Visi telkinio ryšiai (visų gijų)
+_registry_lock = threading.Lock()
+_local = threading.local()              # Gijos ryšiai: {db failas: ryšys}
+_initialized = set()                    # DB failai, kuriems lentelės jau sukurtos
+
+def _configure(conn):
+    """Greitaveikos nustatymai (PRAGMA). journal_mode=WAL išlieka DB faile."""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA cache_size={-int(SQLITE_CACHE_KB)}") # Neigiamas - kilobaitais
+    conn.execute(f"PRAGMA mmap_size={int(SQLITE_MMAP_BYTES)}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT_MS)}")
+
+def get_connection(db_file=None, factory=sqlite3.Connection):
     """
-    Sukuria ir grąžina ryšį su duomenų baze.
+    Sukuria ir grąžina NAUJĄ ryšį su duomenų baze (jį uždaro kviečiantysis).
     Nustatome row_factory, kad galėtume pasiekti stulpelius pagal pavadinimą.
+    Parametras db_file leidžia naudoti kitą DB failą (pvz., testuose).
+    Dažnoms operacijoms naudokite connection() - jis ryšio kaskart neatidaro.
     """
-    conn = sqlite3.connect(DB_FILE)
+    conn = sqlite3.connect(db_file or DB_FILE, factory=factory,
+                           cached_statements=STATEMENT_CACHE_SIZE,
+                           check_same_thread=False) # Naudoja tik viena gija; close_all - bet kuri
     conn.row_factory = sqlite3.Row  # Leidžia rezultatus pasiekti kaip dict: row['title']
+    _configure(conn)
     return conn
 
-def initialize_db():
+def connection(db_file=None):
+    """
+    Šios gijos nuolatinis ryšys su DB (telkinys). NEUŽDARYKITE jo - jis naudojamas pakartotinai.
+    Transakcijai: with connection(db) as conn: ... (commit pabaigoje, rollback klaidos atveju).
+    """
+    db_file = db_file or DB_FILE
+    conns = getattr(_local, 'conns', None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(db_file)
+    if conn is None:
+        conn = conns[db_file] = get_connection(db_file, factory=_PooledConnection)
+        conn.db_file = db_file
+        with _registry_lock:
+            _all_connections.add(conn)
+    return conn
+
+def close_all(db_file=None):
+    """Uždaro visų gijų telkinio ryšius (visus arba tik vieno DB failo), pvz., prieš trinant failą."""
+    with _registry_lock:
+        conns = list(_all_connections)
+    for conn in conns:
+        if db_file is None or getattr(conn, 'db_file', None) == db_file:
+            conn.close()
+    conns = getattr(_local, 'conns', None)
+    if conns:
+        for key in [key for key in conns if db_file is None or key == db_file]:
+            del conns[key]
+    if db_file is None:
+        _initialized.clear()
+    else:
+        _initialized.discard(db_file)
+
+# --- Masinės operacijos (executemany) ---
+
+def bulk_upsert(conn, table, columns, rows):
+    """INSERT OR REPLACE visoms eilutėms vienu executemany (SQL tekstas tas pats - sakinys kešuojamas)."""
+    sql = f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    return conn.executemany(sql, rows).rowcount
+
+def bulk_insert(conn, table, columns, rows):
+    """INSERT visoms eilutėms vienu executemany."""
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    return conn.executemany(sql, rows).rowcount
+
+def bulk_delete(conn, table, column, keys):
+    """DELETE ... WHERE column = ? kiekvienam raktui (keys - reikšmės, ne tuple)."""
+    return conn.executemany(f"DELETE FROM {table} WHERE {column} = ?", [(key,) for key in keys]).rowcount
+
+def initialize_db(db_file=None):
     """
     Sukuria reikiamas lenteles, jei jos dar neegzistuoja.
     Šią funkciją reikia iškviesti programos paleidimo pradžioje (main.py).
+    Tam pačiam failui pakartotinai (kiekviena repozitorija ją kviečia) nieko nedaro.
     """
-    conn = get_connection()
+    db_file = db_file or DB_FILE
+    if db_file in _initialized and os.path.exists(db_file):
+        return
+    directory = os.path.dirname(db_file)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    conn = get_connection(db_file)
     cursor = conn.cursor()
 
     # 1. Knygų lentelė
@@ -68,6 +163,19 @@ def initialize_db():
         )
     ''')
 
+    # 4. Indeksai dažnoms užklausoms: vartotojo paskolos, knygos paskolos,
+    # vėluojančios (pagal terminą) ir katalogo filtrai (autorius, žanras, metai)
+    for name, table, column in (
+        ("idx_loans_user_id", "loans", "user_id"),
+        ("idx_loans_book_id", "loans", "book_id"),
+        ("idx_loans_due_date", "loans", "due_date"),
+        ("idx_books_author", "books", "author"),
+        ("idx_books_genre", "books", "genre"),
+        ("idx_books_year", "books", "year"),
+    ):
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({column})")
+
     conn.commit()
     conn.close()
-    print(f"Duomenų bazė inicijuota: {DB_FILE}")
\ No newline at end of file
+    _initialized.add(db_file)
+    logging.info(f"Duomenų bazė inicijuota: {db_file}")
\ No newline at end of file
@@ -9,32 +9,60 @@ CONTEXT:
   - Tai yra "Vieno langelio principas" (Single Entry Point).
   - UI (Vartotojo sąsaja) bendrauja TIK su šia klase. UI neturi žinoti,
     kad egzistuoja kažkokie 'auth_service' ar 'user_repository'.
+  - Streamlit aplikacijoje Library yra VIENA visam procesui (app.py, st.cache_resource),
+    todėl abi repozitorijos ir servisai dalijasi vienu RWLock (self.lock).
 """
 
+from src.config import (STORAGE_BACKEND, LOAN_JOURNAL_ENABLED, LOAN_JOURNAL_FILENAME,
+                        LOAN_HISTORY_FILENAME, LOAN_JOURNAL_FSYNC)
+from src.data_manager import get_data_file_path
 from src.repositories.book_repository import BookRepository
 from src.repositories.user_repository import UserRepository
+from src.repositories.base_repository import batch_all
+from src.repositories.loan_journal import LoanJournal
+from src.repositories.rwlock import RWLock, write_locked
 from src.services.loan_service import LoanService
 from src.services.stats_service import StatsService
 from src.services.auth_service import AuthService
 from src.services.inventory_service import InventoryService
 
 class Library:
-    def __init__(self):
+    def __init__(self, backend=None, books=None, users=None):
         """
         Konstruktorius: "Surenka" visą aplikaciją.
+
+        Parametrai:
+        - backend: "json", "sqlite" arba "memory" (be disko: testams, matavimams).
+          Jei nenurodyta, imama iš config.STORAGE_BACKEND.
+        - books, users: pradiniai duomenys "memory" saugyklai (objektai arba žodynai).
         """
         # 1. DUOMENŲ SLUOKSNIS (Data Layer)
-        # Šie objektai moka tik skaityti/rašyti failus.
-        self.book_repository = BookRepository()
-        self.user_repository = UserRepository()
+        # Šie objektai moka tik skaityti/rašyti duomenis (failus arba DB).
+        self.backend = backend or STORAGE_BACKEND
+        self.book_repository, self.user_repository = self._create_repositories(self.backend, books, users)
+
+        # Vienas užraktas abiem repozitorijoms: paskola keičia ir knygą, ir vartotoją
+        self.lock = RWLock()
+        self.book_repository.use_lock(self.lock)
+        self.user_repository.use_lock(self.lock)
+
+        # Paskolų žurnalas (nebūtinas): atkuria paskolas, įvykusias po paskutinio users snapshot
+        self.loan_journal = None
+        if LOAN_JOURNAL_ENABLED and self.backend != "memory": # Atmintyje nėra ką atkurti
+            self.loan_journal = LoanJournal(
+                get_data_file_path(LOAN_JOURNAL_FILENAME),
+                get_data_file_path(LOAN_HISTORY_FILENAME),
+                fsync=LOAN_JOURNAL_FSYNC
+            )
+            self.user_repository.attach_journal(self.loan_journal)
 
         # 2. LOGIKOS SLUOKSNIS (Service Layer)
         # Šie objektai atlieka skaičiavimus ir tikrinimus.
         # Mes jiems 'įduodame' repozitorijas, kad jie galėtų gauti duomenis.
         self.auth_service = AuthService(self.user_repository)
         self.inventory_service = InventoryService(self.book_repository)
-        self.loan_service = LoanService(self.book_repository, self.user_repository)
-        self.stats_service = StatsService(self.book_repository, self.user_repository)
+        self.loan_service = LoanService(self.book_repository, self.user_repository, self.loan_journal)
+        self.stats_service = StatsService(self.book_repository, self.user_repository, self.loan_journal)
 
         # 3. SUDERINAMUMAS (Backward Compatibility)
         # Kadangi jūsų UI kodas (main.py, reader_ui.py) vis dar kreipiasi į
@@ -58,17 +86,46 @@ class Library:
         self.book_repository.add_book = self.inventory_service.add_book
         self.book_repository.batch_delete_books = self.inventory_service.batch_delete
         
-        # Trumpos Lambda funkcijos paieškai (filtravimui)
-        # Jos leidžia senam kodui kviesti sudėtingas paieškas per repozitoriją
-        self.book_repository.get_candidates_by_author = lambda a: [b for b in self.book_repository.books if a.lower() in b.author.lower() and b.available_copies == b.total_copies] # Ši funkcija ieško autorių, kurių vardas/pavardė atitinka 'b'
-        self.book_repository.get_candidates_by_genre = lambda g: [b for b in self.book_repository.books if g.lower() == b.genre.lower() and b.available_copies == b.total_copies]
-        self.book_repository.get_candidates_by_year = lambda y: [b for b in self.book_repository.books if int(b.year) < y and b.available_copies == b.total_copies]
-        
+        # Paieškos pagal autorių/žanrą/metus (get_candidates_by_*) dabar yra tikri
+        # BookRepository metodai, naudojantys antrinius indeksus (nebereikia lambda).
+
         # Pervadiname metodus, kad atitiktų senąjį API
         self.book_repository.restore_from_backup = self.book_repository.restore_backup
         self.book_repository.search_books = self.book_repository.search
         self.book_repository.get_all_books = self.book_repository.get_all
 
+    @staticmethod
+    def _create_repositories(backend, books=None, users=None):
+        """Sukuria repozitorijas pagal pasirinktą saugyklą."""
+        if backend == "memory":
+            from src.repositories.memory_repository import MemoryBookRepository, MemoryUserRepository
+            return MemoryBookRepository(books), MemoryUserRepository(users)
+        if books is not None or users is not None:
+            raise ValueError("Pradiniai duomenys (books, users) galimi tik 'memory' saugyklai.")
+        if backend == "json":
+            return BookRepository(), UserRepository()
+        if backend == "sqlite":
+            # Importuojame tik kai reikia, kad JSON režimas nepriklausytų nuo sqlite modulių
+            from src.repositories.sqlite_book_repository import SqliteBookRepository
+            from src.repositories.sqlite_user_repository import SqliteUserRepository
+            return SqliteBookRepository(), SqliteUserRepository()
+        raise ValueError(f"Nežinoma saugykla: {backend}")
+
+    # --- ĮRAŠYMO VALDYMAS (Unit of Work) ---
+
+    def unit_of_work(self):
+        """
+        Kontekstas loginei operacijai: visi pakeitimai bloko viduje
+        įrašomi VIENĄ kartą bloko pabaigoje.
+        Naudojimas: with library.unit_of_work(): ...
+        """
+        return batch_all(self.book_repository, self.user_repository)
+
+    def flush(self):
+        """Įrašo visus atidėtus pakeitimus (pvz., prieš išjungiant programą)."""
+        self.book_repository.flush()
+        self.user_repository.flush()
+
     # --- FASADO METODAI (Delegavimas) ---
     # Kai UI kviečia library.borrow_book(), biblioteka nieko nedaro pati,
     # o tik perduoda (deleguoja) darbą 'loan_service'.
@@ -79,9 +136,18 @@ class Library:
     def return_book(self, user_id, book_id):
         return self.loan_service.return_book(user_id, book_id)
 
+    def borrow_many(self, user_id, book_ids, all_or_nothing=False):
+        return self.loan_service.borrow_many(user_id, book_ids, all_or_nothing)
+
+    def return_many(self, user_id, book_ids, all_or_nothing=False):
+        return self.loan_service.return_many(user_id, book_ids, all_or_nothing)
+
     def return_all_books(self, user_id):
         return self.loan_service.return_all_books(user_id)
 
+    def renew_book(self, user_id, book_id):
+        return self.loan_service.renew_book(user_id, book_id)
+
     def get_user_overdue_books(self, user_id):
         """Grąžina konkretaus vartotojo vėluojančias knygas."""
         user = self.user_repository.get_by_id(user_id)
@@ -101,10 +167,23 @@ class Library:
         """Grąžina bendrą statistiką."""
         return self.stats_service.get_advanced_statistics()
 
+    def get_most_borrowed_books(self, limit=10):
+        """Populiariausios knygos pagal paskolų istoriją (jei įjungtas žurnalas)."""
+        return self.stats_service.get_most_borrowed_books(limit)
+
+    def get_borrowed_genre_history(self):
+        """
+        Skolinimai pagal žanrą per visą paskolų istoriją (jei įjungtas žurnalas).
+        Be užrakto: istorijos failai skaitomi (galbūt keliuose procesuose) netrukdant paskoloms.
+        """
+        return self.stats_service.get_borrowed_genre_history()
+
+    @write_locked
     def safe_delete_user(self, user):
         """
         Saugus vartotojo trynimas.
         Logika: Library klasė koordinuoja patikrinimą.
+        Patikrinimas ir šalinimas - po tuo pačiu užraktu (tarp jų niekas negali pasiskolinti).
         """
         # 1. Patikriname, ar skaitytojas turi skolų
         if user.role == 'reader' and user.active_loans:
@@ -116,6 +195,7 @@ class Library:
             return True, "Vartotojas sėkmingai pašalintas."
         return False, "Vartotojas nerastas."
     
+    @write_locked
     def safe_delete_book(self, book):
         """Verslo logika: trina knygą tik jei ji saugi trinti.
         Bando saugiai ištrinti knygą.
@@ -126,9 +206,7 @@ class Library:
         if int(book.available_copies) < int(book.total_copies):
             return False, "Negalima ištrinti: knyga šiuo metu yra paskolinta."
         
-        self.book_repository.remove(book.id)
-        if book in self.book_manager.books:
-            self.book_manager.books.remove(book)
-        self.book_repository.save()
+        # Šaliname per repozitoriją (sąrašas ir indeksai) ir saugome vieną kartą
+        self.book_repository.remove_many([book.id])
         
         return True, f"Knyga '{book.title}' sėkmingai ištrinta."
\ No newline at end of file
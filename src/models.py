@@ -5,17 +5,32 @@ CONTEXT:
   - Naudojame modernią Python biblioteką 'dataclasses'.
   - Tai leidžia išvengti daug pasikartojančio kodo (boilerplate), kurį
     tekdavo rašyti senesnėse Python versijose (pvz., __init__ metodus).
+  - Atminties taupymas (svarbu, kai knygų - milijonai):
+      * slots=True: objektas neturi savo __dict__ žodyno (laukai laikomi fiksuotose vietose);
+      * pasikartojantys tekstai (autorius, žanras) "internuojami" - visos knygos
+        dalinasi vienu teksto objektu;
+      * paskola - Loan objektas su termino dienos numeriu (int), o ne žodynas su tekstu.
 """
 
+import sys
 import uuid
+from array import array
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import List, Dict, Any
+from datetime import date, datetime
+from typing import List, Dict, Any, Optional
+from src.config import DATE_FORMAT
+
+def _intern(value):
+    """Vienodi tekstai -> vienas bendras objektas atmintyje."""
+    return sys.intern(value) if type(value) is str else value
 
 # @dataclass yra "dekoratorius". Jis automatiškai sugeneruoja klasei metodus:
 # __init__() - konstruktorių
 # __repr__() - gražų atvaizdavimą spausdinant (print)
 # __eq__() - objektų palyginimą
-@dataclass
+# slots=True - be __dict__ kiekvienam objektui (mažiau atminties, greitesnė prieiga)
+@dataclass(slots=True)
 class Book:
     """
     Modelis, atstovaujantis vieną knygą.
@@ -37,6 +52,11 @@ class Book:
     # Lambda funkcija užtikrina, kad kaskart kuriant naują knygą, sugeneruojamas NAUJAS kodas.
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
 
+    def __post_init__(self):
+        # Autorių ir žanrų yra daug mažiau nei knygų - laikome po vieną kopiją
+        self.author = _intern(self.author)
+        self.genre = _intern(self.genre)
+
     def __str__(self) -> str:
         """Vartotojui draugiškas atvaizdavimas (naudojamas spausdinant meniu)."""
         return f"{self.title} - {self.author} | Laisva: {self.available_copies}/{self.total_copies}"
@@ -72,9 +92,96 @@ class Book:
             id=data.get("id", str(uuid.uuid4())) # Jei JSON faile nėra ID, sukuriame naują
         )
 
+# --- Paskolos ---
+
+def parse_due_date(text):
+    """Termino tekstas -> dienos numeris (date.toordinal()) arba None, jei data neteisinga."""
+    if DATE_FORMAT == "%Y-%m-%d":
+        try:
+            return date.fromisoformat(text).toordinal() # Daug greičiau nei strptime
+        except (TypeError, ValueError):
+            pass # Pvz., "2024-1-5" - tokią datą supranta tik strptime
+    try:
+        return datetime.strptime(text, DATE_FORMAT).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+def format_due_date(ordinal):
+    """Dienos numeris -> termino tekstas (DATE_FORMAT)."""
+    day = date.fromordinal(ordinal)
+    return day.isoformat() if DATE_FORMAT == "%Y-%m-%d" else day.strftime(DATE_FORMAT)
+
+class Loan:
+    """
+    Viena aktyvi paskola. Terminas laikomas dienos numeriu (due), todėl
+    palyginimams ("ar vėluoja?") nereikia kaskart skaidyti datos teksto.
+
+    Suderinamumas: senas kodas dirba su paskolomis kaip su žodynais
+    (loan['due_date'], loan.get('title'), dict(loan)) - tai veikia ir čia.
+    """
+    __slots__ = ('book_id', 'title', 'due', '_due_text')
+    _KEYS = ('book_id', 'title', 'due_date')
+
+    def __init__(self, book_id, title="", due_date=None):
+        self.book_id = book_id
+        self.title = _intern(title) # Kelios tos pačios knygos paskolos dalinasi pavadinimu
+        self.due_date = due_date
+
+    @property
+    def due_date(self) -> Optional[str]:
+        if self.due is not None:
+            return format_due_date(self.due)
+        return self._due_text
+
+    @due_date.setter
+    def due_date(self, value):
+        self.due = parse_due_date(value)
+        # Neteisingą datą išsaugome tokią, kokia buvo (kad nedingtų įrašant)
+        self._due_text = value if self.due is None else None
+
+    # --- Žodyno sąsaja (suderinamumui) ---
+
+    def keys(self):
+        return self._KEYS
+
+    def __getitem__(self, key):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self._KEYS
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self._KEYS else default
+
+    def __eq__(self, other):
+        if isinstance(other, (Loan, dict)):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None # Keičiamas objektas (kaip ir žodynas)
+
+    def __repr__(self):
+        return f"Loan(book_id={self.book_id!r}, title={self.title!r}, due_date={self.due_date!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"book_id": self.book_id, "title": self.title, "due_date": self.due_date}
+
+    @classmethod
+    def from_dict(cls, data) -> 'Loan':
+        if isinstance(data, cls):
+            return data
+        return cls(data["book_id"], data.get("title", ""), data.get("due_date"))
+
 # --- Vartotojų Modeliai ---
 
-@dataclass
+@dataclass(slots=True)
 class User:
     """
     Bazinė vartotojo klasė.
@@ -91,7 +198,7 @@ class User:
             "role": self.role
         }
 
-@dataclass
+@dataclass(slots=True)
 class Librarian(User):
     """
     Bibliotekininkas (Admin).
@@ -107,8 +214,9 @@ class Librarian(User):
         self.role = "librarian"
 
     def to_dict(self) -> Dict[str, Any]:
-        # Paimame bazinį žodyną iš tėvinės klasės (User)
-        data = super().to_dict()
+        # Paimame bazinį žodyną iš tėvinės klasės (User).
+        # Su slots=True dataclass sukuria naują klasę, todėl super() be argumentų neveikia.
+        data = User.to_dict(self)
         # Pridedame specifinį lauką
         data["password"] = self.password
         return data
@@ -122,7 +230,7 @@ class Librarian(User):
             password=data["password"]
         )
 
-@dataclass
+@dataclass(slots=True)
 class Reader(User):
     """
     Skaitytojas.
@@ -131,14 +239,15 @@ class Reader(User):
     # DĖMESIO: Sąrašams (list) negalima naudoti 'active_loans = []', nes tada
     # visi skaitytojai dalinsis TUO PAČIU sąrašu (Python nuorodų specifika).
     # field(default_factory=list) sukuria naują tuščią sąrašą kiekvienam objektui.
-    active_loans: List[Dict[str, str]] = field(default_factory=list)
+    active_loans: List[Loan] = field(default_factory=list)
 
     def __post_init__(self):
         self.role = "reader"
+        self.active_loans = [Loan.from_dict(loan) for loan in self.active_loans]
 
     def to_dict(self) -> Dict[str, Any]:
-        data = super().to_dict()
-        data["active_loans"] = self.active_loans
+        data = User.to_dict(self)
+        data["active_loans"] = [dict(loan) for loan in self.active_loans]
         return data
 
     @classmethod
@@ -148,4 +257,54 @@ class Reader(User):
             username=data["username"],
             role="reader",
             active_loans=data.get("active_loans", [])
-        )
\ No newline at end of file
+        )
+
+# --- Stulpelinis knygų atvaizdas (analitikai) ---
+
+class BookTable:
+    """
+    Knygos "stulpeliais": kiekvienas laukas - atskiras sąrašas ar array masyvas.
+    Skaičiai (metai, kopijos) laikomi array('i') - po 4 baitus, be Python int objektų.
+    Tinka statistikai ir pandas.DataFrame(table.to_columns()) be knygų objektų kūrimo.
+    """
+    TEXT_COLUMNS = ('id', 'title', 'author', 'genre')
+    INT_COLUMNS = ('year', 'total_copies', 'available_copies')
+
+    def __init__(self):
+        for name in self.TEXT_COLUMNS:
+            setattr(self, name, [])
+        for name in self.INT_COLUMNS:
+            setattr(self, name, array('i'))
+
+    @classmethod
+    def from_books(cls, books) -> 'BookTable':
+        table = cls()
+        for book in books:
+            table.append(book)
+        return table
+
+    def append(self, book):
+        self.id.append(book.id)
+        self.title.append(book.title)
+        self.author.append(_intern(book.author))
+        self.genre.append(_intern(book.genre))
+        self.year.append(int(book.year))
+        self.total_copies.append(int(book.total_copies))
+        self.available_copies.append(int(book.available_copies))
+
+    def __len__(self):
+        return len(self.id)
+
+    def row(self, index) -> Book:
+        """Viena eilutė -> Book objektas."""
+        return Book(**{name: getattr(self, name)[index]
+                       for name in self.TEXT_COLUMNS + self.INT_COLUMNS})
+
+    def to_columns(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.TEXT_COLUMNS + self.INT_COLUMNS}
+
+    def genre_counts(self) -> Counter:
+        return Counter(self.genre)
+
+    def mean_year(self) -> Optional[float]:
+        return sum(self.year) / len(self.year) if self.year else None
@@ -0,0 +1,174 @@
+"""
+FILE: src/perf.py
+PURPOSE: Našumo matavimai: kvietimų kiekiai, trukmių histogramos ir įrašyti baitai.
+RELATIONSHIPS:
+  - LoanService ir StatsService pažymėti @instrumented (matuojami visi vieši metodai).
+  - BaseRepository matuoja save(), _write() ir _load(); data_manager.save_data - trukmę ir baitus.
+  - Ataskaita rodoma bibliotekininko meniu ("Našumo ataskaita"), JSON - dump_json().
+CONTEXT:
+  - Registras (REGISTRY) gyvena procese, todėl matavimai rodo tik šio paleidimo darbą.
+  - Histograma - fiksuoti intervalai milisekundėmis (BUCKETS_MS): įrašymas O(log k),
+    atmintis nepriklauso nuo kvietimų kiekio. Procentiliai (p50/p95) - intervalo viršutinė riba.
+  - config.PERF_ENABLED = False išjungia matavimus (lieka tik vienas if).
+  - config.PERF_DUMP_FILE - jei nurodytas, main.py programos pabaigoje įrašo JSON ataskaitą.
+"""
+
+import json
+import threading
+import time
+import types
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from src.config import PERF_ENABLED
+
+# Histogramos intervalų viršutinės ribos (ms); paskutinis intervalas - viskas, kas ilgiau
+BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+class Metric:
+    """Vieno matuojamo veiksmo (pvz., 'LoanService.borrow_book') suvestinė."""
+    __slots__ = ('name', 'count', 'errors', 'total', 'max', 'bytes', 'buckets')
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0 # sekundės
+        self.max = 0.0
+        self.bytes = 0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def percentile(self, fraction):
+        """Apytikslis procentilis (ms): intervalo, į kurį patenka 'fraction' kvietimų, riba."""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max * 1000
+        return self.max * 1000
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": round(self.total * 1000, 3),
+            "avg_ms": round(self.total * 1000 / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "bytes": self.bytes,
+            "histogram": dict(zip([f"<={b}" for b in BUCKETS_MS] + ["inf"], self.buckets)),
+        }
+
+class Registry:
+    """Matavimų registras {pavadinimas: Metric}. Saugus naudoti iš kelių gijų."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, nbytes=0, error=False):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Metric(name)
+            metric.count += 1
+            metric.errors += error
+            metric.total += seconds
+            if seconds > metric.max:
+                metric.max = seconds
+            metric.bytes += nbytes
+            metric.buckets[bisect_left(BUCKETS_MS, seconds * 1000)] += 1
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def reset(self):
+        with self._lock:
+            self._metrics = {}
+
+    def snapshot(self):
+        """Visi matavimai kaip žodynas (JSON ataskaitai), surikiuoti pagal pavadinimą."""
+        with self._lock:
+            return {name: self._metrics[name].to_dict() for name in sorted(self._metrics)}
+
+    def report_rows(self, limit=None):
+        """Lentelės eilutės terminalui: daugiausiai laiko užėmę veiksmai pirmi."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.total, reverse=True)
+        rows = []
+        for m in metrics[:limit]:
+            data = m.to_dict()
+            rows.append([m.name, m.count, f"{data['total_ms']:.1f}", f"{data['avg_ms']:.3f}",
+                         f"<={data['p50_ms']:g}", f"<={data['p95_ms']:g}", f"{data['max_ms']:.1f}",
+                         m.bytes or "-"])
+        return rows
+
+    def dump_json(self, path):
+        """Įrašo ataskaitą į JSON failą (pvz., palyginimui tarp paleidimų)."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"created": time.strftime("%Y-%m-%d %H:%M:%S"), "metrics": self.snapshot()},
+                      f, indent=2, ensure_ascii=False)
+
+REPORT_HEADERS = ["Veiksmas", "Kiek", "Viso ms", "Vid. ms", "p50 ms", "p95 ms", "Max ms", "Baitai"]
+
+# Vienas registras visam procesui
+REGISTRY = Registry()
+
+class _Measurement:
+    """measure() bloko objektas: į jį galima įrašyti baitų kiekį (m.bytes = ...)."""
+    __slots__ = ('bytes',)
+
+    def __init__(self):
+        self.bytes = 0
+
+@contextmanager
+def measure(name, registry=None):
+    """Kontekstas: išmatuoja bloko trukmę. Klaidos atveju kvietimas skaičiuojamas kaip klaida."""
+    m = _Measurement()
+    if not PERF_ENABLED:
+        yield m
+        return
+    start = time.perf_counter()
+    error = False
+    try:
+        yield m
+    except BaseException:
+        error = True
+        raise
+    finally:
+        (registry or REGISTRY).record(name, time.perf_counter() - start, m.bytes, error)
+
+def timed(name):
+    """Dekoratorius: kiekvienas funkcijos kvietimas įrašomas vardu 'name'."""
+    def decorator(func):
+        if not PERF_ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            error = False
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                error = True
+                raise
+            finally:
+                REGISTRY.record(name, time.perf_counter() - start, 0, error)
+        return wrapper
+    return decorator
+
+def instrumented(cls):
+    """
+    Klasės dekoratorius: matuoja visus viešus (ne '_') klasės metodus
+    vardais 'Klasė.metodas'. Laukimas užrakte įskaičiuojamas - tai tikra vartotojo laukimo trukmė.
+    """
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith('_') or not isinstance(value, types.FunctionType):
+            continue # staticmethod, property ir pan. paliekami kaip yra
+        setattr(cls, attr, timed(f"{cls.__name__}.{attr}")(value))
+    return cls
@@ -0,0 +1,200 @@
+"""
+FILE: src/repositories/base_repository.py
+PURPOSE: Bendra repozitorijų įrašymo (persistence) logika.
+RELATIONSHIPS:
+  - Paveldima BookRepository ir UserRepository (ir jų SQLite versijų).
+  - Nustatymai imami iš src/config.py (WRITE_BEHIND_SECONDS).
+CONTEXT:
+  - save() nebūtinai rašo iškart: jis pažymi repozitoriją kaip "nešvarią" (dirty).
+  - batch() blokas (Unit of Work) sujungia daug save() į VIENĄ įrašymą bloko pabaigoje.
+  - Jei WRITE_BEHIND_SECONDS > 0, įrašymas atidedamas laikmačiu (write-behind),
+    o programai baigiantis (atexit) neįrašyti pakeitimai išsaugomi.
+  - Konkretus įrašymas (JSON failas, SQLite) aprašomas paveldinčios klasės _write() metode.
+  - subscribe() leidžia kitiems objektams (pvz., StatsService) gauti pranešimus apie
+    pakeitimus ir atnaujinti savo suvestines be viso sąrašo perskaičiavimo.
+  - lock - skaitytojų-rašytojų užraktas (RWLock). Library abiem repozitorijoms duoda
+    TĄ PATĮ užraktą (use_lock), nes viena Library dalijama visoms Streamlit sesijoms.
+  - version - didėjantis skaitiklis (+1 po kiekvieno pakeitimo): pagal jį UI
+    podėliai (pvz., DataFrame) žino, ar duomenys pasikeitė nuo paskutinio karto.
+  - save(), _write() ir _load() matuojami (src/perf.py) vardais 'Klasė.save' ir t.t.
+  - Tingus užkrovimas (config.LAZY_LOADING): konstruktorius failo neskaito. Duomenys
+    užkraunami pirmą kartą kreipiantis į kurį nors _LAZY_ATTRIBUTES atributą
+    (sąrašą ar indeksą) - taip programa startuoja greitai, o nenaudojama repozitorija
+    (pvz., knygos, kol skaitytojas tik prisijungia) iš viso neskaitoma.
+"""
+
+import atexit
+import logging
+import threading
+import weakref
+from contextlib import contextmanager, ExitStack
+from src.config import WRITE_BEHIND_SECONDS, LAZY_LOADING
+from src.repositories.rwlock import RWLock, write_locked
+from src.perf import measure
+
+logger = logging.getLogger(__name__)
+
+# Įvykiai, apie kuriuos pranešama prenumeratoriams: listener(įvykis, objektas)
+RESET = "reset"                 # visas sąrašas pakeistas (objektas = naujas sąrašas)
+ADDED = "added"
+REMOVED = "removed"
+CHANGING = "changing"           # prieš keičiant laukus (senos reikšmės)
+CHANGED = "changed"             # pakeitus laukus (naujos reikšmės)
+LOAN_ADDED = "loan_added"       # objektas = (skaitytojas, paskola)
+LOAN_REMOVED = "loan_removed"
+
+def _flush_on_exit(repo_ref):
+    """atexit pagalbininkas: laikome silpną nuorodą, kad repozitorija galėtų būti sunaikinta."""
+    repo = repo_ref()
+    if repo is not None:
+        repo.flush()
+
+class BaseRepository:
+    _listeners = () # Keičiamas nauju sąrašu (ne papildomas vietoje), todėl saugu iteruoti
+    _version = 0
+    _LAZY_ATTRIBUTES = () # Atributai, kuriuos sukuria _load() (sąrašas ir indeksai)
+
+    @property
+    def version(self):
+        """Duomenų versija: didėja po kiekvieno pakeitimo (niekada nemažėja)."""
+        return self._version
+
+    def subscribe(self, listener):
+        """Užregistruoja funkciją listener(įvykis, objektas), kviečiamą po kiekvieno pakeitimo."""
+        self._listeners = list(self._listeners) + [listener]
+
+    def _notify(self, event, item=None):
+        self._version += 1
+        for listener in self._listeners:
+            listener(event, item)
+
+    def _init_persistence(self, write_behind_seconds=None):
+        """Paruošia dirty/batch būseną. Kviečiama paveldinčios klasės konstruktoriuje."""
+        self._dirty = False
+        self._batch_depth = 0
+        self._flush_timer = None
+        self.lock = RWLock()
+        self._load_lock = threading.RLock()
+        self._loading = False
+        self.write_behind_seconds = (
+            WRITE_BEHIND_SECONDS if write_behind_seconds is None else write_behind_seconds
+        )
+        atexit.register(_flush_on_exit, weakref.ref(self))
+
+    def _start_loading(self):
+        """Konstruktoriaus pabaiga: užkrauna duomenis iškart arba (LAZY_LOADING) atideda."""
+        if not LAZY_LOADING:
+            self.ensure_loaded()
+
+    @property
+    def is_loaded(self):
+        """Ar duomenys jau užkrauti (arba priskirti, pvz., testuose per .books = [...])."""
+        return self._LAZY_ATTRIBUTES[0] in self.__dict__
+
+    def ensure_loaded(self):
+        """
+        Užkrauna duomenis, jei jie dar neužkrauti. Saugu kviesti iš kelių gijų:
+        užkrauna tik viena, kitos palaukia ir naudoja jau užkrautus duomenis.
+        """
+        with self._load_lock:
+            if self._loading or self.is_loaded:
+                return
+            self._loading = True
+            try:
+                with measure(f"{type(self).__name__}._load"):
+                    self._load()
+            finally:
+                self._loading = False
+
+    def __getattr__(self, name):
+        # Kviečiama tik tada, kai atributas nerastas įprastai, t.y. duomenys dar neužkrauti
+        if name in type(self)._LAZY_ATTRIBUTES and '_load_lock' in self.__dict__:
+            self.ensure_loaded()
+            if name in self.__dict__:
+                return self.__dict__[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def use_lock(self, lock):
+        """Pakeičia užraktą bendru (kad kelios repozitorijos būtų keičiamos atomiškai)."""
+        self.lock = lock
+
+    def _write(self):
+        """Fizinis įrašymas. Turi būti aprašytas paveldinčioje klasėje."""
+        raise NotImplementedError
+
+    @property
+    def is_dirty(self):
+        return self._dirty
+
+    def save(self):
+        """
+        Pažymi, kad duomenys pasikeitė, ir juos įrašo.
+        - batch() viduje: įrašymas atidedamas iki bloko pabaigos.
+        - write-behind režime: įrašymas atidedamas laikmačiu.
+        - kitu atveju: įrašoma iškart (kaip anksčiau).
+        """
+        self._dirty = True
+        if self._batch_depth > 0:
+            return
+        if self.write_behind_seconds:
+            self._schedule_flush()
+            return
+        with measure(f"{type(self).__name__}.save"):
+            self.flush()
+
+    @write_locked
+    def flush(self):
+        """
+        Įrašo pakeitimus, jei jų yra. Grąžina True, jei įrašyta sėkmingai.
+        Nepavykus (_write meta OSError: pilnas diskas, teisės; SQLite klaidos, pvz., užrakinta DB,
+        paverčiamos OSError) pakeitimai lieka pažymėti kaip neįrašyti - bus bandoma dar kartą
+        kito save()/flush() metu.
+        """
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if not self._dirty:
+            return False
+        try:
+            with measure(f"{type(self).__name__}._write"):
+                self._write()
+        except OSError as exc:
+            logger.error("%s: nepavyko įrašyti: %s", type(self).__name__, exc)
+            return False
+        self._dirty = False
+        return True
+
+    def _schedule_flush(self):
+        if self._flush_timer is not None:
+            return # Įrašymas jau suplanuotas
+        self._flush_timer = threading.Timer(self.write_behind_seconds, self._timer_flush)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    def _timer_flush(self):
+        self._flush_timer = None
+        self.flush()
+
+    @contextmanager
+    def batch(self):
+        """
+        Unit of Work: visi save() bloko viduje virsta vienu įrašymu pabaigoje.
+        Blokai gali būti įdėti vienas į kitą - rašoma tik išorinio bloko pabaigoje.
+        Visą bloką laikomas rašymo užraktas (kitos gijos mato tik užbaigtą būseną).
+        """
+        with self.lock.write():
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and self._dirty:
+                    self.save()
+
+@contextmanager
+def batch_all(*repositories):
+    """Atidaro batch() bloką kelioms repozitorijoms iš karto (pvz., knygos + vartotojai)."""
+    with ExitStack() as stack:
+        for repo in repositories:
+            stack.enter_context(repo.batch())
+        yield
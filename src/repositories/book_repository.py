@@ -8,47 +8,167 @@ CONTEXT:
     į SQL duomenų bazę, reikėtų keisti TIK šį failą, o ne visą programą.
 """
 
+import logging
 import os
+from bisect import bisect_left, insort
+from collections import namedtuple
 from src import data_manager
 from src.models import Book
-from src.data_manager import load_data, save_data, get_data_file_path
+from src.data_manager import load_data, save_data, get_data_file_path, get_store_filename
 from src.config import BOOKS_FILENAME, BACKUP_FILENAME
+from src.repositories.base_repository import (BaseRepository, RESET, ADDED, REMOVED,
+                                               CHANGING, CHANGED)
+from src.repositories.search_index import SearchIndex, normalize
+from src.repositories.rwlock import read_locked, write_locked
 
-class BookRepository:
+logger = logging.getLogger(__name__)
+
+# Vienas puslapis: knygos, visų atitikusių kiekis ir puslapio ribos
+Page = namedtuple('Page', ['items', 'total', 'offset', 'limit'])
+
+class BookRepository(BaseRepository):
     def __init__(self):
         # Nustatome kelius iki pagrindinio failo ir backup failo
-        self.filepath = get_data_file_path(BOOKS_FILENAME)
-        self.backup_path = get_data_file_path(BACKUP_FILENAME)
-        self.books = []
-        self.filename = BOOKS_FILENAME
-        self._load()
+        # (plėtinys priklauso nuo config.STORAGE_FORMAT, pvz., books.json arba books.marshal)
+        self.filename = get_store_filename(BOOKS_FILENAME)
+        self.filepath = get_data_file_path(self.filename)
+        self.backup_path = get_data_file_path(get_store_filename(BACKUP_FILENAME))
+        self._init_persistence()
+        self._start_loading() # Failas skaitomas iškart arba pirmą kartą prireikus (LAZY_LOADING)
+
+    # --- Indeksai ---
+    # Šalia sąrašo laikome:
+    #   - žodyną {id: knyga}, kad get_by_id būtų O(1), o ne O(n);
+    #   - žodyną {id: vieta sąraše}, kad šalinimas būtų O(1) (paskutinė knyga perkeliama į
+    #     atsilaisvinusią vietą, todėl pridėjimo tvarka po trynimo išlaikoma tik apytiksliai);
+    #   - žodyną {(pavadinimas, autorius) mažosiomis: {id: knyga}} dublikatų paieškai (find_by_details);
+    #   - paieškos indeksą (SearchIndex) pavadinimams bei autoriams;
+    #   - antrinius indeksus: {normalizuotas žanras/autorius: {id: knyga}}
+    #     ir surikiuotą [(metai, id)] sąrašą metų intervalams (bisect, O(log n + k));
+    #   - puslapiavimui (page): surikiuotus [(raktas, id)] sąrašus pagal pavadinimą/autorių/žanrą.
+    #     Jie kuriami tik pirmą kartą paprašius, o vėliau palaikomi po O(log n) (insort).
+    # Sąrašą keičiant tik per šios klasės metodus (add, remove, update...), indeksai lieka teisingi.
+
+    # Sukuriami _load() metu; pirmas kreipimasis į juos užkrauna failą (žr. BaseRepository)
+    _LAZY_ATTRIBUTES = ('_books', '_by_id', '_positions', '_search_index', '_by_genre', '_by_author',
+                        '_by_details', '_by_year', '_orders')
+
+    # Laukai, nuo kurių priklauso indeksai (juos keičiant reikia perindeksuoti)
+    INDEXED_FIELDS = ('title', 'author', 'genre', 'year')
+
+    # Laukai, pagal kuriuos galima rikiuoti puslapius (None - pridėjimo tvarka arba atitikimas)
+    SORT_KEYS = ('title', 'author', 'genre', 'year')
+
+    @property
+    def books(self):
+        return self._books
+
+    @books.setter
+    def books(self, value):
+        """Priskyrus naują sąrašą (pvz., atkuriant iš backup), indeksas perstatomas."""
+        self._books = value
+        self._rebuild_indexes()
+
+    @staticmethod
+    def _group_key(value):
+        """Žanro/autoriaus raktas: be tarpų kraštuose, mažosiomis, be diakritikų."""
+        return normalize(value or '').strip()
+
+    @staticmethod
+    def _details_key(title, author):
+        """Raktas (pavadinimas, autorius) dublikatų paieškai - kaip ir anksčiau, be raidžių dydžio."""
+        return (str(title).lower(), str(author).lower())
+
+    @staticmethod
+    def _year_key(book):
+        """Raktas metų indeksui arba None, jei metai neteisingi."""
+        try:
+            return (int(book.year), book.id)
+        except (TypeError, ValueError):
+            return None
+
+    def _rebuild_indexes(self):
+        self._by_id = {book.id: book for book in self._books}
+        self._positions = {book.id: pos for pos, book in enumerate(self._books)}
+        self._search_index = SearchIndex()
+        self._search_index.rebuild(self._books)
+        self._by_genre = {}
+        self._by_author = {}
+        self._by_details = {}
+        for book in self._books:
+            self._by_details.setdefault(self._details_key(book.title, book.author), {})[book.id] = book
+            self._by_genre.setdefault(self._group_key(book.genre), {})[book.id] = book
+            self._by_author.setdefault(self._group_key(book.author), {})[book.id] = book
+        self._by_year = sorted(key for key in map(self._year_key, self._books) if key is not None)
+        self._orders = {} # Surikiuoti sąrašai puslapiavimui (kuriami tingiai)
+        self._notify(RESET, self._books)
+
+    def _index_book(self, book):
+        self._by_id[book.id] = book
+        self._search_index.add(book)
+        self._by_details.setdefault(self._details_key(book.title, book.author), {})[book.id] = book
+        self._by_genre.setdefault(self._group_key(book.genre), {})[book.id] = book
+        self._by_author.setdefault(self._group_key(book.author), {})[book.id] = book
+        year_key = self._year_key(book)
+        if year_key is not None:
+            insort(self._by_year, year_key)
+        for field, order in self._orders.items():
+            insort(order, (normalize(getattr(book, field) or ''), book.id))
+
+    def _unindex_book(self, book, sorted_lists=True):
+        """sorted_lists=False: metų ir puslapiavimo sąrašus tvarko kviečiantysis (remove_many)."""
+        if self._by_id.get(book.id) is not book:
+            return
+        del self._by_id[book.id]
+        self._search_index.remove(book.id)
+        for index, key in ((self._by_genre, self._group_key(book.genre)),
+                           (self._by_author, self._group_key(book.author)),
+                           (self._by_details, self._details_key(book.title, book.author))):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(book.id, None)
+                if not bucket:
+                    del index[key]
+        if not sorted_lists:
+            return
+        year_key = self._year_key(book)
+        if year_key is not None:
+            pos = bisect_left(self._by_year, year_key)
+            if pos < len(self._by_year) and self._by_year[pos] == year_key:
+                del self._by_year[pos]
+        for field, order in self._orders.items():
+            key = (normalize(getattr(book, field) or ''), book.id)
+            pos = bisect_left(order, key)
+            if pos < len(order) and order[pos] == key:
+                del order[pos]
 
     def _load(self):
         """Vidinė funkcija duomenų užkrovimui iš JSON."""
         # 1. Gauname PILNĄ kelią iki failo (pvz., D:\...\data\books.json)
         full_path = data_manager.get_data_file_path(self.filename)
-        print(f"DEBUG: [BookRepository] Skaitoma iš: {full_path}")
+        logger.debug("[BookRepository] Skaitoma iš: %s", full_path)
         
         # 2. Užkrauname naudodami pilną kelią
         data = data_manager.load_data(full_path)
         
         # 3. Konvertuojame
         self.books = [Book(**item) for item in data]
-        print(f"DEBUG: [BookRepository] Užkrauta knygų: {len(self.books)}")
+        logger.debug("[BookRepository] Užkrauta knygų: %d", len(self._books))
 
-    def save(self):
+    def _write(self):
         """
-        Išsaugo visus pakeitimus į JSON failą.
+        Išsaugo visus pakeitimus į JSON failą (kviečiama per save()/flush()).
         SVARBU: Būtina naudoti get_data_file_path, kitaip failas atsiras ne ten!
         """
         # 1. Konvertuojame objektus į žodynus
-        data = [book.__dict__ for book in self.books]
+        data = [book.to_dict() for book in self.books]
         
         # 2. Gauname teisingą kelią (į 'data' aplanką)
         full_path = data_manager.get_data_file_path(self.filename)
         
-        # 3. Įrašome
-        data_manager.save_data(full_path, data)
+        # 3. Įrašome (nepavykus - OSError, kad flush() paliktų pakeitimus neįrašytais)
+        if not data_manager.save_data(full_path, data):
+            raise OSError(f"Nepavyko įrašyti {full_path}")
 
     # --- Duomenų gavimo metodai ---
 
@@ -60,37 +180,275 @@ class BookRepository:
         Suranda knygą pagal ID.
         Svarbu: Lygina pavertus į string, kad išvengtume int vs str problemų.
         """
-        search_id = str(book_id).strip()
-
-        for book in self.books:
-            if book.id == book_id:
-                return book
-        return None
+        book = self._by_id.get(book_id)
+        if book is None and book_id is not None:
+            book = self._by_id.get(str(book_id).strip())
+        return book
 
+    @read_locked
     def find_by_details(self, title, author):
         """
-        Tikrina, ar knyga egzistuoja (tikslus atitikmuo).
-        Naudojama prieš pridedant naują knygą, kad išvengtume dublikatų.
+        Tikrina, ar knyga egzistuoja (tikslus atitikmuo, raidžių dydis nesvarbus).
+        Naudojama prieš pridedant naują knygą, kad išvengtume dublikatų. O(1) per indeksą.
         """
-        for book in self.books:
-            if book.title.lower() == title.lower() and book.author.lower() == author.lower():
-                return book
-        return None
+        bucket = self._by_details.get(self._details_key(title, author))
+        return next(iter(bucket.values())) if bucket else None
 
-    def search(self, query):
+    @read_locked
+    def search(self, query, limit=None):
         """
-        Filtruoja knygas pagal paieškos frazę.
+        Ieško knygų pagal pavadinimo ar autoriaus žodžius (per paieškos indeksą).
+        - Žodžiai gali būti nepilni: "pot" randa "Poteris".
+        - Lietuviškos raidės nesvarbios: "zalgiris" randa "Žalgiris".
+        - Keli žodžiai: turi atitikti visi.
+        Rezultatai surikiuoti pagal atitikimą. Tuščia užklausa grąžina visas knygas.
         """
-        query = query.lower()
-        # Grąžiname naują sąrašą tik su tomis knygomis, kurios atitinka paiešką pagal pavadinimą arba autorių
-        return [b for b in self.books if query in b.title.lower() or query in b.author.lower()]
+        ids = self._search_index.search(query, limit)
+        if ids is None:
+            return self.books[:limit] if limit is not None else list(self.books)
+        return [self._by_id[book_id] for book_id in ids]
+
+    # --- Antrinių indeksų užklausos ---
+
+    @classmethod
+    def _lookup_group(cls, index, value, partial):
+        key = cls._group_key(value)
+        if not partial:
+            return list(index.get(key, {}).values())
+        # Dalinis atitikimas: tikrinami tik skirtingi raktai, o ne visos knygos
+        return [book for name, bucket in index.items() if key in name
+                for book in bucket.values()]
+
+    @read_locked
+    def get_by_genre(self, genre, partial=False):
+        """
+        Visos knygos su šiuo žanru (raidžių dydis ir diakritikai nesvarbūs).
+        partial=True: tinka ir žanro dalis ("fant" -> "Fantastika").
+        """
+        return self._lookup_group(self._by_genre, genre, partial)
+
+    @read_locked
+    def get_by_author(self, author, partial=False):
+        """
+        Visos autoriaus knygos.
+        partial=True: tinka ir vardo dalis ("orwell" -> "George Orwell").
+        """
+        return self._lookup_group(self._by_author, author, partial)
+
+    @read_locked
+    def get_by_year_range(self, min_year=None, max_year=None):
+        """
+        Knygos, išleistos tarp min_year ir max_year (abu imtinai; None = be ribos).
+        Dvejetainė paieška surikiuotame indekse: O(log n + k).
+        """
+        start = 0 if min_year is None else bisect_left(self._by_year, (int(min_year),))
+        if max_year is None:
+            end = len(self._by_year)
+        else:
+            end = bisect_left(self._by_year, (int(max_year) + 1,))
+        return [self._by_id[book_id] for _, book_id in self._by_year[start:end]]
+
+    @read_locked
+    def get_genres(self):
+        """Skirtingi žanrai (kaip parašyti pirmoje knygoje), surikiuoti."""
+        return sorted(next(iter(bucket.values())).genre for key, bucket in self._by_genre.items() if key)
+
+    @read_locked
+    def get_authors(self):
+        """Skirtingi autoriai (kaip parašyti pirmoje knygoje), surikiuoti."""
+        return sorted(next(iter(bucket.values())).author for key, bucket in self._by_author.items() if key)
+
+    # --- Puslapiavimas ---
+
+    def _order(self, sort_key):
+        """Visų knygų ID, surikiuoti pagal lauką (sąrašas [(raktas, id)])."""
+        if sort_key == 'year':
+            return self._by_year
+        order = self._orders.get(sort_key)
+        if order is None:
+            order = sorted((normalize(getattr(book, sort_key) or ''), book.id) for book in self._books)
+            self._orders[sort_key] = order
+        return order
+
+    @staticmethod
+    def _plain_query(filter):
+        """Paieškos tekstas, jei filtras - tik užklausa (be žanro, autoriaus, metų); kitaip None."""
+        if isinstance(filter, dict):
+            rest = {name for name, value in filter.items() if value not in (None, '')}
+            if rest != {'query'}:
+                return None
+            filter = filter['query']
+        return filter if isinstance(filter, str) and filter else None
+
+    def _filter_ids(self, filter):
+        """
+        Filtro atitikmenys per indeksus: (ID aibė, ID tvarka pagal atitikimą arba None).
+        Grąžina (None, None), jei filtro nėra.
+        """
+        if isinstance(filter, str):
+            filter = {'query': filter}
+        filter = {name: value for name, value in (filter or {}).items() if value not in (None, '')}
+        unknown = set(filter) - {'query', 'genre', 'author', 'min_year', 'max_year'}
+        if unknown:
+            raise ValueError(f"Nežinomas filtras: {', '.join(sorted(unknown))}")
+
+        groups = []
+        ranked = None
+        if 'query' in filter:
+            ranked = self._search_index.search(filter['query'])
+            if ranked is not None: # Tuščia užklausa (vien skyrybos ženklai) nieko nefiltruoja
+                groups.append(ranked)
+        if 'genre' in filter:
+            groups.append(self._by_genre.get(self._group_key(filter['genre']), {}))
+        if 'author' in filter:
+            groups.append(self._by_author.get(self._group_key(filter['author']), {}))
+        if 'min_year' in filter or 'max_year' in filter:
+            groups.append([book.id for book in self.get_by_year_range(filter.get('min_year'),
+                                                                      filter.get('max_year'))])
+        if not groups:
+            return None, None
+        # Sankirta pradedama nuo mažiausios grupės
+        groups.sort(key=len)
+        ids = set(groups[0])
+        for group in groups[1:]:
+            ids.intersection_update(group)
+        return ids, ranked
+
+    @read_locked
+    def page(self, offset=0, limit=20, sort_key='title', filter=None, descending=False):
+        """
+        Grąžina vieną knygų puslapį (Page: items, total, offset, limit).
+
+        Parametrai:
+        - offset, limit: kelintą įrašą pradėti ir kiek grąžinti.
+        - sort_key: 'title', 'author', 'genre', 'year' arba None
+          (None: pagal paieškos atitikimą, jei yra užklausa, kitaip - pridėjimo tvarka).
+        - filter: paieškos tekstas arba žodynas su raktais
+          'query', 'genre', 'author', 'min_year', 'max_year' (tikrinami per indeksus).
+        - descending: atvirkštinė tvarka.
+
+        Sąnaudos nepriklauso nuo katalogo dydžio: be filtro - pjūvis iš surikiuoto indekso,
+        su mažu filtru - rikiuojami tik atitikmenys.
+        """
+        if sort_key is not None and sort_key not in self.SORT_KEYS:
+            raise ValueError(f"Nežinomas rikiavimo laukas: {sort_key}")
+        offset, limit = max(0, int(offset)), max(0, int(limit))
+
+        query = self._plain_query(filter)
+        if sort_key is None and not descending and query is not None:
+            # Vien paieška pagal atitikimą: reitinguojama tik iki šio puslapio galo,
+            # o bendras kiekis imamas iš indekso (be viso rezultatų sąrašo rikiavimo)
+            total = self._search_index.count(query)
+            if total is not None:
+                selected = self._search_index.search(query, offset + limit)[offset:]
+                return Page([self._by_id[book_id] for book_id in selected], total, offset, limit)
+
+        ids, ranked = self._filter_ids(filter)
+
+        if sort_key is None:
+            if ranked is not None:
+                order = [book_id for book_id in ranked if book_id in ids]
+            elif ids is None:
+                order = [book.id for book in self._books]
+            else:
+                order = [book.id for book in self._books if book.id in ids]
+            total = len(order)
+            if descending:
+                order.reverse()
+            selected = order[offset:offset + limit]
+        elif ids is None:
+            order = self._order(sort_key)
+            total = len(order)
+            if descending:
+                start = max(0, total - offset - limit)
+                selected = [book_id for _, book_id in reversed(order[start:total - offset])]
+            else:
+                selected = [book_id for _, book_id in order[offset:offset + limit]]
+        else:
+            total = len(ids)
+            order = self._order(sort_key)
+            if total * 8 < len(order):
+                # Mažai atitikmenų: rikiuojame tik juos
+                if sort_key == 'year':
+                    keys = [key for key in (self._year_key(self._by_id[book_id]) for book_id in ids)
+                            if key is not None]
+                else:
+                    keys = [(normalize(getattr(self._by_id[book_id], sort_key) or ''), book_id)
+                            for book_id in ids]
+                keys.sort(reverse=descending)
+                selected = [book_id for _, book_id in keys[offset:offset + limit]]
+            else:
+                # Daug atitikmenų: einame surikiuotu indeksu ir praleidžiame netinkamus
+                walk = reversed(order) if descending else order
+                matches = (book_id for _, book_id in walk if book_id in ids)
+                selected = [book_id for _, book_id in zip(range(offset + limit), matches)][offset:]
+
+        return Page([self._by_id[book_id] for book_id in selected], total, offset, limit)
+
+    # Kandidatai masiniam nurašymui: tik knygos, kurių nė viena kopija nepaskolinta
+    def get_candidates_by_author(self, author):
+        return [b for b in self.get_by_author(author, partial=True) if b.available_copies == b.total_copies]
+
+    def get_candidates_by_genre(self, genre):
+        return [b for b in self.get_by_genre(genre) if b.available_copies == b.total_copies]
+
+    def get_candidates_by_year(self, year):
+        """Knygos, išleistos ANKSČIAU nei nurodyti metai."""
+        return [b for b in self.get_by_year_range(max_year=int(year) - 1)
+                if b.available_copies == b.total_copies]
 
     # --- Modifikavimo metodai ---
 
+    @write_locked
     def add(self, book):
+        self._positions[book.id] = len(self._books)
         self.books.append(book)
+        self._index_book(book)
+        self._notify(ADDED, book)
+        self.save()
+
+    @write_locked
+    def add_many(self, books):
+        """
+        Prideda daug knygų ir išsaugo VIENĄ kartą (masiniam importui).
+        Jei naujų knygų daug, indeksai perstatomi vieną kartą (RESET),
+        užuot kiekvieną knygą įterpus atskirai.
+        """
+        books = list(books)
+        if not books:
+            return 0
+        if len(books) > max(1000, len(self._books) // 4):
+            self.books = self._books + books
+        else:
+            for book in books:
+                self._positions[book.id] = len(self._books)
+                self._books.append(book)
+                self._index_book(book)
+                self._notify(ADDED, book)
         self.save()
+        return len(books)
 
+    @write_locked
+    def update(self, book, **fields):
+        """
+        Pakeičia knygos laukus (pvz., update(book, title="...", year=2001)) ir išsaugo.
+        Jei keičiami indeksuojami laukai (pavadinimas, autorius, žanras, metai), knyga perindeksuojama.
+        """
+        reindex = any(
+            name in self.INDEXED_FIELDS and getattr(book, name) != value
+            for name, value in fields.items()
+        )
+        self._notify(CHANGING, book)
+        if reindex:
+            self._unindex_book(book)
+        for name, value in fields.items():
+            setattr(book, name, value)
+        if reindex:
+            self._index_book(book)
+        self._notify(CHANGED, book)
+        self.save()
+
+    @write_locked
     def remove(self, book_id):
         """Šalina vieną knygą ir IŠKART saugo (standartinis trynimas)."""
         if self.remove_without_save(book_id):
@@ -98,6 +456,7 @@ class BookRepository:
             return True
         return False
 
+    @write_locked
     def remove_without_save(self, book_id):
         """
         Pagalbinis metodas: Tik pašalina iš atminties.
@@ -105,10 +464,53 @@ class BookRepository:
         """
         book = self.get_by_id(book_id)
         if book:
-            self.books.remove(book)
+            self._take_out(book)
+            self._unindex_book(book)
+            self._notify(REMOVED, book)
             return True
         return False
 
+    def _take_out(self, book):
+        """Išima knygą iš sąrašo per O(1): jos vietą užima paskutinė knyga."""
+        pos = self._positions.pop(book.id)
+        last = self._books.pop()
+        if last is not book:
+            self._books[pos] = last
+            self._positions[last.id] = pos
+
+    @write_locked
+    def remove_many(self, book_ids):
+        """
+        Pašalina daug knygų ir išsaugo VIENĄ kartą (masiniam trynimui).
+        Kelios knygos šalinamos po vieną (O(1) kiekviena), o didesniam kiekiui sąrašas ir
+        surikiuoti indeksai perrenkami vieną kartą - pridėjimo tvarka išlaikoma.
+        Grąžina pašalintų knygų kiekį.
+        """
+        books = {}
+        for book_id in book_ids:
+            book = self.get_by_id(book_id)
+            if book is not None:
+                books[book.id] = book
+        if not books:
+            return 0
+        if len(books) <= 64:
+            for book in books.values():
+                self._take_out(book)
+                self._unindex_book(book)
+                self._notify(REMOVED, book)
+        else:
+            self._books[:] = [book for book in self._books if book.id not in books]
+            self._positions = {book.id: pos for pos, book in enumerate(self._books)}
+            for book in books.values():
+                self._unindex_book(book, sorted_lists=False)
+                self._notify(REMOVED, book)
+            self._by_year[:] = [key for key in self._by_year if key[1] not in books]
+            for order in self._orders.values():
+                order[:] = [key for key in order if key[1] not in books]
+        self.save()
+        return len(books)
+
+    @write_locked
     def restore_backup(self):
         """
         Speciali funkcija: atstato duomenis iš atsarginės kopijos.
@@ -117,7 +519,7 @@ class BookRepository:
             return False, "Backup failas nerastas."
         try:
             data = load_data(self.backup_path)
-            self.books = [Book.from_dict(item) for item in data]
+            self.books = [Book.from_dict(item) for item in data] # Indeksas perstatomas automatiškai
             self.save() # Iškart perrašome ir pagrindinį failą
             return True, f"Sėkmingai atkurta {len(self.books)} knygų."
         except Exception as e:
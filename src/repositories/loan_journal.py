@@ -0,0 +1,172 @@
+"""
+FILE: src/repositories/loan_journal.py
+PURPOSE: Tik papildomas (append-only) paskolų įvykių žurnalas (borrow / return / renew).
+RELATIONSHIPS:
+  - Į jį rašo LoanService (vietoje viso users.json perrašymo po kiekvienos paskolos).
+  - UserRepository jį "pakartoja" (replay) užkrovimo metu ir pasuka (rotate) po pilno įrašymo.
+  - StatsService skaito visą istoriją (history()).
+CONTEXT:
+  - Kiekviena operacija - viena JSON eilutė faile loan_journal.jsonl (O(1) įrašymas).
+  - Skaitytojų būsena = paskutinis users.json "momentinis vaizdas" (snapshot) + žurnalo įvykiai.
+  - Kai users.json įrašomas pilnai, aktyvus žurnalas perkeliamas į loan_history.jsonl
+    (kompaktavimas): startuojant reikia pakartoti tik naujus įvykius, o istorija išlieka.
+  - Įvykiai taikomi idempotentiškai (borrow = "paskola yra", return = "paskolos nėra"),
+    todėl pakartotinis žurnalo pritaikymas ant naujesnio snapshot nesugadina duomenų.
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from src.models import Loan
+
+class LoanJournal:
+    BORROW = "borrow"
+    RETURN = "return"
+    RENEW = "renew"
+
+    def __init__(self, journal_path, history_path, fsync=False):
+        self.journal_path = journal_path
+        self.history_path = history_path
+        self.fsync = fsync
+        self.pending = self._count_lines(journal_path) # Įvykiai nuo paskutinio snapshot
+        self._file = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _count_lines(path):
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as f:
+            return sum(1 for _ in f)
+
+    # --- Rašymas ---
+
+    def append(self, op, user_id, book_id, title=None, due_date=None):
+        """Prideda vieną įvykį į žurnalo galą."""
+        return self.append_many([(op, user_id, book_id, title, due_date)])[0]
+
+    def append_many(self, changes):
+        """
+        Prideda kelis įvykius vienu rašymu (vienas flush/fsync visai grupei).
+        changes: [(op, user_id, book_id, title, due_date), ...]
+        """
+        events = [self._event(*change) for change in changes]
+        if not events:
+            return events
+        data = "".join(json.dumps(event, ensure_ascii=False) + "\n" for event in events)
+        with self._lock:
+            if self._file is None:
+                directory = os.path.dirname(self.journal_path)
+                if directory and not os.path.exists(directory):
+                    os.makedirs(directory)
+                self._file = open(self.journal_path, 'a', encoding='utf-8')
+            self._file.write(data)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.pending += len(events)
+        return events
+
+    @staticmethod
+    def _event(op, user_id, book_id, title=None, due_date=None):
+        event = {
+            "ts": datetime.now().isoformat(timespec='seconds'),
+            "op": op,
+            "user_id": user_id,
+            "book_id": book_id,
+        }
+        if title is not None:
+            event["title"] = title
+        if due_date is not None:
+            event["due_date"] = due_date
+        return event
+
+    def rotate(self):
+        """
+        Kompaktavimas: kviečiamas PO to, kai vartotojų snapshot sėkmingai įrašytas.
+        Aktyvaus žurnalo įvykiai perkeliami į istoriją, aktyvus žurnalas ištuštinamas.
+        """
+        with self._lock:
+            self.close()
+            if not os.path.exists(self.journal_path):
+                self.pending = 0
+                return
+            with open(self.journal_path, 'r', encoding='utf-8') as src, \
+                 open(self.history_path, 'a', encoding='utf-8') as dst:
+                for line in src:
+                    dst.write(line)
+                dst.flush()
+                if self.fsync:
+                    os.fsync(dst.fileno())
+            os.remove(self.journal_path)
+            self.pending = 0
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # --- Skaitymas ---
+
+    @staticmethod
+    def _read_events(path):
+        """Generatorius: po vieną įvykį, neužkraunant viso failo į atmintį."""
+        if not os.path.exists(path):
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Dažniausiai - nutrūkusi paskutinė eilutė po avarijos
+                    logging.warning(f"Praleidžiama sugadinta žurnalo eilutė {path}:{line_no}")
+
+    def events(self):
+        """Aktyvaus žurnalo (dar nekompaktuoti) įvykiai."""
+        return self._read_events(self.journal_path)
+
+    def history(self):
+        """Visa paskolų istorija: archyvas + aktyvus žurnalas."""
+        yield from self._read_events(self.history_path)
+        yield from self._read_events(self.journal_path)
+
+    # --- Atkūrimas ---
+
+    def replay(self, user_repository):
+        """Pritaiko aktyvaus žurnalo įvykius skaitytojų paskoloms. Grąžina pritaikytų kiekį."""
+        applied = 0
+        for event in self.events():
+            if self.apply(user_repository, event):
+                applied += 1
+        return applied
+
+    @classmethod
+    def apply(cls, user_repository, event):
+        """Idempotentiškai pritaiko vieną įvykį. Grąžina False, jei skaitytojas nerastas."""
+        user = user_repository.get_by_id(event.get("user_id"))
+        if not user or user.role != 'reader':
+            return False
+
+        book_id = event.get("book_id")
+        loan = next((l for l in user.active_loans if l['book_id'] == book_id), None)
+        op = event.get("op")
+
+        # Keičiame per repozitoriją, kad būtų atnaujinti jos indeksai (pvz., terminų)
+        if op == cls.BORROW:
+            if loan is None:
+                user_repository.add_loan(
+                    user, Loan(book_id, event.get("title", ""), event.get("due_date"))
+                )
+            else:
+                user_repository.set_loan_due(user, loan, event.get("due_date", loan['due_date']))
+        elif op == cls.RETURN:
+            if loan is not None:
+                user_repository.remove_loan(user, loan)
+        elif op == cls.RENEW:
+            if loan is not None:
+                user_repository.set_loan_due(user, loan, event.get("due_date", loan['due_date']))
+        return True
@@ -0,0 +1,48 @@
+"""
+FILE: src/repositories/memory_repository.py
+PURPOSE: Repozitorijos be disko: duomenys laikomi tik atmintyje (Library(backend="memory")).
+RELATIONSHIPS:
+  - Paveldi BookRepository ir UserRepository (tas pats viešas API, indeksai, įvykiai, užraktai).
+  - Pradiniai duomenys - Book/User objektai arba žodynai (pvz., iš JSON fiktūros
+    ar benchmarks/synthetic.py generatoriaus).
+CONTEXT:
+  - Testams, matavimams ir laikinoms sesijoms: nereikia MagicMock'inti save(),
+    neskaitomas ir neperrašomas bendras data/ aplankas.
+  - save()/flush()/batch() logika lieka ta pati, tik _write() nieko nerašo -
+    jis suskaičiuoja įrašymus (writes), kad testai galėtų patikrinti, kiek kartų būtų rašyta.
+"""
+
+from src.models import Book
+from src.repositories.book_repository import BookRepository
+from src.repositories.user_repository import UserRepository
+
+class MemoryBookRepository(BookRepository):
+    def __init__(self, books=None):
+        self._seed = list(books or [])
+        self.writes = 0 # Kiek kartų būtų rašyta į diską
+        super().__init__()
+
+    def _load(self):
+        """Pradiniai duomenys vietoje failo (žodynai paverčiami Book objektais)."""
+        self.books = [Book.from_dict(item) if isinstance(item, dict) else item for item in self._seed]
+        self._seed = None
+
+    def _write(self):
+        self.writes += 1
+
+    def restore_backup(self):
+        return False, "Atmintyje laikomi duomenys atsarginės kopijos neturi."
+
+class MemoryUserRepository(UserRepository):
+    def __init__(self, users=None):
+        self._seed = list(users or [])
+        self.writes = 0
+        super().__init__()
+
+    def _load(self):
+        users = (self.user_from_dict(item) if isinstance(item, dict) else item for item in self._seed)
+        self.users = [user for user in users if user is not None]
+        self._seed = None
+
+    def _write(self):
+        self.writes += 1
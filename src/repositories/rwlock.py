@@ -0,0 +1,114 @@
+"""
+FILE: src/repositories/rwlock.py
+PURPOSE: Skaitytojų-rašytojų užraktas (readers-writer lock) bendriems duomenims.
+RELATIONSHIPS:
+  - Library sukuria vieną užraktą ir perduoda jį abiem repozitorijoms (use_lock).
+  - Repozitorijų keitimo metodai ir servisų transakcijos ima write(), paieškos - read().
+CONTEXT:
+  - Streamlit aptarnauja kiekvieną naršyklės sesiją atskiroje gijoje, o Library dabar
+    viena visam procesui. Skaityti gali daug gijų vienu metu, keisti - tik viena.
+  - Rašytojai turi pirmenybę: laukiant rašytojui, nauji skaitytojai nebeįleidžiami
+    (kitaip nuolatinės paieškos galėtų rašytoją "užbadauti").
+  - Užraktas pakartotinis (reentrant): tos pačios gijos write() viduje galima vėl kviesti
+    write() ar read() (pvz., return_all_books -> return_book -> repo.update).
+    Pakelti read() į write() negalima - tai iškart meta klaidą, o ne užstringa.
+"""
+
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+class RWLock:
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0           # Gijų, laikančių read(), kiekis
+        self._writer = None         # Rašančios gijos ID
+        self._writer_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    def _read_depth(self):
+        return getattr(self._local, 'depth', 0)
+
+    # --- Skaitymas ---
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        depth = self._read_depth()
+        if depth or self._writer == me:
+            # Jau turime read() arba write() - įleidžiame be laukimo
+            self._local.depth = depth + 1
+            return
+        with self._cond:
+            while self._writer is not None or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+        self._local.depth = 1
+
+    def release_read(self):
+        depth = self._read_depth() - 1
+        self._local.depth = depth
+        if depth or self._writer == threading.get_ident():
+            return
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    # --- Rašymas ---
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            if self._read_depth():
+                raise RuntimeError("Negalima pakelti read() užrakto į write() (būtų amžinas laukimas).")
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._writer_depth = 1
+
+    def release_write(self):
+        with self._cond:
+            self._writer_depth -= 1
+            if self._writer_depth == 0:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+# --- Dekoratoriai metodams (objektas turi turėti atributą 'lock') ---
+
+def write_locked(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock.write():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+def read_locked(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock.read():
+            return method(self, *args, **kwargs)
+    return wrapper
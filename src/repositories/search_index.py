@@ -0,0 +1,341 @@
+"""
+FILE: src/repositories/search_index.py
+PURPOSE: Atvirkštinis (inverted) paieškos indeksas knygų pavadinimams ir autoriams.
+RELATIONSHIPS:
+  - Naudojamas BookRepository.search() (indeksą palaiko add/remove/update).
+CONTEXT:
+  - Vietoje to, kad kiekviena paieška perrinktų VISAS knygas, iš anksto laikome
+    žodyną {žodis: knygų ID aibė}. Paieška tampa kelių aibių sankirta.
+  - Palaikoma:
+      * prefiksų paieška ("haris pot" randa "Haris Poteris"),
+      * lietuviškų raidžių suvienodinimas (ą->a, š->s, ...), pvz., "zalgiris" randa "Žalgiris",
+      * keli žodžiai = visi turi atitikti (AND),
+      * rikiavimas pagal atitikimo kokybę ir rezultatų limitas.
+  - Sąnaudos: retų žodžių paieška - dalys milisekundės. Trumpi/dažni prefiksai atitinka
+    dešimtis tūkstančių knygų, todėl:
+      * vienos raidės žodis ieškomas tik kaip pilnas žodis (_MIN_PREFIX_LENGTH, skaičiai - išimtis);
+      * su limitu vieno žodžio paieška eina pagal pavadinimą surikiuotais žodžių sąrašais
+        ir sustoja surinkusi limit knygų (visų atitikmenų aibė nejungiama);
+      * prefikso atitikmenų aibės kešuojamos (_match_cache) iki kito indekso pakeitimo,
+        todėl kiti tos pačios paieškos puslapiai ir count() nejungia aibių iš naujo.
+    Pirmoji kelių dažnų prefiksų užklausa (pvz., "pa ka" 500k kataloge) vis dar trunka
+    keliolika ms - aibių sankirta neišvengiama.
+"""
+
+import bisect
+import heapq
+import re
+import unicodedata
+from collections import Counter
+
+# Lietuviškos raidės verčiamos tiesiogiai (greičiau nei bendra unicode normalizacija)
+_LT_FOLD = str.maketrans("ąčęėįšųūžĄČĘĖĮŠŲŪŽ", "aceeisuuzACEEISUUZ")
+_TOKEN_RE = re.compile(r"\w+")
+
+# Taškai už kiekvieno užklausos žodžio atitikimą (knygos taškai = visų žodžių suma).
+# Tik autoriaus vardo prefiksas = 0 taškų (knyga vis tiek tinka, bet rodoma paskutinė).
+_SCORE_TITLE_EXACT = 3
+_SCORE_TITLE_PREFIX = 2
+_SCORE_AUTHOR_EXACT = 1
+
+# Trumpesni žodžiai ieškomi tik kaip pilni žodžiai (ne prefiksai): "a" atitiktų pusę katalogo.
+# Skaičiai - išimtis ("knyga 1" -> 10, 11...): jie pavadinimuose reti, aibės mažos.
+_MIN_PREFIX_LENGTH = 2
+# Kiek skirtingų žodžių atitikmenų aibių laikyti kešuose (pilnas kešas - išvalomas)
+_MATCH_CACHE_SIZE = 64
+
+def normalize(text):
+    """Mažosios raidės be diakritikų: 'Žiedų Valdovas' -> 'ziedu valdovas'."""
+    text = str(text).translate(_LT_FOLD).lower()
+    if text.isascii():
+        return text
+    # Kitos kalbos (é, ö...): išskaidome ir išmetame kirčio ženklus
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+def tokenize(text):
+    """Tekstas -> normalizuotų žodžių sąrašas."""
+    return _TOKEN_RE.findall(normalize(text))
+
+class SearchIndex:
+    def __init__(self):
+        self._postings = {}       # žodis -> {book_id, ...} (pavadinime ARBA autoriuje)
+        self._title_postings = {} # žodis -> {book_id, ...} (tik pavadinime, rikiavimui)
+        self._vocabulary = []     # surūšiuoti visi žodžiai (prefiksų paieškai per bisect)
+        self._docs = {}           # book_id -> (pavadinimo žodžiai, autoriaus žodžiai)
+        self._sort_keys = {}      # book_id -> normalizuotas pavadinimas (vienodų taškų rikiavimui)
+        self._sorted_cache = {}   # žodis -> jo pavadinimo ID sąrašas, surikiuotas pagal pavadinimą
+        self._sorted_all_cache = {} # žodis -> visų (pavadinimo ir autoriaus) ID sąrašas, surikiuotas
+        self._match_cache = {}    # užklausos žodis -> atitinkančių ID aibė (išvaloma pakeitus indeksą)
+
+    def __len__(self):
+        return len(self._docs)
+
+    # --- Palaikymas ---
+
+    def _add_doc(self, book):
+        title_tokens = tuple(tokenize(book.title))
+        author_tokens = tuple(tokenize(book.author))
+        self._docs[book.id] = (title_tokens, author_tokens)
+        self._sort_keys[book.id] = normalize(book.title)
+        new_tokens = []
+        for token in set(title_tokens):
+            self._title_postings.setdefault(token, set()).add(book.id)
+            self._sorted_cache.pop(token, None)
+        for token in set(title_tokens + author_tokens):
+            self._sorted_all_cache.pop(token, None)
+            ids = self._postings.get(token)
+            if ids is None:
+                self._postings[token] = {book.id}
+                new_tokens.append(token)
+            else:
+                ids.add(book.id)
+        return new_tokens
+
+    def add(self, book):
+        """Įtraukia knygą į indeksą (jei jau yra - atnaujina)."""
+        if book.id in self._docs:
+            self.remove(book.id)
+        self._match_cache = {}
+        for token in self._add_doc(book):
+            bisect.insort(self._vocabulary, token)
+
+    def remove(self, book_id):
+        """Pašalina knygą iš indekso."""
+        doc = self._docs.pop(book_id, None)
+        if doc is None:
+            return
+        del self._sort_keys[book_id]
+        self._match_cache = {}
+        for token in set(doc[0]):
+            self._sorted_cache.pop(token, None)
+            ids = self._title_postings.get(token)
+            if ids is not None:
+                ids.discard(book_id)
+                if not ids:
+                    del self._title_postings[token]
+        for token in set(doc[0] + doc[1]):
+            self._sorted_all_cache.pop(token, None)
+            ids = self._postings.get(token)
+            if ids is None:
+                continue
+            ids.discard(book_id)
+            if not ids:
+                del self._postings[token]
+                pos = bisect.bisect_left(self._vocabulary, token)
+                if pos < len(self._vocabulary) and self._vocabulary[pos] == token:
+                    del self._vocabulary[pos]
+
+    def rebuild(self, books):
+        """Perstato indeksą iš naujo (pvz., užkrovus visą sąrašą)."""
+        self._postings = {}
+        self._title_postings = {}
+        self._docs = {}
+        self._sort_keys = {}
+        self._sorted_cache = {}
+        self._sorted_all_cache = {}
+        self._match_cache = {}
+        for book in books:
+            self._add_doc(book)
+        self._vocabulary = sorted(self._postings)
+
+    # --- Paieška ---
+
+    def _expand(self, prefix):
+        """Visi žodyno žodžiai, prasidedantys šiuo prefiksu (trumpas žodis - tik jis pats)."""
+        if len(prefix) < _MIN_PREFIX_LENGTH and not prefix.isdigit():
+            return [prefix] if prefix in self._postings else []
+        vocabulary = self._vocabulary
+        pos = bisect.bisect_left(vocabulary, prefix)
+        tokens = []
+        while pos < len(vocabulary) and vocabulary[pos].startswith(prefix):
+            tokens.append(vocabulary[pos])
+            pos += 1
+        return tokens
+
+    @staticmethod
+    def _union(postings, tokens):
+        sets = [postings[t] for t in tokens if t in postings]
+        if not sets:
+            return set()
+        if len(sets) == 1:
+            return set(sets[0])
+        return set().union(*sets)
+
+    def _matches(self, term):
+        """Knygos, kurių pavadinime ar autoriuje yra žodis, prasidedantis 'term' (kešuojama)."""
+        ids = self._match_cache.get(term)
+        if ids is None:
+            if len(self._match_cache) >= _MATCH_CACHE_SIZE:
+                self._match_cache = {}
+            ids = self._match_cache[term] = self._union(self._postings, self._expand(term))
+        return ids # Bendra kešo aibė - jos nekeisti vietoje
+
+    def _candidates(self, terms):
+        """Knygos, atitinkančios VISUS žodžius. Pradedame nuo ilgiausio - jis atrenka mažiausiai."""
+        candidates = None
+        for term in sorted(terms, key=len, reverse=True):
+            ids = self._matches(term)
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return set()
+        return candidates
+
+    def count(self, query):
+        """Kiek knygų atitinka užklausą (None - užklausoje nėra žodžių, tinka visos)."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return None
+        return len(self._candidates(terms))
+
+    def search(self, query, limit=None):
+        """
+        Grąžina knygų ID sąrašą, surikiuotą pagal atitikimą (geriausi pirmi).
+        Grąžina None, jei užklausoje nėra nė vieno žodžio (t.y. tinka visos knygos).
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return None
+        if limit is not None and limit <= 0:
+            return []
+
+        # Greitas kelias: jei užtenka knygų, kuriose VISI žodžiai yra pilni pavadinimo žodžiai,
+        # rezultatas paimamas iš surikiuoto sąrašo pradžios be jokio kitų pakopų skaičiavimo.
+        if limit is not None:
+            top = self._top_title_matches(terms, limit)
+            if top is not None:
+                return top
+            if len(terms) == 1:
+                return self._top_single(terms[0], limit)
+
+        # 1. Atranka: kiekvienas žodis (kaip prefiksas) turi būti pavadinime arba autoriuje.
+        candidates = self._candidates(terms)
+        if not candidates:
+            return []
+        expanded = {term: self._expand(term) for term in terms}
+
+        # 2. Kiekvienam žodžiui kandidatai suskirstomi į nesikertančias pakopas
+        # (aibių operacijos vyksta C lygyje, o ne tikrinant kiekvieną knygą Python cikle)
+        tiers_per_term = [self._tiers(term, expanded[term], candidates) for term in terms]
+
+        if len(tiers_per_term) == 1:
+            buckets = {score: ids for score, ids in tiers_per_term[0] if ids}
+        else:
+            scores = Counter()
+            for tiers in tiers_per_term:
+                for score, ids in tiers:
+                    for _ in range(score):
+                        scores.update(ids)
+            buckets = {}
+            for book_id, score in scores.items():
+                buckets.setdefault(score, []).append(book_id)
+            unscored = candidates.difference(scores)
+            if unscored:
+                buckets[0] = unscored
+
+        # 3. Rikiavimas: pagal taškus, o vienodų taškų grupėje - pagal pavadinimą.
+        # Su limitu rikiuojame tik tiek, kiek reikia (heapq.nsmallest).
+        sort_key = self._sort_keys.__getitem__
+        result = []
+        for score in sorted(buckets, reverse=True):
+            bucket = buckets[score]
+            needed = None if limit is None else limit - len(result)
+            if needed is not None and needed <= 0:
+                break
+            if needed is None or len(bucket) <= needed:
+                result.extend(sorted(bucket, key=sort_key))
+            else:
+                result.extend(heapq.nsmallest(needed, bucket, key=sort_key))
+        return result
+
+    def _top_title_matches(self, terms, limit):
+        """
+        Pirmosios `limit` knygų (pagal pavadinimą), kurių pavadinime yra VISI žodžiai.
+        Grąžina None, jei tokių knygų mažiau nei limitas (tada reikia pilno rikiavimo).
+        """
+        postings = [self._title_postings.get(term) for term in terms]
+        if not all(postings):
+            return None
+        rarest = min(range(len(terms)), key=lambda i: len(postings[i]))
+        ordered = self._sorted(self._title_postings, self._sorted_cache, terms[rarest])
+        if len(terms) == 1:
+            return ordered[:limit] if len(ordered) >= limit else None
+
+        matched = set.intersection(*postings)
+        if len(matched) < limit:
+            return None
+        if len(matched) * 8 < len(ordered):
+            # Retas derinys: surikiuoti tik atitikmenis pigiau nei eiti ilgu sąrašu
+            return heapq.nsmallest(limit, matched, key=self._sort_keys.__getitem__)
+        result = []
+        for book_id in ordered:
+            if book_id in matched:
+                result.append(book_id)
+                if len(result) == limit:
+                    break
+        return result
+
+    def _sorted(self, postings, cache, token):
+        """Žodžio ID sąrašas, surikiuotas pagal pavadinimą (rikiuojama vieną kartą, kol žodis nepasikeičia)."""
+        ordered = cache.get(token)
+        if ordered is None:
+            ordered = cache[token] = sorted(postings.get(token, ()), key=self._sort_keys.__getitem__)
+        return ordered
+
+    def _top_single(self, term, limit):
+        """
+        Vieno žodžio paieška su limitu: pakopos (kaip _tiers) imamos iš eilės, o kiekvienos
+        pakopos knygos - sujungus (heapq.merge) pagal pavadinimą surikiuotus žodžių sąrašus.
+        Sustojama surinkus limit knygų, todėl dažnas prefiksas nejungia visų atitikmenų.
+        """
+        tokens = self._expand(term)
+        token_set = set(tokens)
+        docs = self._docs
+
+        def score(book_id):
+            title, author = docs[book_id]
+            if term in title:
+                return _SCORE_TITLE_EXACT
+            if not token_set.isdisjoint(title):
+                return _SCORE_TITLE_PREFIX
+            if term in author:
+                return _SCORE_AUTHOR_EXACT
+            return 0
+
+        title_lists = [self._sorted(self._title_postings, self._sorted_cache, t) for t in tokens]
+        all_lists = [self._sorted(self._postings, self._sorted_all_cache, t) for t in tokens]
+        streams = [
+            (_SCORE_TITLE_EXACT, self._sorted(self._title_postings, self._sorted_cache, term)),
+            (_SCORE_TITLE_PREFIX, heapq.merge(*title_lists, key=self._sort_keys.__getitem__)),
+            (_SCORE_AUTHOR_EXACT, self._sorted(self._postings, self._sorted_all_cache, term)),
+            (0, heapq.merge(*all_lists, key=self._sort_keys.__getitem__)),
+        ]
+        result = []
+        for tier, stream in streams:
+            seen = set()
+            for book_id in stream:
+                if book_id in seen or score(book_id) != tier:
+                    continue
+                seen.add(book_id)
+                result.append(book_id)
+                if len(result) == limit:
+                    return result
+        return result
+
+    def _tiers(self, term, tokens, candidates):
+        """
+        Suskirsto kandidatus pagal tai, kaip šis žodis juos atitiko:
+        [(taškai, aibė), ...] nuo geriausio iki blogiausio, aibės nesikerta.
+        """
+        empty = set()
+        title_exact = self._title_postings.get(term, empty) & candidates
+        title_prefix = self._union(self._title_postings, tokens) & candidates
+        title_prefix -= title_exact
+        author_exact = self._postings.get(term, empty) & candidates
+        author_exact -= title_exact
+        author_exact -= title_prefix
+        rest = candidates - title_exact - title_prefix - author_exact
+        return [(_SCORE_TITLE_EXACT, title_exact),
+                (_SCORE_TITLE_PREFIX, title_prefix),
+                (_SCORE_AUTHOR_EXACT, author_exact),
+                (0, rest)]
@@ -0,0 +1,90 @@
+"""
+FILE: src/repositories/sqlite_book_repository.py
+PURPOSE: Knygų repozitorija, saugojanti duomenis SQLite 'books' lentelėje.
+RELATIONSHIPS:
+  - Paveldi BookRepository (tas pats viešas API: get_all, get_by_id, search, add, remove, save).
+  - Naudoja src/database.py prisijungimui ir lentelių kūrimui.
+CONTEXT:
+  - JSON versija kiekvieno save() metu perrašo VISĄ failą. Čia repozitorija klauso savo
+    pačios įvykių (ADDED/CHANGED/REMOVED) ir įsimena pakeistų knygų ID, o save() rašo TIK
+    jas (pvz., skolinimas paliečia vieną eilutę) - be viso katalogo perrinkimo ar kopijos.
+  - RESET (visas sąrašas pakeistas, pvz., didelis importas ar backup atkūrimas) -
+    lentelė perrašoma visa vienoje transakcijoje.
+  - Knygų laukus keiskite per repozitoriją (update), kitaip pakeitimas nebus įrašytas.
+  - Ryšys imamas iš telkinio (database.connection) - neatidaromas kiekvienam save().
+"""
+
+import sqlite3
+
+from src import database
+from src.models import Book
+from src.repositories.base_repository import RESET, ADDED, CHANGED, REMOVED
+from src.repositories.book_repository import BookRepository
+
+BOOK_COLUMNS = ('id', 'title', 'author', 'year', 'genre', 'total_copies', 'available_copies')
+
+class SqliteBookRepository(BookRepository):
+    def __init__(self, db_file=None):
+        self.db_file = db_file or database.DB_FILE
+        database.initialize_db(self.db_file)
+        # Neįrašyti pakeitimai: pakeistų/naujų ir ištrintų knygų ID
+        self._changed_ids = set()
+        self._removed_ids = set()
+        self._rewrite_all = False
+        self.subscribe(self._track_change)
+        super().__init__()
+
+    @staticmethod
+    def _to_row(book):
+        """Knygos objektas -> eilutė (tuple) 'books' lentelei."""
+        return (book.id, book.title, book.author, int(book.year), book.genre,
+                int(book.total_copies), int(book.available_copies))
+
+    def _track_change(self, event, item):
+        """Įsimena, ką įrašyti kito save() metu."""
+        if event == RESET:
+            self._rewrite_all = True
+        elif event in (ADDED, CHANGED):
+            self._changed_ids.add(item.id)
+            self._removed_ids.discard(item.id)
+        elif event == REMOVED:
+            self._changed_ids.discard(item.id)
+            self._removed_ids.add(item.id)
+
+    def _clear_changes(self):
+        self._changed_ids = set()
+        self._removed_ids = set()
+        self._rewrite_all = False
+
+    def _load(self):
+        """Užkrauna visas knygas iš 'books' lentelės."""
+        conn = database.connection(self.db_file)
+        rows = conn.execute(f"SELECT {', '.join(BOOK_COLUMNS)} FROM books").fetchall()
+
+        self.books = [Book.from_dict(dict(row)) for row in rows]
+        self._clear_changes() # Užkrauta = sutampa su DB
+
+    def _write(self):
+        """
+        Įrašo tik pakeistas knygas (UPSERT) ir pašalina ištrintas.
+        Po RESET - visa lentelė perrašoma.
+        """
+        if not self._rewrite_all and not self._changed_ids and not self._removed_ids:
+            return
+
+        try:
+            with database.connection(self.db_file) as conn:  # Viena transakcija
+                if self._rewrite_all:
+                    conn.execute("DELETE FROM books")
+                    database.bulk_insert(conn, "books", BOOK_COLUMNS, map(self._to_row, self.books))
+                else:
+                    if self._removed_ids:
+                        database.bulk_delete(conn, "books", "id", self._removed_ids)
+                    books = filter(None, map(self._by_id.get, self._changed_ids))
+                    database.bulk_upsert(conn, "books", BOOK_COLUMNS, map(self._to_row, books))
+        except sqlite3.Error as exc:
+            # Pvz., "database is locked": transakcija atšaukta, pakeistų ID sąrašas lieka,
+            # o OSError flush() reiškia "neįrašyta, bandyti kito save() metu"
+            raise OSError(f"Nepavyko įrašyti į {self.db_file}: {exc}") from exc
+
+        self._clear_changes()
@@ -0,0 +1,132 @@
+"""
+FILE: src/repositories/sqlite_user_repository.py
+PURPOSE: Vartotojų repozitorija, saugojanti duomenis SQLite 'users' ir 'loans' lentelėse.
+RELATIONSHIPS:
+  - Paveldi UserRepository (tas pats viešas API).
+  - Naudoja src/database.py prisijungimui (ryšių telkinys) ir lentelių kūrimui.
+CONTEXT:
+  - Reader.active_loans atmintyje lieka sąrašu žodynų, bet DB jie "išskleidžiami"
+    į atskirus 'loans' lentelės įrašus.
+  - Knygos pavadinimas paskolose nesaugomas (schemoje jo nėra), todėl užkraunant
+    jis paimamas iš 'books' lentelės (LEFT JOIN).
+  - Repozitorija klauso savo įvykių (ADDED/CHANGED/REMOVED, LOAN_ADDED/LOAN_REMOVED) ir
+    save() perrašo tik paliestų vartotojų eilutes ir jų paskolas (RESET - visas lenteles).
+"""
+
+import sqlite3
+
+from src import database
+from src.models import Librarian, Reader
+from src.repositories.base_repository import (RESET, ADDED, CHANGING, CHANGED, REMOVED,
+                                              LOAN_ADDED, LOAN_REMOVED)
+from src.repositories.user_repository import UserRepository
+
+USER_COLUMNS = ('id', 'username', 'role', 'password')
+LOAN_COLUMNS = ('user_id', 'book_id', 'due_date')
+
+class SqliteUserRepository(UserRepository):
+    def __init__(self, db_file=None):
+        self.db_file = db_file or database.DB_FILE
+        database.initialize_db(self.db_file)
+        # Neįrašyti pakeitimai: paliestų ir ištrintų vartotojų ID
+        self._changed_ids = set()
+        self._removed_ids = set()
+        self._rewrite_all = False
+        self.subscribe(self._track_change)
+        super().__init__()
+
+    @staticmethod
+    def _to_row(user):
+        """Vartotojo objektas -> eilutė 'users' lentelei."""
+        return (user.id, user.username, user.role, getattr(user, 'password', None))
+
+    @staticmethod
+    def _loan_rows(user):
+        """Vartotojo paskolos -> eilutės 'loans' lentelei."""
+        return [(user.id, loan['book_id'], loan['due_date'])
+                for loan in getattr(user, 'active_loans', ())]
+
+    def _track_change(self, event, item):
+        """Įsimena, ką įrašyti kito save() metu."""
+        if event in (LOAN_ADDED, LOAN_REMOVED):
+            item = item[0] # (skaitytojas, paskola)
+        if event == RESET:
+            self._rewrite_all = True
+        elif event == CHANGING:
+            # Jei keičiasi ID (change_id), senasis bus ištrintas; CHANGED grąžina naująjį
+            self._changed_ids.discard(item.id)
+            self._removed_ids.add(item.id)
+        elif event in (ADDED, CHANGED, LOAN_ADDED, LOAN_REMOVED):
+            self._changed_ids.add(item.id)
+            self._removed_ids.discard(item.id)
+        elif event == REMOVED:
+            self._changed_ids.discard(item.id)
+            self._removed_ids.add(item.id)
+
+    def _clear_changes(self):
+        self._changed_ids = set()
+        self._removed_ids = set()
+        self._rewrite_all = False
+
+    def _load(self):
+        """Užkrauna vartotojus ir jų paskolas iš DB."""
+        conn = database.connection(self.db_file)
+        user_rows = conn.execute("SELECT id, username, role, password FROM users").fetchall()
+        loan_rows = conn.execute(
+            "SELECT l.user_id, l.book_id, l.due_date, COALESCE(b.title, l.book_id) AS title "
+            "FROM loans l LEFT JOIN books b ON b.id = l.book_id "
+            "ORDER BY l.id"
+        ).fetchall()
+
+        loans_by_user = {}
+        for row in loan_rows:
+            loans_by_user.setdefault(row['user_id'], []).append({
+                "book_id": row['book_id'],
+                "title": row['title'],
+                "due_date": row['due_date']
+            })
+
+        users = []
+        for row in user_rows:
+            item = dict(row)
+            if item['role'] == 'librarian':
+                users.append(Librarian.from_dict(item))
+            elif item['role'] == 'reader':
+                item['active_loans'] = loans_by_user.get(item['id'], [])
+                users.append(Reader.from_dict(item))
+
+        self.users = users
+        self._clear_changes() # Užkrauta = sutampa su DB
+
+    def _write(self):
+        """
+        Įrašo tik paliestus vartotojus: jų eilutė perrašoma (UPSERT),
+        o paskolos - DELETE + INSERT. Ištrinti vartotojai pašalinami su paskolomis.
+        Po RESET - abi lentelės perrašomos visos.
+        """
+        if self._rewrite_all:
+            removed, users = None, self.users
+        elif self._changed_ids or self._removed_ids:
+            removed = self._removed_ids
+            users = list(filter(None, map(self._by_id.get, self._changed_ids)))
+        else:
+            return
+
+        try:
+            with database.connection(self.db_file) as conn:  # Viena transakcija
+                if removed is None:
+                    conn.execute("DELETE FROM loans")
+                    conn.execute("DELETE FROM users")
+                else:
+                    database.bulk_delete(conn, "loans", "user_id", removed)
+                    database.bulk_delete(conn, "users", "id", removed)
+                    database.bulk_delete(conn, "loans", "user_id", [user.id for user in users])
+                database.bulk_upsert(conn, "users", USER_COLUMNS, map(self._to_row, users))
+                database.bulk_insert(conn, "loans", LOAN_COLUMNS,
+                                     [row for user in users for row in self._loan_rows(user)])
+        except sqlite3.Error as exc:
+            # Pvz., "database is locked": transakcija atšaukta, pakeistų ID sąrašas lieka,
+            # o OSError flush() reiškia "neįrašyta, bandyti kito save() metu"
+            raise OSError(f"Nepavyko įrašyti į {self.db_file}: {exc}") from exc
+
+        self._clear_changes()
@@ -7,20 +7,116 @@ RELATIONSHIPS:
 CONTEXT:
   - Tai yra "Duomenų prieigos sluoksnis" (Data Access Layer).
   - Jokia verslo logika (pvz., "ar slaptažodis teisingas?") čia neturi būti.
+  - Paskolų terminai indeksuojami: datos išskaidomos VIENĄ kartą (užkraunant ar keičiant),
+    o "visos vėluojančios iki datos X" tampa surikiuoto sąrašo pradžios nuskaitymu.
 """
 
-from src.models import Librarian, Reader
-from src.data_manager import load_data, save_data, get_data_file_path
+from bisect import bisect_left, insort
+from src.models import Librarian, Reader, Loan, parse_due_date
+from src.data_manager import load_data, save_data, get_data_file_path, get_store_filename
 from src.config import USERS_FILENAME
+from src.repositories.rwlock import read_locked, write_locked
+from src.repositories.base_repository import (BaseRepository, RESET, ADDED, REMOVED,
+                                               CHANGING, CHANGED, LOAN_ADDED, LOAN_REMOVED)
 
-class UserRepository:
+class UserRepository(BaseRepository):
     def __init__(self):
         """
         Konstruktorius: Pasileidžia sukuriant objektą.
         Jo tikslas - paruošti kelią iki failo ir užkrauti duomenis į atmintį.
         """
-        self.filepath = get_data_file_path(USERS_FILENAME)
-        self._load() # Iškart užkrauname duomenis
+        self.filepath = get_data_file_path(get_store_filename(USERS_FILENAME))
+        self.journal = None # Paskolų žurnalas (LoanJournal), jei įjungtas
+        self._init_persistence()
+        self._start_loading() # Iškart arba pirmą kartą prireikus (LAZY_LOADING)
+
+    # --- Indeksai ---
+    # Žodynai {id: vartotojas} ir {vardas mažosiomis: vartotojas} leidžia rasti
+    # vartotoją per O(1) (prisijungimas, skolinimas), o ne perrenkant visą sąrašą.
+    # Žodynas {id: vieta sąraše} - šalinimui per O(1) (vietą užima paskutinis vartotojas),
+    # {vardas mažosiomis: kiekis} - kitas to paties vardo vartotojas ieškomas tik jei toks yra.
+    # Paskolų terminų indeksas: surikiuotas [(termino dienos nr., vartotojo ID, knygos ID)]
+    # ir žodynas {(vartotojo ID, knygos ID): termino dienos nr.} (date.toordinal()).
+
+    # Sukuriami _load() metu; pirmas kreipimasis į juos užkrauna failą (žr. BaseRepository)
+    _LAZY_ATTRIBUTES = ('_users', '_by_id', '_positions', '_by_username', '_username_counts',
+                        '_due_of', '_due_index')
+
+    @property
+    def users(self):
+        return self._users
+
+    @users.setter
+    def users(self, value):
+        """Priskyrus naują sąrašą, indeksai perstatomi."""
+        self._users = value
+        self._rebuild_indexes()
+
+    def _rebuild_indexes(self):
+        self._by_id = {}
+        self._positions = {user.id: pos for pos, user in enumerate(self._users)}
+        self._by_username = {}
+        self._username_counts = {}
+        self._due_of = {}
+        for user in self._users:
+            self._index_user(user)
+            for loan in getattr(user, 'active_loans', ()):
+                ordinal = self._loan_due(loan)
+                if ordinal is not None:
+                    self._due_of[(user.id, loan['book_id'])] = ordinal
+        self._due_index = sorted((ordinal, user_id, book_id)
+                                 for (user_id, book_id), ordinal in self._due_of.items())
+        self._notify(RESET, self._users)
+
+    def _index_user(self, user):
+        self._by_id[user.id] = user
+        # Jei vardai kartojasi, paliekame pirmą (kaip ir senoji paieška)
+        key = user.username.lower()
+        self._by_username.setdefault(key, user)
+        self._username_counts[key] = self._username_counts.get(key, 0) + 1
+
+    def _unindex_user(self, user):
+        if self._by_id.get(user.id) is user:
+            del self._by_id[user.id]
+        key = user.username.lower()
+        count = self._username_counts.pop(key, 1) - 1
+        if count:
+            self._username_counts[key] = count
+        if self._by_username.get(key) is user:
+            del self._by_username[key]
+            if not count:
+                return
+            # Jei yra kitas vartotojas tuo pačiu vardu, jis tampa randamas
+            for other in self._users:
+                if other is not user and other.username.lower() == key:
+                    self._by_username[key] = other
+                    break
+
+    @staticmethod
+    def _loan_due(loan):
+        """Paskolos termino dienos numeris (Loan jį jau turi; senas žodynas - išskaidomas)."""
+        if isinstance(loan, Loan):
+            return loan.due
+        return parse_due_date(loan.get('due_date'))
+
+    def _index_loan(self, user, loan):
+        ordinal = self._loan_due(loan)
+        if ordinal is None:
+            return
+        key = (user.id, loan['book_id'])
+        self._unindex_loan(user, loan)
+        self._due_of[key] = ordinal
+        insort(self._due_index, (ordinal,) + key)
+
+    def _unindex_loan(self, user, loan):
+        key = (user.id, loan['book_id'])
+        ordinal = self._due_of.pop(key, None)
+        if ordinal is None:
+            return
+        entry = (ordinal,) + key
+        pos = bisect_left(self._due_index, entry)
+        if pos < len(self._due_index) and self._due_index[pos] == entry:
+            del self._due_index[pos]
 
     def _load(self):
         """
@@ -28,24 +124,55 @@ class UserRepository:
         Nuskaito 'raw' JSON duomenis ir paverčia juos į protingus Python objektus.
         """
         data = load_data(self.filepath) # Gauname paprastą sąrašą žodynų (list of dicts)
-        self.users = []
         
         # Svarbus žingsnis: Deserializacija (JSON -> Object)
-        # Turime atskirti, kokį objektą kurti pagal 'role' lauką.
-        for item in data:
-            if item.get('role') == 'librarian':
-                self.users.append(Librarian.from_dict(item))
-            elif item.get('role') == 'reader':
-                self.users.append(Reader.from_dict(item))
-
-    def save(self):
+        users = [user for user in map(self.user_from_dict, data) if user is not None]
+        self.users = users # Indeksai perstatomi automatiškai
+
+    @staticmethod
+    def user_from_dict(item):
+        """Žodynas -> Librarian arba Reader (pagal 'role' lauką); nežinoma rolė - None."""
+        if item.get('role') == 'librarian':
+            return Librarian.from_dict(item)
+        if item.get('role') == 'reader':
+            return Reader.from_dict(item)
+        return None
+
+    def _write(self):
         """
-        Išsaugo visus atmintyje esančius pakeitimus atgal į failą.
+        Išsaugo visus atmintyje esančius pakeitimus atgal į failą (kviečiama per save()/flush()).
         Tai vadinama Serializacija (Object -> JSON).
         """
         # List comprehension - trumpas būdas sukurti naują sąrašą
         data = [user.to_dict() for user in self.users]
-        save_data(self.filepath, data)
+        if not save_data(self.filepath, data):
+            raise OSError(f"Nepavyko įrašyti {self.filepath}")
+
+    # --- Paskolų žurnalas ---
+
+    @write_locked
+    def attach_journal(self, journal):
+        """
+        Prijungia paskolų žurnalą ir pritaiko jo įvykius ant užkrauto snapshot.
+        Grąžina pritaikytų įvykių kiekį.
+        Įvykiams pritaikyti reikia duomenų, todėl su žurnalu vartotojai užkraunami iškart
+        (tingiai užkraunant žurnalas būtų pritaikomas skaitymo užrakto viduje - o jo
+        pakelti į rašymo negalima).
+        """
+        self.journal = journal
+        return journal.replay(self)
+
+    @write_locked
+    def flush(self):
+        """
+        Po pilno įrašymo snapshot jau turi visus žurnalo įvykius,
+        todėl žurnalas kompaktuojamas (perkeliamas į istoriją).
+        Nepavykus įrašyti (written == False) žurnalas lieka - tik jame yra naujausios paskolos.
+        """
+        written = super().flush()
+        if written and self.journal is not None:
+            self.journal.rotate()
+        return written
 
     # --- CRUD Operacijos (Create, Read, Update, Delete) ---
 
@@ -55,27 +182,128 @@ class UserRepository:
 
     def get_by_id(self, user_id):
         """Suranda vartotoją pagal ID."""
-        for user in self.users:
-            if user.id == user_id:
-                return user
-        return None
+        return self._by_id.get(user_id)
 
     def get_by_username(self, username):
         """Suranda vartotoją pagal vardą (didžiosios/mažosios raidės nesvarbu)."""
-        for user in self.users:
-            if user.username.lower() == username.lower():
-                return user
-        return None
+        return self._by_username.get(username.lower())
 
+    @write_locked
     def add(self, user):
         """Prideda naują vartotoją į sąrašą ir iškart išsaugo failą."""
+        self._positions[user.id] = len(self._users)
         self.users.append(user)
+        self._index_user(user)
+        for loan in getattr(user, 'active_loans', ()):
+            self._index_loan(user, loan)
+        self._notify(ADDED, user)
         self.save()
 
+    @write_locked
     def remove(self, user):
-        """Ištrina vartotoją, jei toks yra."""
-        if user in self.users:
-            self.users.remove(user)
+        """Ištrina vartotoją, jei toks yra (O(1): jo vietą sąraše užima paskutinis vartotojas)."""
+        pos = self._positions.get(user.id)
+        if pos is not None and self._users[pos] == user:
+            user = self._users[pos]
+            del self._positions[user.id]
+            last = self._users.pop()
+            if last is not user:
+                self._users[pos] = last
+                self._positions[last.id] = pos
+            self._unindex_user(user)
+            for loan in getattr(user, 'active_loans', ()):
+                self._unindex_loan(user, loan)
+            self._notify(REMOVED, user)
             self.save()
             return True
-        return False
\ No newline at end of file
+        return False
+
+    @write_locked
+    def change_id(self, user, new_id):
+        """Pakeičia vartotojo ID (pvz., nauja kortelė), atnaujina indeksą ir išsaugo."""
+        loans = getattr(user, 'active_loans', ())
+        self._notify(CHANGING, user)
+        self._unindex_user(user)
+        for loan in loans:
+            self._unindex_loan(user, loan)
+        if user.id in self._positions:
+            self._positions[new_id] = self._positions.pop(user.id)
+        user.id = new_id
+        self._index_user(user)
+        for loan in loans:
+            self._index_loan(user, loan)
+        self._notify(CHANGED, user)
+        self.save()
+
+    @write_locked
+    def rename(self, user, new_username):
+        """Pakeičia vartotojo vardą, atnaujina indeksą ir išsaugo."""
+        self._notify(CHANGING, user)
+        self._unindex_user(user)
+        user.username = new_username
+        self._index_user(user)
+        self._notify(CHANGED, user)
+        self.save()
+
+    @write_locked
+    def set_password(self, user, password):
+        """Pakeičia (bibliotekininko) slaptažodį ir išsaugo."""
+        self._notify(CHANGING, user)
+        user.password = password
+        self._notify(CHANGED, user)
+        self.save()
+
+    # --- Paskolos ---
+    # Paskolų sąrašas keičiamas per šiuos metodus, kad prenumeratoriai (statistika)
+    # sužinotų apie pakeitimą. Įrašymą (save arba žurnalą) atlieka LoanService.
+
+    @write_locked
+    def add_loan(self, user, loan):
+        user.active_loans.append(loan)
+        self._index_loan(user, loan)
+        self._notify(LOAN_ADDED, (user, loan))
+
+    @write_locked
+    def remove_loan(self, user, loan):
+        user.active_loans.remove(loan)
+        self._unindex_loan(user, loan)
+        self._notify(LOAN_REMOVED, (user, loan))
+
+    @write_locked
+    def set_loan_due(self, user, loan, due_date):
+        """Pakeičia paskolos terminą (prenumeratoriams tai = pašalinimas + pridėjimas)."""
+        self._notify(LOAN_REMOVED, (user, loan))
+        loan['due_date'] = due_date
+        self._index_loan(user, loan)
+        self._notify(LOAN_ADDED, (user, loan))
+
+    def due_ordinal(self, user, loan):
+        """Paskolos termino dienos numeris iš indekso (be datos skaidymo kiekvieną kartą)."""
+        ordinal = self._due_of.get((user.id, loan['book_id']))
+        if ordinal is None:
+            # Paskola, pridėta apeinant add_loan (arba neteisinga data)
+            ordinal = self._loan_due(loan)
+        return ordinal
+
+    @read_locked
+    def loans_due_before(self, ordinal):
+        """
+        Sąrašas (skaitytojas, paskola) su terminu ANKSČIAU nei nurodyta diena,
+        nuo seniausio termino. Nuskaitymas sustoja ties riba: O(k), o ne O(visų paskolų).
+        """
+        result = []
+        for due, user_id, book_id in self._due_index:
+            if due >= ordinal:
+                break
+            user = self._by_id.get(user_id)
+            if user is None:
+                continue
+            loan = next((l for l in user.active_loans if l['book_id'] == book_id), None)
+            if loan is not None:
+                result.append((user, loan))
+        return result
+
+    @read_locked
+    def count_loans_due_before(self, ordinal):
+        """Kiek paskolų terminas ankstesnis nei nurodyta diena (O(log n))."""
+        return bisect_left(self._due_index, (ordinal,))
@@ -10,6 +10,7 @@ CONTEXT:
 
 from src.models import Librarian, Reader
 from src.utils import generate_card_id
+from src.repositories.rwlock import write_locked
 
 class AuthService:
     def __init__(self, user_repository):
@@ -19,6 +20,7 @@ class AuthService:
         Tai leidžia lengviau testuoti kodą.
         """
         self.repo = user_repository
+        self.lock = user_repository.lock # Unikalumo patikrinimas + pridėjimas - atomiškai
 
     def _validate_card_format(self, card_id):
         """
@@ -61,6 +63,7 @@ class AuthService:
             
         return None
 
+    @write_locked
     def register_librarian(self, username, password):
         """Registruoja naują administratorių."""
         # Patikriname, ar toks vardas jau užimtas
@@ -71,6 +74,7 @@ class AuthService:
         self.repo.add(new_admin)
         return True
 
+    @write_locked
     def register_reader(self, username, card_id):
         """
         Registruoja skaitytoją su bibliotekininko įvestu ID.
@@ -93,6 +97,7 @@ class AuthService:
         
         return True, f"Skaitytojas '{username}' sukurtas. Kortelė: {card_id}"
     
+    @write_locked
     def regenerate_card_id(self, reader, new_card_id):
         """
         Priskiria naują kortelę esamam skaitytojui (RANKINIS ĮVEDIMAS).
@@ -113,7 +118,6 @@ class AuthService:
         
         # 3. Atnaujinimas
         old_id = reader.id
-        reader.id = new_card_id
-        self.repo.save()
+        self.repo.change_id(reader, new_card_id) # Atnaujina ir ID indeksą
         
         return True, f"Kortelė pakeista. {old_id} -> {new_card_id}"
\ No newline at end of file
@@ -6,80 +6,227 @@ RELATIONSHIPS:
 CONTEXT:
   - Čia yra taisyklė: "Jei knyga jau yra, nekurk naujos, o padidink kiekį".
     Tai vadinama Verslo Logika (Business Logic).
+  - import_books() - masinis importas (CSV/JSONL eilutės iš src/tools/import_books.py):
+    tos pačios metų taisyklės, dublikatai randami per (pavadinimas, autorius) indeksą,
+    visi pakeitimai įrašomi vienu kartu.
+  - apply_changes() - admin lentelės išsaugojimas: tik pasikeitę laukai ir trynimai,
+    vienas praėjimas ir vienas įrašymas.
 """
+import logging
+import time
 from datetime import datetime
 from src.models import Book
+from src.repositories.rwlock import write_locked
+
+# Laukai, kuriuos galima keisti per apply_changes (available_copies skaičiuojamas pats)
+EDITABLE_FIELDS = ('title', 'author', 'year', 'genre', 'total_copies')
+
+# Kiek klaidingų eilučių aprašymų saugoti importo ataskaitoje (likusios tik suskaičiuojamos)
+MAX_IMPORT_ERRORS = 100
+
+# Derinimo pranešimai - per logerį (config.LOG_LEVEL), o ne print(): išjungti nieko nekainuoja
+logger = logging.getLogger(__name__)
+
+def validate_year(year):
+    """
+    Metų taisyklės (bendros add_book ir importui): sveikasis skaičius nuo -1000
+    iki kitų metų. Grąžina int arba meta ValueError.
+    """
+    try:
+        year_int = int(year)
+    except (TypeError, ValueError):
+        raise ValueError(f"Klaida: Metai turi būti skaičius, o gauta: {year}")
+
+    current_year = datetime.now().year
+    limit_future_year = current_year + 1
+    limit_past_year = -1000
+
+    # Patikriname ateitį
+    if year_int > limit_future_year:
+        raise ValueError(f"Klaida: Knygos metai ({year_int}) negali būti vėlesni nei {limit_future_year}.")
+
+    # Patikriname praeitį
+    if year_int < limit_past_year:
+        raise ValueError(f"Klaida: Knygos metai ({year_int}) negali būti ankstesni nei {limit_past_year}.")
+    return year_int
 
 class InventoryService:
     def __init__(self, book_repository):
         self.repo = book_repository
+        self.lock = book_repository.lock
 
+    @write_locked
     def add_book(self, title, author, year, genre):
             """
             Prideda knygą su griežta validacija.
             """
-            # 1. DEBUG: Atspausdiname į konsolę, ką tiksliai gauname (kad matytumėte terminale)
-            print(f"DEBUG: Bandoma pridėti knygą. Metai: {year} (Tipas: {type(year)})")
+            # 1. DEBUG: Įrašome, ką tiksliai gauname (matosi debug.log, kai LOG_LEVEL = "DEBUG")
+            logger.debug("Bandoma pridėti knygą. Metai: %r (Tipas: %s)", year, type(year).__name__)
 
-            # 2. PRIVERSTINIS KONVERTAVIMAS (Defensive Programming)
+            # 2-3. PRIVERSTINIS KONVERTAVIMAS IR LAIKO PATIKRINIMAS (Defensive Programming)
             # Tai apsaugo nuo situacijų, jei iš UI netyčia atkeliauja tekstas "2029"
-            try:
-                year_int = int(year)
-            except ValueError:
-                raise ValueError(f"Klaida: Metai turi būti skaičius, o gauta: {year}")
-
-            # 3. LAIKO PATIKRINIMAS
-            current_year = datetime.now().year
-            limit_future_year = current_year + 1
-            limit_past_year = -1000
-
-            # Patikriname ateitį
-            if year_int > limit_future_year:
-                raise ValueError(f"Klaida: Knygos metai ({year_int}) negali būti vėlesni nei {limit_future_year}.")
-
-            # Patikriname praeitį (NAUJA DALIS)
-            if year_int < limit_past_year:
-                raise ValueError(f"Klaida: Knygos metai ({year_int}) negali būti ankstesni nei {limit_past_year}.")
+            year_int = validate_year(year)
 
             # 4. PATIKRINIMAS, AR KNYGA EGZISTUOJA
             existing_book = self.repo.find_by_details(title, author)
             
             if existing_book:
-                existing_book.total_copies += 1
-                existing_book.available_copies += 1
-                self.repo.save()
-                print("DEBUG: Atnaujinta esama knyga.")
+                self.repo.update(existing_book,
+                                 total_copies=existing_book.total_copies + 1,
+                                 available_copies=existing_book.available_copies + 1)
+                logger.debug("Atnaujinta esama knyga.")
                 return existing_book
             
             # 5. NAUJOS KNYGOS KŪRIMAS
             # Svarbu: naudojame year_int, o ne pradinį year
             new_book = Book(title, author, year_int, genre, total_copies=1, available_copies=1)
             self.repo.add(new_book)
-            print("DEBUG: Sukurta nauja knyga.")
+            logger.debug("Sukurta nauja knyga.")
             return new_book
 
+    @write_locked
+    def import_books(self, records):
+        """
+        Masinis knygų importas iš žodynų srauto (pvz., generatoriaus, skaitančio CSV/JSONL).
+
+        Kiekvienas įrašas: title, author, year, genre ir nebūtinas copies (numatyta 1).
+        - Metai tikrinami kaip add_book (validate_year).
+        - Jei knyga (pavadinimas + autorius) jau yra - padidinamas kopijų kiekis;
+          pasikartojimai pačiame faile sujungiami į vieną knygą.
+        - Viskas įrašoma VIENĄ kartą pabaigoje.
+
+        Grąžina ataskaitą (žodyną): rows, added, merged, copies, errors (klaidų kiekis),
+        error_details [(eilutės nr., pranešimas)], seconds, rows_per_second.
+        """
+        start = time.perf_counter()
+        report = {'rows': 0, 'added': 0, 'merged': 0, 'copies': 0, 'errors': 0, 'error_details': []}
+        new_books = {}  # (pavadinimas, autorius) -> nauja knyga (dar ne repozitorijoje)
+        merged = {}     # esamos knygos ID -> pridedamų kopijų kiekis
+
+        for row_number, record in enumerate(records, 1):
+            report['rows'] += 1
+            try:
+                title = str(record.get('title') or '').strip()
+                author = str(record.get('author') or '').strip()
+                if not title or not author:
+                    raise ValueError("Klaida: Trūksta pavadinimo arba autoriaus.")
+                year = validate_year(record.get('year'))
+                copies = int(record.get('copies') or record.get('total_copies') or 1)
+                if copies < 1:
+                    raise ValueError(f"Klaida: Kopijų kiekis turi būti teigiamas, o gauta: {copies}")
+            except (TypeError, ValueError) as e:
+                report['errors'] += 1
+                if len(report['error_details']) < MAX_IMPORT_ERRORS:
+                    report['error_details'].append((row_number, str(e)))
+                continue
+
+            report['copies'] += copies
+            key = (title.lower(), author.lower())
+            pending = new_books.get(key)
+            if pending is not None:
+                pending.total_copies += copies
+                pending.available_copies += copies
+                continue
+            existing = self.repo.find_by_details(title, author)
+            if existing is not None:
+                merged[existing.id] = merged.get(existing.id, 0) + copies
+                continue
+            genre = str(record.get('genre') or '').strip()
+            new_books[key] = Book(title, author, year, genre,
+                                  total_copies=copies, available_copies=copies)
+
+        with self.repo.batch():
+            for book_id, copies in merged.items():
+                book = self.repo.get_by_id(book_id)
+                self.repo.update(book, total_copies=book.total_copies + copies,
+                                 available_copies=book.available_copies + copies)
+            self.repo.add_many(new_books.values())
+
+        report['added'] = len(new_books)
+        report['merged'] = len(merged)
+        report['seconds'] = time.perf_counter() - start
+        report['rows_per_second'] = report['rows'] / report['seconds'] if report['seconds'] else 0.0
+        return report
+
+    @write_locked
+    def apply_changes(self, changes, deletions=()):
+        """
+        Pritaiko lentelės pakeitimus vienu praėjimu ir įrašo VIENĄ kartą.
+
+        Parametrai:
+        - changes: {knygos ID: {laukas: nauja reikšmė}} - tik pasikeitę laukai (EDITABLE_FIELDS).
+        - deletions: trinamų knygų ID (trinama tik jei nė viena kopija nepaskolinta).
+
+        Kiekio keitimas: laisvų kopijų skaičius keičiamas tiek pat, kiek bendras;
+        sumažinti žemiau paskolinto kiekio negalima.
+        Grąžina (pakeistų/ištrintų knygų kiekis, klaidų pranešimų sąrašas).
+        """
+        count = 0
+        errors = []
+        with self.repo.batch():
+            removable = []
+            for book_id in deletions:
+                book = self.repo.get_by_id(book_id)
+                if book is None:
+                    continue
+                if int(book.available_copies) < int(book.total_copies):
+                    errors.append(f"Knyga '{book.title}': negalima ištrinti - šiuo metu paskolinta.")
+                    continue
+                removable.append(book.id)
+            count += self.repo.remove_many(removable)
+
+            for book_id, fields in changes.items():
+                book = self.repo.get_by_id(book_id)
+                if book is None:
+                    continue
+                try:
+                    updates = self._validated_updates(book, fields)
+                except ValueError as e:
+                    errors.append(f"Knyga '{book.title}': {e}")
+                    continue
+                if updates:
+                    self.repo.update(book, **updates)
+                    count += 1
+        return count, errors
+
+    @staticmethod
+    def _validated_updates(book, fields):
+        """Paverčia lentelės reikšmes į tikrus tipus ir palieka tik tikrai pasikeitusius laukus."""
+        unknown = set(fields) - set(EDITABLE_FIELDS)
+        if unknown:
+            raise ValueError(f"Šių laukų keisti negalima: {', '.join(sorted(unknown))}")
+        updates = {}
+        for name in ('title', 'author', 'genre'):
+            if name in fields:
+                value = str(fields[name] or '').strip()
+                if not value and name != 'genre':
+                    raise ValueError("Pavadinimas ir autorius negali būti tušti.")
+                if value != getattr(book, name):
+                    updates[name] = value
+        if 'year' in fields:
+            year = validate_year(fields['year'])
+            if year != book.year:
+                updates['year'] = year
+        if 'total_copies' in fields:
+            new_total = int(fields['total_copies'])
+            diff = new_total - int(book.total_copies)
+            if diff:
+                if book.available_copies + diff < 0:
+                    raise ValueError("negalima mažinti kiekio (paskolinta).")
+                updates['total_copies'] = new_total
+                updates['available_copies'] = book.available_copies + diff
+        return updates
+
+    @write_locked
     def batch_delete(self, book_ids):
         """
         Masinis knygų šalinimas su vienkartiniu išsaugojimu.
         """
-        print(f"DEBUG: Pradedamas masinis trynimas. Kiekis: {len(book_ids)}")
-        
-        deleted_count = 0
+        logger.debug("Pradedamas masinis trynimas. Kiekis: %d", len(book_ids))
         
-        # 1. Triname tik iš atminties (RAM)
-        for bid in book_ids:
-            # Naudojame naują metodą, kuris nerašo į failą
-            if self.repo.remove_without_save(bid):
-                print(f"DEBUG: Iš atminties pašalinta knyga ID: {bid}")
-                deleted_count += 1
-            else:
-                print(f"DEBUG: Knyga {bid} nerasta atmintyje.")
+        # Vienu praėjimu pašaliname iš atminties ir įrašome į failą TIK VIENĄ KARTĄ
+        # (jei nieko nerasta, failas neliečiamas)
+        deleted_count = self.repo.remove_many(book_ids)
+        logger.debug("Baigta. Iš viso ištrinta: %d.", deleted_count)
         
-        # 2. Įrašome į failą TIK VIENĄ KARTĄ
-        if deleted_count > 0:
-            print(f"DEBUG: Baigta. Iš viso ištrinta: {deleted_count}. Saugoma į diską...")
-            self.repo.save()
-        else:
-            print("DEBUG: Nieko neištrinta, failas neliečiamas.")
-            
         return deleted_count
\ No newline at end of file
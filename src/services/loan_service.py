@@ -10,19 +10,51 @@ CONTEXT:
 """
 
 from datetime import datetime, timedelta
-from src.config import LOAN_PERIOD_DAYS, MAX_BOOKS_PER_USER, DATE_FORMAT, FINE_PER_DAY
+from src.config import (LOAN_PERIOD_DAYS, MAX_BOOKS_PER_USER, DATE_FORMAT, FINE_PER_DAY,
+                        LOAN_JOURNAL_COMPACT_EVERY)
+from src.repositories.base_repository import batch_all
+from src.models import Loan
+from src.repositories.loan_journal import LoanJournal
+from src.perf import instrumented
+from src.repositories.rwlock import write_locked
 
+@instrumented # Visi vieši metodai matuojami (src/perf.py)
 class LoanService:
-    def __init__(self, book_manager, user_manager):
+    def __init__(self, book_manager, user_manager, journal=None):
         """
         Inicijuoja servisą su priklausomybėmis.
         
         Parametrai:
         - book_manager: Objektas, valdantis knygų duomenis.
         - user_manager: Objektas, valdantis vartotojų duomenis.
+        - journal: LoanJournal (nebūtinas). Jei yra, paskolų pakeitimai rašomi į žurnalą,
+          o ne perrašant visus vartotojus.
         """
         self.book_manager = book_manager
         self.user_manager = user_manager
+        self.journal = journal
+        # Patikrinimas ir pakeitimas (pvz., "ar liko kopijų?" -> "paimti") turi būti atomiški:
+        # visa operacija vykdoma su knygų repozitorijos rašymo užraktu
+        self.lock = book_manager.lock
+
+    def _record_loan_change(self, op, user, book_id, title=None, due_date=None):
+        self._record_loan_changes([(op, user.id, book_id, title, due_date)])
+
+    def _record_loan_changes(self, changes):
+        """
+        Užfiksuoja skaitytojų paskolų pakeitimus: [(op, user_id, book_id, title, due_date), ...].
+        - Be žurnalo: perrašomi vartotojai (kaip anksčiau; batch() viduje - vieną kartą).
+        - Su žurnalu: visa grupė - vienas rašymas į žurnalą; kas LOAN_JOURNAL_COMPACT_EVERY
+          įvykių įrašomas pilnas snapshot (ir žurnalas kompaktuojamas).
+        """
+        if not changes:
+            return
+        if self.journal is None:
+            self.user_manager.save()
+            return
+        self.journal.append_many(changes)
+        if self.journal.pending >= LOAN_JOURNAL_COMPACT_EVERY:
+            self.user_manager.save()
 
     def calculate_fine(self, user):
         """
@@ -31,48 +63,32 @@ class LoanService:
         """
         total_fine = 0.0
         overdue_books = []
-        
-        # Tikriname kiekvieną pasiskolintą knygą
-        # user.borrowed_books turėtų būti sąrašas žodynų arba objektų
-        loans = getattr(user, 'borrowed_books', [])
-
-        for loan in loans:
-            # 1. Ištraukiame grąžinimo terminą
-            # Priklausomai nuo jūsų struktūros, tai gali būti loan['due_date'] arba loan.due_date
-            due_date_str = loan.get('due_date') if isinstance(loan, dict) else getattr(loan, 'due_date', None)
-            
-            if due_date_str:
-                try:
-                    due_date = datetime.strptime(due_date_str, "%Y-%m-%d")
-                    today = datetime.now()
-                    
-                    # 2. Tikriname, ar vėluoja
-                    if today > due_date:
-                        delta = today - due_date
-                        overdue_days = delta.days
-                        
-                        # 3. Skaičiuojame baudą šiai knygai
-                        book_fine = overdue_days * FINE_PER_DAY
-                        total_fine += book_fine
-                        
-                        # Išsaugome detales atvaizdavimui
-                        # Mums reikia knygos pavadinimo (jei jis saugomas loane, puiku, jei ne - reiktų ieškoti pagal ID)
-                        # Darykime prielaidą, kad loan turi 'title' arba gausime jį UI dalyje
-                        book_id = loan.get('id') or loan.get('book_id')
-                        
-                        overdue_books.append({
-                            'book_id': book_id,
-                            'days': overdue_days,
-                            'fine': book_fine,
-                            'due_date': due_date_str
-                        })
-                except ValueError:
-                    continue # Jei data blogo formato
+        today = datetime.now().date().toordinal()
+
+        # Tikriname kiekvieną skaitytojo paskolą (bibliotekininkai paskolų neturi).
+        # Terminai jau išskaidyti repozitorijos indekse - datos čia nebeskaidomos.
+        for loan in getattr(user, 'active_loans', []):
+            due = self.user_manager.due_ordinal(user, loan)
+            if due is None or due >= today:
+                continue # Neteisinga data arba dar nevėluoja
+
+            overdue_days = today - due
+            book_fine = overdue_days * FINE_PER_DAY
+            total_fine += book_fine
+
+            # Išsaugome detales atvaizdavimui (pavadinimą UI susiranda pagal ID)
+            overdue_books.append({
+                'book_id': loan['book_id'],
+                'days': overdue_days,
+                'fine': book_fine,
+                'due_date': loan['due_date']
+            })
         return total_fine, overdue_books
 
+    @write_locked
     def borrow_book(self, user_id, book_id):
         """
-        Vykdo knygos skolinimo transakciją.
+        Vykdo knygos skolinimo transakciją (viena knyga - žr. borrow_many).
         
         Patikrina:
         1. Ar vartotojas ir knyga egzistuoja.
@@ -82,104 +98,158 @@ class LoanService:
         
         Grąžina: (bool, str) -> (Sėkmė, Pranešimas)
         """
-        user = self.user_manager.get_by_id(user_id)
-        book = self.book_manager.get_by_id(book_id)
+        _, success, message = self.borrow_many(user_id, [book_id])[0]
+        return success, message
 
-        if not user: return False, "Vartotojas nerastas."
-        if not book: return False, "Knyga nerasta."
+    @write_locked
+    def borrow_many(self, user_id, book_ids, all_or_nothing=False):
+        """
+        Išduoda kelias knygas vienai transakcijai.
+        Vartotojas, bauda ir vėlavimai tikrinami VIENĄ kartą, limitas - visai grupei.
+        Visi pakeitimai įrašomi vienu kartu (o ne 2 failai kiekvienai knygai).
+
+        Parametrai:
+        - all_or_nothing: True - jei bent viena knyga netinka, neišduodama nė viena.
+        Grąžina sąrašą [(book_id, sėkmė, pranešimas), ...] ta pačia tvarka.
+        """
+        user = self.user_manager.get_by_id(user_id)
+        if not user:
+            return [(book_id, False, "Vartotojas nerastas.") for book_id in book_ids]
 
-        # 1. Pirmiausia patikriname skolas
+        # 1. Vartotojo patikrinimai (vieną kartą visai grupei)
         current_fine, _ = self.calculate_fine(user)
-        
+        fine_error = None
         if current_fine > 0:
-            return False, f"Turite nesumokėtą {current_fine:.2f} € baudą už vėluojančias knygas. Skolinimas draudžiamas."
-
-        # 2. Likučio tikrinimas
-        if book.available_copies <= 0:
-            return False, "Šiuo metu visos šios knygos kopijos yra išduotos."
+            fine_error = f"Turite nesumokėtą {current_fine:.2f} € baudą už vėluojančias knygas. Skolinimas draudžiamas."
+        overdue_error = "Turite vėluojančių knygų! Skolinimas draudžiamas." if self.get_user_overdue_loans(user) else None
 
-        # 3. Vėlavimų tikrinimas (naudojame vidinį metodą)
-        if self.get_user_overdue_loans(user):
-            return False, "Turite vėluojančių knygų! Skolinimas draudžiamas."
+        held = {loan['book_id'] for loan in user.active_loans}
+        slots = MAX_BOOKS_PER_USER - len(user.active_loans)
 
-        # 4. Limito tikrinimas
-        if len(user.active_loans) >= MAX_BOOKS_PER_USER:
-            return False, f"Pasiektas {MAX_BOOKS_PER_USER} knygų limitas."
+        # 2. Kiekvienos knygos patikrinimai (ta pačia tvarka kaip anksčiau borrow_book)
+        results = []
+        accepted = []
+        for book_id in book_ids:
+            book = self.book_manager.get_by_id(book_id)
+            if not book:
+                error = "Knyga nerasta."
+            elif fine_error:
+                error = fine_error
+            elif book.available_copies <= 0:
+                error = "Šiuo metu visos šios knygos kopijos yra išduotos."
+            elif overdue_error:
+                error = overdue_error
+            elif slots <= 0:
+                error = f"Pasiektas {MAX_BOOKS_PER_USER} knygų limitas."
+            elif book.id in held:
+                error = "Jau turite šios knygos kopiją."
+            else:
+                error = None
+                held.add(book.id)
+                slots -= 1
+                accepted.append((len(results), book))
+            results.append((book_id, False, error))
 
-        # 5. Dublikatų tikrinimas
-        for loan in user.active_loans:
-            if loan['book_id'] == book.id:
-                return False, "Jau turite šios knygos kopiją."
+        if all_or_nothing and len(accepted) < len(book_ids):
+            return [(book_id, False, error or "Atšaukta: ne visos pasirinktos knygos gali būti išduotos.")
+                    for book_id, _, error in results]
 
         # --- VEIKSMAS ---
-        book.available_copies -= 1
-        
-        return_date = datetime.now() + timedelta(days=LOAN_PERIOD_DAYS)
-        formatted_date = return_date.strftime(DATE_FORMAT)
-        
-        loan_record = {
-            "book_id": book.id,
-            "title": book.title,
-            "due_date": formatted_date
-        }
-        
-        user.active_loans.append(loan_record)
-
-        # Išsaugome pakeitimus per managerius
-        self.book_manager.save()
-        self.user_manager.save()
-
-        return True, f"Knyga '{book.title}' išduota. Liko kopijų: {book.available_copies}"
+        formatted_date = (datetime.now() + timedelta(days=LOAN_PERIOD_DAYS)).strftime(DATE_FORMAT)
+        changes = []
+        with batch_all(self.book_manager, self.user_manager):
+            for position, book in accepted:
+                # Per repozitorijas (update/add_loan), kad statistika sužinotų apie pakeitimą
+                self.book_manager.update(book, available_copies=book.available_copies - 1)
+                # Pavadinimas - tas pats objektas kaip knygos (ne kopija)
+                self.user_manager.add_loan(user, Loan(book.id, book.title, formatted_date))
+                changes.append((LoanJournal.BORROW, user.id, book.id, book.title, formatted_date))
+                results[position] = (results[position][0], True,
+                                     f"Knyga '{book.title}' išduota. Liko kopijų: {book.available_copies}")
+            self._record_loan_changes(changes)
+        return results
 
+    @write_locked
     def return_book(self, user_id, book_id):
         """
-        Vykdo knygos grąžinimo procedūrą.
+        Vykdo knygos grąžinimo procedūrą (viena knyga - žr. return_many).
+        """
+        _, success, message = self.return_many(user_id, [book_id])[0]
+        return success, message
+
+    @write_locked
+    def return_many(self, user_id, book_ids, all_or_nothing=False):
+        """
+        Grąžina kelias knygas vienai transakcijai ir įrašo pakeitimus vieną kartą.
+        Grąžina sąrašą [(book_id, sėkmė, pranešimas), ...] ta pačia tvarka.
         """
         user = self.user_manager.get_by_id(user_id)
-        # Knygos objektas gali būti None, jei knyga buvo ištrinta iš sistemos,
-        # bet vartotojas vis dar turi įrašą apie ją.
-        book = self.book_manager.get_by_id(book_id)
+        if not user:
+            return [(book_id, False, "Vartotojas nerastas.") for book_id in book_ids]
+
+        loans = {loan['book_id']: loan for loan in user.active_loans}
+        results = []
+        accepted = []
+        for book_id in book_ids:
+            loan = loans.pop(book_id, None) # pop - ta pati knyga sąraše du kartus negrąžinama
+            if loan is None:
+                results.append((book_id, False, "Vartotojas neturi pasiėmęs šios knygos."))
+            else:
+                accepted.append(loan)
+                results.append((book_id, True, "Knyga sėkmingai grąžinta."))
+
+        if all_or_nothing and len(accepted) < len(book_ids):
+            return [(book_id, False, message if not success else "Atšaukta: ne visos knygos gali būti grąžintos.")
+                    for book_id, success, message in results]
 
+        changes = []
+        with batch_all(self.book_manager, self.user_manager):
+            for loan in accepted:
+                book_id = loan['book_id']
+                # Pašaliname iš vartotojo
+                self.user_manager.remove_loan(user, loan)
+                # Grąžiname į lentyną (knyga gali būti ištrinta, nors skaitytojas dar turi įrašą)
+                book = self.book_manager.get_by_id(book_id)
+                if book:
+                    self.book_manager.update(
+                        book, available_copies=min(book.available_copies + 1, book.total_copies)
+                    )
+                changes.append((LoanJournal.RETURN, user.id, book_id, None, None))
+            self._record_loan_changes(changes)
+        return results
+
+    @write_locked
+    def renew_book(self, user_id, book_id):
+        """
+        Pratęsia paskolą: naujas terminas - LOAN_PERIOD_DAYS dienų nuo šiandien.
+        Vėluojančios knygos pratęsti negalima.
+        """
+        user = self.user_manager.get_by_id(user_id)
         if not user: return False, "Vartotojas nerastas."
 
-        loan_to_remove = None
-        for loan in user.active_loans:
-            if loan['book_id'] == book_id:
-                loan_to_remove = loan
-                break
-        
-        if not loan_to_remove:
+        loan = next((l for l in user.active_loans if l['book_id'] == book_id), None)
+        if not loan:
             return False, "Vartotojas neturi pasiėmęs šios knygos."
+        if loan in self.get_user_overdue_loans(user):
+            return False, "Vėluojančios knygos pratęsti negalima. Pirmiausia ją grąžinkite."
 
-        # Pašaliname iš vartotojo
-        user.active_loans.remove(loan_to_remove)
-        
-        # Grąžiname į lentyną (jei knyga vis dar egzistuoja duomenų bazėje)
-        if book:
-            book.available_copies += 1
-            if book.available_copies > book.total_copies:
-                book.available_copies = book.total_copies
-
-        self.book_manager.save()
-        self.user_manager.save()
+        new_date = (datetime.now() + timedelta(days=LOAN_PERIOD_DAYS)).strftime(DATE_FORMAT)
+        self.user_manager.set_loan_due(user, loan, new_date)
+        self._record_loan_change(LoanJournal.RENEW, user, book_id, due_date=new_date)
 
-        return True, "Knyga sėkmingai grąžinta."
+        return True, f"Terminas pratęstas iki {new_date}."
 
+    @write_locked
     def return_all_books(self, user_id):
         """
-        Grąžina visas konkretaus vartotojo knygas.
+        Grąžina visas konkretaus vartotojo knygas (viena return_many transakcija).
         """
         user = self.user_manager.get_by_id(user_id)
         if not user or not user.active_loans:
             return False, "Nėra ką grąžinti."
-            
-        loans_copy = list(user.active_loans)
-        count = 0
-        
-        for loan in loans_copy:
-            self.return_book(user_id, loan['book_id'])
-            count += 1
-            
+
+        results = self.return_many(user_id, [loan['book_id'] for loan in user.active_loans])
+        count = sum(1 for _, success, _ in results if success)
         return True, f"Grąžinta knygų: {count}"
 
     def get_user_overdue_loans(self, user):
@@ -189,16 +259,10 @@ class LoanService:
         if user.role != 'reader':
             return []
 
+        today = datetime.now().date().toordinal()
         overdue_loans = []
-        today = datetime.now().date()
-
         for loan in user.active_loans:
-            due_date_str = loan['due_date']
-            try:
-                due_date_obj = datetime.strptime(due_date_str, DATE_FORMAT).date()
-                if due_date_obj < today:
-                    overdue_loans.append(loan)
-            except ValueError:
-                pass
-        
-        return overdue_loans    
\ No newline at end of file
+            due = self.user_manager.due_ordinal(user, loan)
+            if due is not None and due < today:
+                overdue_loans.append(loan)
+        return overdue_loans
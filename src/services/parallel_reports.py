@@ -0,0 +1,96 @@
+"""
+FILE: src/services/parallel_reports.py
+PURPOSE: Paskolų istorijos (loan_history.jsonl + loan_journal.jsonl) skaičiavimas keliuose procesuose.
+RELATIONSHIPS:
+  - Naudojama StatsService (get_most_borrowed_books, get_borrowed_genre_history).
+  - Failų formatas - src/repositories/loan_journal.py (viena JSON eilutė - vienas įvykis).
+CONTEXT:
+  - Milijonų eilučių istorijoje brangiausia - JSON eilučių išskaidymas. Failas dalijamas
+    baitų intervalais (shard), kiekvieną intervalą procesas skaito ir skaičiuoja pats,
+    o pagrindinis procesas tik sujungia dalinius Counter ir žodynus.
+  - Procesams perduodami tik (kelias, pradžia, pabaiga) - jokių didelių objektų kopijavimo.
+  - Mažiems failams (mažiau nei min_bytes) arba workers <= 1 skaičiuojama tame pačiame
+    procese: procesų paleidimas kainuoja daugiau, nei sutaupoma.
+"""
+
+import json
+import os
+from collections import Counter
+
+def scan_shard(path, start, end):
+    """
+    Suskaičiuoja skolinimus vienoje failo dalyje [start, end).
+    Eilutė priklauso tai daliai, kurioje yra jos pirmas baitas.
+    Grąžina (Counter{book_id: kiekis}, {book_id: pavadinimas}, sugadintų eilučių kiekis).
+    """
+    borrows = Counter()
+    titles = {}
+    broken = 0
+    with open(path, 'rb') as f:
+        if start:
+            f.seek(start - 1)
+            f.readline() # Iki pirmos eilutės, prasidedančios ne anksčiau nei start
+        pos = f.tell()
+        while pos < end:
+            line = f.readline()
+            if not line:
+                break
+            pos += len(line)
+            if b'"borrow"' not in line: # Greitas filtras: grąžinimų ir pratęsimų neskaidome
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                broken += 1 # Dažniausiai - nutrūkusi paskutinė eilutė po avarijos
+                continue
+            if event.get('op') == 'borrow':
+                book_id = event.get('book_id')
+                borrows[book_id] += 1
+                if event.get('title'):
+                    titles[book_id] = event['title']
+    return borrows, titles, broken
+
+def _scan_shard_args(args):
+    return scan_shard(*args)
+
+def split_shards(paths, parts):
+    """Padalija failus į maždaug vienodus baitų intervalus: [(kelias, pradžia, pabaiga), ...]."""
+    files = [(path, os.path.getsize(path)) for path in paths if os.path.exists(path)]
+    total = sum(size for _, size in files)
+    if not total:
+        return []
+    chunk = max(1, -(-total // max(1, parts))) # Apvalinama į viršų
+    shards = []
+    for path, size in files:
+        for start in range(0, size, chunk):
+            shards.append((path, start, min(size, start + chunk)))
+    return shards
+
+def scan_history(paths, workers=0, min_bytes=0):
+    """
+    Skolinimų suvestinė per visus failus (tvarka svarbi: vėlesnis pavadinimas perrašo ankstesnį).
+    - workers <= 1 arba failai mažesni nei min_bytes: viename procese.
+    - kitaip: ProcessPoolExecutor su 'workers' procesų, po kelis intervalus kiekvienam.
+    Grąžina (Counter{book_id: kiekis}, {book_id: pavadinimas}, sugadintų eilučių kiekis).
+    """
+    total = sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+    if workers <= 1 or total < min_bytes:
+        partials = map(_scan_shard_args, split_shards(paths, 1))
+        return _merge(partials)
+
+    from concurrent.futures import ProcessPoolExecutor # Tik kai procesai tikrai reikalingi
+
+    # Daugiau intervalų nei procesų - kad lėtesnis procesas nestabdytų visų
+    shards = split_shards(paths, workers * 4)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return _merge(pool.map(_scan_shard_args, shards))
+
+def _merge(partials):
+    borrows = Counter()
+    titles = {}
+    broken = 0
+    for part_borrows, part_titles, part_broken in partials: # map() grąžina intervalų tvarka
+        borrows.update(part_borrows)
+        titles.update(part_titles)
+        broken += part_broken
+    return borrows, titles, broken
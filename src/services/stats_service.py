@@ -6,55 +6,212 @@ RELATIONSHIPS:
   - Importuoja config nustatymus.
 CONTEXT:
   - Analitikos modulis, atskirtas nuo transakcinės logikos.
+  - Suvestinės (žanrų kiekiai, metų suma, kopijos, paskolos pagal žanrą)
+    laikomos atmintyje ir atnaujinamos per repozitorijų įvykius (subscribe) po O(1),
+    todėl get_advanced_statistics() nebeperrenka visų knygų ir vartotojų.
+  - check_consistency() perskaičiuoja viską iš naujo ir palygina (arba pataiso).
+  - Jei repozitorijos dar neužkrautos (config.LAZY_LOADING), suvestinės neskaičiuojamos
+    startuojant - tik pirmą kartą jų prireikus. Visą sąrašą pakeitus (RESET) jos
+    tiesiog pamirštamos (None) ir vėliau perskaičiuojamos.
+  - Paskolų istorijos ataskaitos (populiariausios knygos, žanrai per visą istoriją) gali būti
+    skaičiuojamos keliuose procesuose (parallel_reports, config.REPORT_WORKERS).
 """
 
 from datetime import datetime, timedelta
+import logging
 from collections import Counter
-from src.config import DATE_FORMAT
+from src.config import REPORT_WORKERS, REPORT_PARALLEL_MIN_BYTES
+from src.repositories.base_repository import (RESET, ADDED, REMOVED, CHANGING, CHANGED,
+                                               LOAN_ADDED, LOAN_REMOVED)
+from src.perf import instrumented
+from src.repositories.rwlock import read_locked, write_locked
+from src.services.parallel_reports import scan_history
 
+def _bump(counter, key, delta):
+    """Counter pakeitimas, neįsimenantis nulinių reikšmių (kad most_common jų nerodytų)."""
+    value = counter[key] + delta
+    if value > 0:
+        counter[key] = value
+    else:
+        counter.pop(key, None)
+
+@instrumented # Visi vieši metodai matuojami (src/perf.py)
 class StatsService:
-    def __init__(self, book_manager, user_manager):
+    def __init__(self, book_manager, user_manager, journal=None, workers=None):
         self.book_manager = book_manager
         self.user_manager = user_manager
+        self.journal = journal # Paskolų istorija (LoanJournal), jei įjungta
+        # Procesų kiekis istorijos ataskaitoms (0 - viename procese)
+        self.workers = REPORT_WORKERS if workers is None else workers
+        self.parallel_min_bytes = REPORT_PARALLEL_MIN_BYTES
+        # Suvestinės keičiamos įvykių metu (t.y. laikant rašymo užraktą), skaitomos - su read()
+        self.lock = book_manager.lock
+
+        # None - dar nesuskaičiuota (neužkrautų repozitorijų neverčiame skaityti failų)
+        self._aggregates = None
+        if book_manager.is_loaded and user_manager.is_loaded:
+            self._aggregates = self._compute_aggregates()
+        book_manager.subscribe(self._on_book_event)
+        user_manager.subscribe(self._on_user_event)
+
+    # --- Suvestinės ---
+
+    @staticmethod
+    def _empty_aggregates():
+        return {
+            "genres": Counter(),           # žanras -> knygų (įrašų) kiekis
+            "borrowed_genres": Counter(),  # žanras -> aktyvių paskolų kiekis
+            "loans_per_book": Counter(),   # knygos ID -> aktyvių paskolų kiekis
+            "year_sum": 0,
+            "year_count": 0,
+            "total_copies": 0,
+            "available_copies": 0,
+            "readers": 0,
+        }
+
+    def _compute_aggregates(self):
+        """Suvestinės, suskaičiuotos iš naujo (O(n)) - naudojama startuojant ir tikrinant."""
+        agg = self._empty_aggregates()
+        # Pirma knygos, po to paskolos: paskola pati prideda savo knygos žanrą
+        for book in self.book_manager.books:
+            self._apply_book(agg, book, +1)
+        for user in self.user_manager.users:
+            self._apply_user(agg, user, +1)
+        return agg
+
+    @staticmethod
+    def _apply_book(agg, book, sign):
+        _bump(agg["genres"], book.genre, sign)
+        if isinstance(book.year, int):
+            agg["year_sum"] += sign * book.year
+            agg["year_count"] += sign
+        agg["total_copies"] += sign * int(book.total_copies)
+        agg["available_copies"] += sign * int(book.available_copies)
+        loans = agg["loans_per_book"].get(book.id, 0)
+        if loans:
+            _bump(agg["borrowed_genres"], book.genre, sign * loans)
+
+    def _apply_loan(self, agg, loan, sign):
+        book_id = loan['book_id']
+        _bump(agg["loans_per_book"], book_id, sign)
+        book = self.book_manager.get_by_id(book_id)
+        if book:
+            _bump(agg["borrowed_genres"], book.genre, sign)
+
+    def _apply_user(self, agg, user, sign):
+        if user.role != 'reader':
+            return
+        agg["readers"] += sign
+        for loan in user.active_loans:
+            self._apply_loan(agg, loan, sign)
+
+    def _current_aggregates(self):
+        """Suvestinės; suskaičiuojamos pirmą kartą prireikus (kviečiama laikant užraktą)."""
+        if self._aggregates is None:
+            self._aggregates = self._compute_aggregates()
+        return self._aggregates
+
+    def _on_book_event(self, event, book):
+        # RESET gali įvykti tingiai užkraunant skaitymo užrakto viduje, todėl čia
+        # neperskaičiuojame (rebuild reikalautų rašymo užrakto) - tik pamirštame
+        if event == RESET:
+            self._aggregates = None
+        elif self._aggregates is None:
+            return
+        elif event in (ADDED, CHANGED):
+            self._apply_book(self._aggregates, book, +1)
+        elif event in (REMOVED, CHANGING):
+            self._apply_book(self._aggregates, book, -1)
+
+    def _on_user_event(self, event, item):
+        if event == RESET:
+            self._aggregates = None
+        elif self._aggregates is None:
+            return
+        elif event == ADDED:
+            self._apply_user(self._aggregates, item, +1)
+        elif event == REMOVED:
+            self._apply_user(self._aggregates, item, -1)
+        elif event == LOAN_ADDED:
+            self._apply_loan(self._aggregates, item[1], +1)
+        elif event == LOAN_REMOVED:
+            self._apply_loan(self._aggregates, item[1], -1)
+
+    @write_locked
+    def rebuild(self):
+        """Perskaičiuoja visas suvestines iš naujo."""
+        self._aggregates = self._compute_aggregates()
+
+    @write_locked
+    def check_consistency(self, repair=True):
+        """
+        Palygina einamas suvestines su perskaičiuotomis iš naujo.
+        Grąžina True, jei sutapo. Jei nesutapo ir repair=True - suvestinės pakeičiamos teisingomis.
+        """
+        fresh = self._compute_aggregates()
+        if self._aggregates is None: # Dar nesuskaičiuota - nėra kuo išsiskirti
+            self._aggregates = fresh
+            return True
+        consistent = fresh == self._aggregates
+        if not consistent and repair:
+            self._aggregates = fresh
+        return consistent
 
+    def _history_borrows(self):
+        """Skolinimų kiekiai ir pavadinimai per visą istoriją (keliuose procesuose, jei įjungta)."""
+        if self.journal is None:
+            return Counter(), {}
+        counts, titles, broken = scan_history(
+            [self.journal.history_path, self.journal.journal_path],
+            workers=self.workers, min_bytes=self.parallel_min_bytes
+        )
+        if broken:
+            logging.warning(f"Paskolų istorijoje praleista sugadintų eilučių: {broken}")
+        return counts, titles
+
+    def get_most_borrowed_books(self, limit=10):
+        """
+        Dažniausiai skolintos knygos per visą istoriją (reikia paskolų žurnalo).
+        Grąžina [(pavadinimas, kiekis), ...].
+        """
+        counts, titles = self._history_borrows()
+        return [(titles.get(book_id, book_id), count) for book_id, count in counts.most_common(limit)]
+
+    def get_borrowed_genre_history(self):
+        """
+        Skolinimai pagal žanrą per visą istoriją (Counter{žanras: kiekis}).
+        Žanras imamas iš dabartinio katalogo; ištrintos knygos - "Nežinomas".
+        """
+        counts, _ = self._history_borrows()
+        genres = Counter()
+        for book_id, count in counts.items():
+            book = self.book_manager.get_by_id(book_id)
+            genres[book.genre if book else "Nežinomas"] += count
+        return genres
+
+    @read_locked
     def get_all_overdue_report(self):
         """
-        Generuoja bendrą visų vėluojančių knygų ataskaitą administratoriui.
+        Generuoja bendrą visų vėluojančių knygų ataskaitą administratoriui
+        (nuo seniausiai vėluojančios; per paskolų terminų indeksą).
         """
-        overdue_report = []
-        today = datetime.now().date()
-        
-        for user in self.user_manager.users:
-            if user.role == 'reader':
-                for loan in user.active_loans:
-                    try:
-                        due = datetime.strptime(loan['due_date'], DATE_FORMAT).date()
-                        if due < today:
-                            overdue_report.append({
-                                "title": loan['title'],
-                                "user": user.username,
-                                "due_date": loan['due_date']
-                            })
-                    except ValueError:
-                        pass
-        return overdue_report
+        today = datetime.now().date().toordinal()
+        return [
+            {"title": loan['title'], "user": user.username, "due_date": loan['due_date']}
+            for user, loan in self.user_manager.loans_due_before(today)
+        ]
 
+    @read_locked
     def get_lost_books_candidates(self, years_overdue):
         """
         Randa knygas, kurios vėluoja daugiau nei X metų (laikomos prarastomis).
         """
         threshold_date = datetime.now() - timedelta(days=years_overdue * 365)
-        lost_book_ids = set()
-        
-        for user in self.user_manager.users:
-            if user.role == 'reader':
-                for loan in user.active_loans:
-                    try:
-                        due_date_obj = datetime.strptime(loan['due_date'], DATE_FORMAT)
-                        if due_date_obj < threshold_date:
-                            lost_book_ids.add(loan['book_id'])
-                    except ValueError:
-                        pass
+        # Terminas (vidurnaktis) ankstesnis už ribą <=> termino diena ne vėlesnė už ribos dieną
+        cutoff = threshold_date.date().toordinal() + 1
+        lost_book_ids = dict.fromkeys(
+            loan['book_id'] for _, loan in self.user_manager.loans_due_before(cutoff)
+        )
         
         # Konvertuojame ID į objektus
         candidates = []
@@ -64,59 +221,48 @@ class StatsService:
                 candidates.append(book)
         return candidates
 
+    @read_locked
     def get_advanced_statistics(self):
         """
         Surenka ir grąžina "big picture" statistiką.
+        Skaitoma iš palaikomų suvestinių (nereikia perrinkti knygų ir vartotojų).
         """
+        agg = self._current_aggregates()
         stats = {}
         
         # 1. Populiariausias žanras (Inventorius)
-        all_genres = [b.genre for b in self.book_manager.books]
-        if all_genres:
-            top_genre, count = Counter(all_genres).most_common(1)[0]
+        if agg["genres"]:
+            top_genre, count = agg["genres"].most_common(1)[0]
             stats['inventory_top_genre'] = f"{top_genre} ({count} vnt.)"
         else:
             stats['inventory_top_genre'] = "Nėra duomenų"
 
         # 2. Skolinimosi statistika
-        borrowed_genres = []
-        total_overdue_books = 0
-        reader_count = 0
-        today = datetime.now().date()
-        
-        for user in self.user_manager.users:
-            if user.role == 'reader':
-                reader_count += 1
-                for loan in user.active_loans:
-                    book = self.book_manager.get_by_id(loan['book_id'])
-                    if book:
-                        borrowed_genres.append(book.genre)
-                    
-                    try:
-                        due_obj = datetime.strptime(loan['due_date'], DATE_FORMAT).date()
-                        if due_obj < today:
-                            total_overdue_books += 1
-                    except ValueError:
-                        pass
-        
-        if borrowed_genres:
-            top_borrowed, b_count = Counter(borrowed_genres).most_common(1)[0]
+        if agg["borrowed_genres"]:
+            top_borrowed, b_count = agg["borrowed_genres"].most_common(1)[0]
             stats['borrowed_top_genre'] = f"{top_borrowed} ({b_count} skolinimai)"
         else:
             stats['borrowed_top_genre'] = "Nėra aktyvių skolinimų"
 
         # 3. Vidutiniai rodikliai
-        if reader_count > 0:
-            avg = total_overdue_books / reader_count
+        # Vėlavimai priklauso nuo šiandienos datos - juos suskaičiuoja terminų indeksas (O(log n))
+        if agg["readers"] > 0:
+            today = datetime.now().date().toordinal()
+            total_overdue_books = self.user_manager.count_loans_due_before(today)
+            avg = total_overdue_books / agg["readers"]
             stats['avg_overdue_per_reader'] = f"{avg:.2f}"
         else:
             stats['avg_overdue_per_reader'] = "0.00"
             
-        years = [int(b.year) for b in self.book_manager.books if isinstance(b.year, int)]
-        if years:
-            avg_year = sum(years) / len(years)
+        if agg["year_count"]:
+            avg_year = agg["year_sum"] / agg["year_count"]
             stats['avg_book_year'] = f"{int(avg_year)} metai"
         else:
             stats['avg_book_year'] = "-"
 
-        return stats
\ No newline at end of file
+        # 4. Fondo dydis (kopijos) ir skaitytojai
+        stats['total_copies'] = agg["total_copies"]
+        stats['available_copies'] = agg["available_copies"]
+        stats['reader_count'] = agg["readers"]
+
+        return stats
@@ -0,0 +1,64 @@
+"""
+FILE: src/tools/convert_store.py
+PURPOSE: Konvertuoja duomenų failus (books, users, books_backup) tarp saugojimo formatų.
+RELATIONSHIPS:
+  - Naudoja src/data_manager.py (CODECS, load_data, save_data).
+  - Failų pavadinimai imami iš src/config.py.
+CONTEXT:
+  - Pakeitus config.STORAGE_FORMAT, esamus duomenis reikia vieną kartą konvertuoti.
+  - Paleidimas:
+      python -m src.tools.convert_store --to marshal
+      python -m src.tools.convert_store --from marshal --to json --data-dir kitas/aplankas
+  - Originalūs failai neištrinami.
+"""
+
+import argparse
+import os
+import time
+
+from src import data_manager
+from src.config import BOOKS_FILENAME, USERS_FILENAME, BACKUP_FILENAME, STORAGE_FORMAT
+
+def convert_file(source_path, target_path, from_fmt, to_fmt):
+    """Konvertuoja vieną failą. Grąžina (įrašų kiekis, sekundės)."""
+    start = time.perf_counter()
+    data = data_manager.load_data(source_path, fmt=from_fmt)
+    data_manager.save_data(target_path, data, backup=False, fmt=to_fmt)
+    return len(data), time.perf_counter() - start
+
+def convert_store(from_fmt, to_fmt, data_dir=None):
+    """Konvertuoja visus žinomus duomenų failus. Grąžina ataskaitos eilučių sąrašą."""
+    report = []
+    for name in (BOOKS_FILENAME, USERS_FILENAME, BACKUP_FILENAME):
+        source_name = data_manager.get_store_filename(name, from_fmt)
+        target_name = data_manager.get_store_filename(name, to_fmt)
+        if data_dir:
+            source_path = os.path.join(data_dir, source_name)
+            target_path = os.path.join(data_dir, target_name)
+        else:
+            source_path = data_manager.get_data_file_path(source_name)
+            target_path = data_manager.get_data_file_path(target_name)
+
+        if not os.path.exists(source_path):
+            report.append(f"{source_name}: nerastas, praleidžiama")
+            continue
+        count, seconds = convert_file(source_path, target_path, from_fmt, to_fmt)
+        size = os.path.getsize(target_path)
+        report.append(f"{source_name} -> {target_name}: {count} įrašų, {size} B, {seconds * 1000:.1f} ms")
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Duomenų failų formato konvertavimas.")
+    parser.add_argument("--from", dest="from_fmt", default=STORAGE_FORMAT,
+                        choices=sorted(data_manager.CODECS), help="Dabartinis formatas")
+    parser.add_argument("--to", dest="to_fmt", required=True,
+                        choices=sorted(data_manager.CODECS), help="Naujas formatas")
+    parser.add_argument("--data-dir", default=None, help="Duomenų aplankas (numatyta: data/)")
+    args = parser.parse_args(argv)
+
+    for line in convert_store(args.from_fmt, args.to_fmt, args.data_dir):
+        print(line)
+    print(f"Nepamirškite nustatyti STORAGE_FORMAT = \"{args.to_fmt}\" faile src/config.py")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+FILE: src/tools/import_books.py
+PURPOSE: Masinis knygų importas iš CSV arba JSONL failo.
+RELATIONSHIPS:
+  - Eilutes perduoda InventoryService.import_books (per Library).
+  - Skaitymas - generatoriai: failas neįkeliamas į atmintį visas.
+CONTEXT:
+  - Paleidimas:
+      python -m src.tools.import_books naujos_knygos.csv
+      python -m src.tools.import_books katalogas.jsonl --format jsonl
+  - CSV: pirmoje eilutėje stulpelių pavadinimai: title,author,year,genre[,copies]
+  - JSONL: kiekvienoje eilutėje vienas JSON objektas su tais pačiais laukais.
+  - Esamos knygos (tas pats pavadinimas ir autorius) neperkuriamos - padidinamas kopijų kiekis.
+"""
+
+import argparse
+import csv
+import json
+import os
+
+FORMATS = ("csv", "jsonl")
+
+def read_csv(path):
+    """Generatorius: CSV eilutės kaip žodynai (utf-8-sig - tinka ir Excel failai su BOM)."""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        yield from csv.DictReader(f)
+
+def read_jsonl(path):
+    """Generatorius: JSONL eilutės kaip žodynai (tuščios eilutės praleidžiamos)."""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = {} # Bus atmesta validacijoje kaip klaidinga eilutė
+            yield record if isinstance(record, dict) else {}
+
+def read_records(path, fmt=None):
+    """Parenka skaitytuvą pagal formatą arba failo plėtinį."""
+    fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+    if fmt == "csv":
+        return read_csv(path)
+    if fmt in ("jsonl", "ndjson"):
+        return read_jsonl(path)
+    raise ValueError(f"Nežinomas failo formatas: {fmt} (galimi: {', '.join(FORMATS)})")
+
+def format_report(report):
+    """Ataskaitos eilutės (naudojama ir terminalo meniu)."""
+    lines = [
+        f"Perskaityta eilučių: {report['rows']}",
+        f"Naujų knygų: {report['added']}, papildyta esamų: {report['merged']}, "
+        f"kopijų iš viso: {report['copies']}",
+        f"Klaidingų eilučių: {report['errors']}",
+        f"Laikas: {report['seconds']:.2f} s ({report['rows_per_second']:.0f} eil./s)",
+    ]
+    for row_number, message in report['error_details'][:10]:
+        lines.append(f"  eilutė {row_number}: {message}")
+    return lines
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Knygų importas iš CSV/JSONL failo.")
+    parser.add_argument("path", help="Importuojamas failas")
+    parser.add_argument("--format", dest="fmt", choices=FORMATS, default=None,
+                        help="Failo formatas (numatyta: pagal plėtinį)")
+    args = parser.parse_args(argv)
+
+    from src.library import Library # Importuojama tik paleidus (kad --help būtų greitas)
+    library = Library()
+    report = library.inventory_service.import_books(read_records(args.path, args.fmt))
+    for line in format_report(report):
+        print(line)
+
+if __name__ == "__main__":
+    main()
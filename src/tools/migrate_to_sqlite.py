@@ -0,0 +1,334 @@
+"""
+FILE: src/tools/migrate_to_sqlite.py
+PURPOSE: Perkelia JSON duomenis (books, users ir jų active_loans) į SQLite schemą (src/database.py).
+RELATIONSHIPS:
+  - Lentelės ir masinės operacijos - src/database.py (initialize_db, bulk_upsert, bulk_insert).
+  - Failų pavadinimai ir formatai - src/config.py ir src/data_manager.py (get_store_filename).
+  - Po perkėlimo naudojamas config.STORAGE_BACKEND = "sqlite".
+CONTEXT:
+  - Paleidimas:
+      python -m src.tools.migrate_to_sqlite
+      python -m src.tools.migrate_to_sqlite --data-dir kitas/aplankas --db kitas/library.db
+  - Failai skaitomi srautu (iter_records): JSON masyvas skaidomas po vieną objektą,
+    todėl atmintis priklauso nuo batch_size, o ne nuo failo dydžio (tinka ir keliems GB).
+  - Reader.active_loans išskleidžiamos į loans lentelę (viena paskola - viena eilutė).
+  - Įrašoma executemany paketais; viena transakcija apima commit_every įrašų
+    (0 - visas failas vienoje transakcijoje) kartu su progreso įrašu lentelėje migration_state.
+    Nutraukus programą, pakartotinis paleidimas tęsia nuo paskutinio commit (resume).
+  - Pabaigoje verify(): eilučių kiekiai ir kopijų invariantai
+    (0 <= available <= total, total - available = paskolų kiekis, paskolos be knygos/vartotojo).
+  - marshal formatas srautu neskaitomas - jis įkeliamas visas (data_manager.load_data).
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+
+from src import data_manager, database
+from src.config import BOOKS_FILENAME, USERS_FILENAME, STORAGE_FORMAT
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 10_000          # Eilučių viename executemany
+COMMIT_EVERY = 500_000       # Įrašų vienoje transakcijoje (0 - visas failas)
+READ_CHUNK_CHARS = 1 << 20   # Kiek simbolių skaityti iš failo vienu kartu
+
+BOOK_COLUMNS = ('id', 'title', 'author', 'year', 'genre', 'total_copies', 'available_copies')
+USER_COLUMNS = ('id', 'username', 'role', 'password')
+LOAN_COLUMNS = ('user_id', 'book_id', 'due_date')
+
+# --- Srautinis skaitymas ---
+
+def iter_json_array(path, chunk_chars=READ_CHUNK_CHARS):
+    """
+    Generatorius: JSON masyvo ([{...}, {...}]) elementai po vieną.
+    Atmintyje laikomas tik vienas skaitymo gabalas ir šiuo metu skaidomas objektas.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding='utf-8') as f:
+        buf = f.read(chunk_chars).lstrip()
+        if not buf.startswith('['):
+            raise ValueError(f"{path}: tikėtasi JSON masyvo")
+        pos = 1
+        eof = False
+        while True:
+            # Praleidžiame tarpus ir kablelius tarp elementų
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buf) and buf[pos] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ValueError(f"{path}: sugadintas JSON (apie {pos}-ą simbolį gabale)")
+                item = None # Objektas nesibaigė šiame gabale - skaitome daugiau
+            if item is None:
+                chunk = f.read(chunk_chars)
+                eof = not chunk
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+            pos = end
+            yield item
+
+def iter_jsonl(path):
+    """Generatorius: JSONL eilutės (tuščios praleidžiamos)."""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def iter_records(path, fmt=None):
+    """Parenka skaitytuvą pagal formatą (json, json-compact - masyvas; jsonl - eilutės)."""
+    fmt = fmt or STORAGE_FORMAT
+    if fmt in ("json", "json-compact"):
+        return iter_json_array(path)
+    if fmt == "jsonl":
+        return iter_jsonl(path)
+    return iter(data_manager.load_data(path, fmt=fmt)) # marshal - tik visas failas
+
+# --- Įrašų -> eilučių konvertavimas ---
+
+def book_row(item):
+    """Knygos žodynas -> books eilutė (None - netinkamas įrašas)."""
+    if not item.get('id') or not item.get('title') or not item.get('author'):
+        return None
+    total = item.get('total_copies', 1)
+    return (item['id'], item['title'], item['author'], item.get('year'), item.get('genre'),
+            total, item.get('available_copies', total))
+
+def user_rows(item):
+    """Vartotojo žodynas -> (users eilutė, [loans eilutės]); netinkamas įrašas - (None, [])."""
+    if not item.get('id') or not item.get('username') or item.get('role') not in ('reader', 'librarian'):
+        return None, []
+    user_id = item['id']
+    loans = [(user_id, loan['book_id'], loan['due_date'])
+             for loan in item.get('active_loans') or ()
+             if loan.get('book_id') and loan.get('due_date')]
+    return (user_id, item['username'], item['role'], item.get('password')), loans
+
+# --- Progreso (resume) būsena ---
+
+def _ensure_state_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS migration_state (
+            source TEXT PRIMARY KEY,
+            records INTEGER NOT NULL,
+            rows INTEGER NOT NULL,
+            skipped INTEGER NOT NULL,
+            done INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+def _load_state(conn, source):
+    row = conn.execute("SELECT records, rows, skipped, done FROM migration_state WHERE source = ?",
+                       (source,)).fetchone()
+    return tuple(row) if row else (0, 0, 0, 0)
+
+def _save_state(conn, source, records, rows, skipped, done=0):
+    conn.execute("INSERT OR REPLACE INTO migration_state (source, records, rows, skipped, done) "
+                 "VALUES (?, ?, ?, ?, ?)", (source, records, rows, skipped, done))
+
+# --- Perkėlimas ---
+
+def migrate_source(conn, source, records, write_batch, batch_size=BATCH_SIZE,
+                   commit_every=COMMIT_EVERY, progress=None):
+    """
+    Perkelia vieną šaltinį. records - įrašų generatorius;
+    write_batch(conn, įrašai) -> (įrašytų eilučių kiekis, praleistų įrašų kiekis).
+    Jau perkelti (ankstesnio paleidimo) įrašai praleidžiami neįrašant.
+    Grąžina {'records', 'rows', 'skipped', 'resumed', 'new_rows', 'seconds'}
+    (records/rows/skipped - kartu su ankstesniais paleidimais, new_rows - tik šio paleidimo).
+    """
+    start = time.perf_counter()
+    done_records, rows, skipped, finished = _load_state(conn, source)
+    resumed = done_records
+    if finished:
+        return {'records': done_records, 'rows': rows, 'skipped': skipped,
+                'resumed': resumed, 'new_rows': 0, 'seconds': 0.0}
+
+    new_rows = 0
+    count = 0
+    since_commit = 0
+    batch = []
+
+    def flush():
+        nonlocal rows, skipped, new_rows
+        written, bad = write_batch(conn, batch)
+        rows += written
+        new_rows += written
+        skipped += bad
+        batch.clear()
+
+    for item in records:
+        count += 1
+        if count <= resumed:
+            continue # Įrašyta ankstesnio paleidimo metu
+        batch.append(item)
+        since_commit += 1
+        if len(batch) >= batch_size:
+            flush()
+        if commit_every and since_commit >= commit_every:
+            if batch:
+                flush()
+            _save_state(conn, source, count, rows, skipped)
+            conn.commit()
+            since_commit = 0
+            if progress:
+                progress(source, count, new_rows, time.perf_counter() - start)
+    if batch:
+        flush()
+    _save_state(conn, source, count, rows, skipped, done=1)
+    conn.commit()
+    seconds = time.perf_counter() - start
+    if progress and since_commit: # Kitaip paskutinis progresas jau parodytas
+        progress(source, count, new_rows, seconds)
+    return {'records': count, 'rows': rows, 'skipped': skipped,
+            'resumed': resumed, 'new_rows': new_rows, 'seconds': seconds}
+
+def _write_books(conn, items):
+    rows = [row for row in map(book_row, items) if row is not None]
+    database.bulk_upsert(conn, "books", BOOK_COLUMNS, rows)
+    return len(rows), len(items) - len(rows)
+
+def _write_users(conn, items):
+    users = []
+    loans = []
+    for item in items:
+        user, user_loans = user_rows(item)
+        if user is not None:
+            users.append(user)
+            loans.extend(user_loans)
+    database.bulk_upsert(conn, "users", USER_COLUMNS, users)
+    # Pakartotinai pateiktas vartotojas - jo paskolos perrašomos, o ne dubliuojamos
+    database.bulk_delete(conn, "loans", "user_id", [user[0] for user in users])
+    database.bulk_insert(conn, "loans", LOAN_COLUMNS, loans)
+    return len(users) + len(loans), len(items) - len(users)
+
+def migrate(books_path, users_path, db_file, fmt=None, batch_size=BATCH_SIZE,
+            commit_every=COMMIT_EVERY, replace=False, progress=None):
+    """
+    Perkelia knygas ir vartotojus į db_file. Grąžina ataskaitą (žodynas) su verify() rezultatu.
+    - replace=True: esami books/users/loans įrašai ir progresas ištrinami (migracija iš naujo).
+    - Jei DB jau turi duomenų, bet migracija nepradėta - ValueError (kad neperrašytume netyčia).
+    """
+    database.initialize_db(db_file)
+    conn = database.get_connection(db_file)
+    try:
+        _ensure_state_table(conn)
+        if replace:
+            with conn:
+                for table in ("loans", "users", "books", "migration_state"):
+                    conn.execute(f"DELETE FROM {table}")
+        started = conn.execute("SELECT COUNT(*) FROM migration_state").fetchone()[0]
+        if not started and _table_counts(conn) != {'books': 0, 'users': 0, 'loans': 0}:
+            raise ValueError(f"{db_file} jau turi duomenų: naudokite replace=True (--replace)")
+
+        start = time.perf_counter()
+        report = {
+            'books': migrate_source(conn, "books", iter_records(books_path, fmt), _write_books,
+                                    batch_size, commit_every, progress),
+            'users': migrate_source(conn, "users", iter_records(users_path, fmt), _write_users,
+                                    batch_size, commit_every, progress),
+        }
+        report['seconds'] = time.perf_counter() - start
+        new_rows = report['books']['new_rows'] + report['users']['new_rows']
+        report['rows_per_second'] = new_rows / report['seconds'] if report['seconds'] else 0.0
+        report['verify'] = verify(conn, report)
+        logger.info("Migracija į %s: %d eilučių per %.2f s, neatitikimų: %d", db_file, new_rows,
+                    report['seconds'], len(report['verify']['problems']))
+        return report
+    finally:
+        conn.close()
+
+# --- Patikra ---
+
+def _table_counts(conn):
+    return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("books", "users", "loans")}
+
+def verify(conn, report=None, sample=5):
+    """
+    Patikrina perkeltus duomenis. Grąžina {'counts': {...}, 'problems': [tekstas, ...]}.
+    Kiekiai lyginami su ataskaita (įrašytos eilutės); invariantai tikrinami SQL užklausomis.
+    """
+    counts = _table_counts(conn)
+    problems = []
+    if report:
+        # users šaltinio 'rows' = vartotojai + paskolos
+        expected_users_loans = report['users']['rows']
+        if counts['books'] != report['books']['rows']:
+            problems.append(f"knygų lentelėje {counts['books']}, perkelta {report['books']['rows']} "
+                            f"(pasikartojantys ID?)")
+        if counts['users'] + counts['loans'] != expected_users_loans:
+            problems.append(f"vartotojų ir paskolų lentelėse {counts['users'] + counts['loans']}, "
+                            f"perkelta {expected_users_loans} (pasikartojantys ID?)")
+        for source in ('books', 'users'):
+            if report[source]['skipped']:
+                problems.append(f"{source}: praleista netinkamų įrašų: {report[source]['skipped']}")
+
+    checks = [
+        ("available_copies už ribų [0, total_copies]",
+         "SELECT id FROM books WHERE available_copies < 0 OR available_copies > total_copies"),
+        ("total_copies - available_copies nesutampa su paskolų kiekiu",
+         "SELECT b.id FROM books b LEFT JOIN (SELECT book_id, COUNT(*) AS n FROM loans GROUP BY book_id) l "
+         "ON l.book_id = b.id WHERE b.total_copies - b.available_copies != COALESCE(l.n, 0)"),
+        ("paskolos nežinomai knygai",
+         "SELECT DISTINCT book_id FROM loans WHERE book_id NOT IN (SELECT id FROM books)"),
+        ("paskolos nežinomam vartotojui",
+         "SELECT DISTINCT user_id FROM loans WHERE user_id NOT IN (SELECT id FROM users)"),
+    ]
+    for title, sql in checks:
+        ids = [row[0] for row in conn.execute(sql)]
+        if ids:
+            problems.append(f"{title}: {len(ids)} (pvz. {', '.join(map(str, ids[:sample]))})")
+    return {'counts': counts, 'problems': problems}
+
+def format_report(report):
+    """Ataskaitos eilutės terminalui."""
+    lines = []
+    for source in ('books', 'users'):
+        part = report[source]
+        resumed = f", tęsta nuo {part['resumed']}" if part['resumed'] else ""
+        lines.append(f"{source}: įrašų {part['records']}, eilučių {part['rows']}, "
+                     f"praleista {part['skipped']}{resumed}")
+    counts = report['verify']['counts']
+    lines.append(f"Lentelėse: books {counts['books']}, users {counts['users']}, loans {counts['loans']}")
+    lines.append(f"Laikas: {report['seconds']:.2f} s ({report['rows_per_second']:.0f} eil./s)")
+    problems = report['verify']['problems']
+    lines.append("Patikra: OK" if not problems else "Patikra: rasta neatitikimų")
+    lines.extend(f"  {problem}" for problem in problems)
+    return lines
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON duomenų perkėlimas į SQLite.")
+    parser.add_argument("--data-dir", default=None, help="JSON failų aplankas (numatyta: data/)")
+    parser.add_argument("--format", dest="fmt", default=STORAGE_FORMAT,
+                        choices=sorted(data_manager.CODECS), help="JSON failų formatas")
+    parser.add_argument("--db", default=None, help="SQLite failas (numatyta: data/library.db)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Eilučių viename executemany")
+    parser.add_argument("--commit-every", type=int, default=COMMIT_EVERY,
+                        help="Įrašų vienoje transakcijoje (0 - visas failas)")
+    parser.add_argument("--replace", action="store_true", help="Ištrinti esamus DB duomenis ir pradėti iš naujo")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for name in (BOOKS_FILENAME, USERS_FILENAME):
+        filename = data_manager.get_store_filename(name, args.fmt)
+        paths.append(os.path.join(args.data_dir, filename) if args.data_dir
+                     else data_manager.get_data_file_path(filename))
+
+    def progress(source, records, rows, seconds):
+        print(f"  {source}: {records} įrašų, {rows / seconds if seconds else 0:.0f} eil./s")
+
+    report = migrate(paths[0], paths[1], args.db or database.DB_FILE, args.fmt,
+                     args.batch_size, args.commit_every, args.replace, progress)
+    for line in format_report(report):
+        print(line)
+    return 1 if report['verify']['problems'] else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
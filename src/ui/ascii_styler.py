@@ -9,9 +9,6 @@ APRAŠYMAS:
   lygiavimui lentelėse ir meniu, užtikrinant vienodą vizualinį stilių visoje programoje.
 """
 
-from turtle import title
-
-
 def draw_ascii_table(headers, rows, title=None):
     """
     Atvaizduoja dinaminę ASCII lentelę pagal pateiktas antraštes ir eilučių duomenis.
@@ -1,5 +1,6 @@
 import os
 from datetime import datetime # <--- Reikia šito importo metams tikrinti
+from src.config import CLI_PAGE_SIZE
 
 def clear_screen():
     """Išvalo terminalo ekraną (veikia ant Windows ir Mac/Linux)."""
@@ -98,4 +99,50 @@ def select_object_from_list(objects, prompt="Pasirinkite numerį"):
             else:
                 print("Blogas numeris. Bandykite dar kartą.")
         except ValueError:
-            print("Įveskite skaičių.")
\ No newline at end of file
+            print("Įveskite skaičių.")
+
+def browse_pages(fetch_page, show_page, select_prompt=None, empty_message="Sąrašas tuščias."):
+    """
+    Rodo ilgą sąrašą puslapiais (n - kitas, p - ankstesnis, 0 - grįžti).
+
+    Parametrai:
+    - fetch_page(offset, limit): grąžina Page (items, total, ...), pvz., BookRepository.page.
+    - show_page(page): atvaizduoja puslapį (eilučių numeriai tęsiasi: offset + 1, ...).
+    - select_prompt: jei nurodytas, galima įvesti eilutės numerį - grąžinamas tas objektas.
+    Grąžina pasirinktą objektą arba None.
+    """
+    offset = 0
+    while True:
+        page = fetch_page(offset, CLI_PAGE_SIZE)
+        if page.total == 0:
+            print(empty_message)
+            pause()
+            return None
+        if offset >= page.total: # Sąrašas sutrumpėjo (pvz., kitas vartotojas ištrynė)
+            offset = max(0, page.total - CLI_PAGE_SIZE)
+            continue
+
+        clear_screen()
+        show_page(page)
+        pages = (page.total + CLI_PAGE_SIZE - 1) // CLI_PAGE_SIZE
+        print(f"Puslapis {offset // CLI_PAGE_SIZE + 1}/{pages} (viso: {page.total})")
+        print("n - kitas puslapis, p - ankstesnis, 0 - grįžti")
+
+        prompt = f"\n{select_prompt} (arba n/p/0): " if select_prompt else "\nPasirinkimas: "
+        choice = input(prompt).strip().lower()
+        if choice == '0':
+            return None
+        if choice == 'n':
+            if offset + CLI_PAGE_SIZE < page.total:
+                offset += CLI_PAGE_SIZE
+        elif choice == 'p':
+            offset = max(0, offset - CLI_PAGE_SIZE)
+        elif select_prompt and choice.isdigit():
+            index = int(choice) - 1 - offset
+            if 0 <= index < len(page.items):
+                return page.items[index]
+            print("Pasirinkite numerį iš šio puslapio.")
+            pause()
+        else:
+            print("Neteisingas pasirinkimas.")
+            pause()
@@ -4,9 +4,25 @@
 #   - Importuoja draw_ascii_table iš src/ui/ascii_styler.py
 #   - Kviečia metodus iš library.book_manager
 
-from src.ui.common import get_int_input, get_valid_string, get_valid_string, get_valid_year, get_valid_year, pause, clear_screen, select_object_from_list # Meniu bendros funkcijos
+from src.ui.common import get_int_input, get_valid_string, get_valid_string, get_valid_year, get_valid_year, pause, clear_screen, select_object_from_list, browse_pages # Meniu bendros funkcijos
 from src.ui.librarian import bulk_delete_menu # Masinio trynimo meniu
 from src.ui.ascii_styler import draw_ascii_table, draw_ascii_menu
+from src.tools.import_books import read_records, format_report # Masinis importas
+
+def _show_books_page(page, title):
+    """Vienas knygų puslapis ASCII lentelėje."""
+    # 1. Paruošiame Antraštes
+    headers = ["Nr.", "ID (Trumpas)", "Autorius", "Pavadinimas", "Metai", "Likutis"]
+
+    # 2. Paruošiame Eilutes
+    rows = []
+    for i, b in enumerate(page.items, page.offset + 1):
+        short_id = b.id[-4:]  # Paskutiniai 4 simboliai
+        qty_info = f"{b.available_copies}/{b.total_copies}"
+        rows.append([i, short_id, b.author, b.title, b.year, qty_info])
+
+    # 3. Atvaizduojame
+    draw_ascii_table(headers, rows, title=title)
 
 def run(library):
     """Knygų valdymo sub-meniu."""
@@ -18,6 +34,7 @@ def run(library):
             ("2", "Masinis šalinimas ir atstatymas"),
             ("3", "Ištrinti konkrečią knygą"),
             ("4", "Rodyti visas knygas (Lentelė)"),
+            ("5", "Importuoti knygas iš failo (CSV/JSONL)"),
             ("0", "Grįžti atgal")
         ]
         draw_ascii_menu("KNYGŲ VALDYMAS", menu_options)
@@ -58,9 +75,13 @@ def run(library):
             # --- KONKREČIOS KNYGOS TRYNIMAS ---
             print("\n--- Konkrečios knygos šalinimas ---")
             query = input("Įveskite pavadinimą paieškai: ")
-            results = library.book_manager.search_books(query)
-            
-            target_book = select_object_from_list(results, "Kurią knygą ištrinti?")
+            # Rezultatai puslapiais (paieška ir rikiavimas - repozitorijoje)
+            target_book = browse_pages(
+                lambda offset, limit: library.book_manager.page(offset, limit, sort_key=None, filter=query),
+                lambda page: _show_books_page(page, f"Paieška: {query}"),
+                select_prompt="Kurią knygą ištrinti?",
+                empty_message="Nieko nerasta."
+            )
             
             if target_book:
                 is_fully_returned = (target_book.available_copies == target_book.total_copies)
@@ -69,35 +90,31 @@ def run(library):
                 else:
                     confirm = input(f"Ar tikrai norite ištrinti '{target_book.title}'? (t/n): ")
                     if confirm.lower() == 't':
-                        # Čia reikėtų metodo book_manager.remove_book_by_id (jo dar neturime, tuoj sukursime)
-                        # Arba tiesiog išimame iš sąrašo tiesiogiai:
-                        library.book_manager.books.remove(target_book)
-                        library.book_manager.save()
+                        # Šaliname per repozitoriją, kad atsinaujintų ir indeksas
+                        library.book_manager.remove(target_book.id)
                         print("Knyga ištrinta.")
                     else:
                         print("Atšaukta.")
             pause()
 
         elif choice == '4':
-            books = library.book_manager.get_all_books()
-            clear_screen()
-            if not books:
-                print("Biblioteka tuščia.")
+            # Rodomas tik vienas puslapis (CLI_PAGE_SIZE knygų), o ne visas katalogas
+            browse_pages(
+                lambda offset, limit: library.book_manager.page(offset, limit, sort_key='title'),
+                lambda page: _show_books_page(page, "Knygų Sąrašas"),
+                empty_message="Biblioteka tuščia."
+            )
+
+        elif choice == '5':
+            print("\n--- Knygų importas ---")
+            path = input("Failo kelias (.csv arba .jsonl): ").strip().strip('"')
+            try:
+                report = library.inventory_service.import_books(read_records(path))
+            except (OSError, ValueError) as e:
+                print(f"\nKLAIDA: {e}")
             else:
-                # --- ASCII LENTELĖS IMPLEMENTACIJA ---
-                # 1. Paruošiame Antraštes
-                headers = ["ID (Trumpas)", "Autorius", "Pavadinimas", "Metai", "Likutis"]
-                
-                # 2. Paruošiame Eilutes
-                rows = []
-                for b in books:
-                    short_id = b.id[-4:]  # Paskutiniai 4 simboliai
-                    qty_info = f"{b.available_copies}/{b.total_copies}"
-                    rows.append([short_id, b.author, b.title, b.year, qty_info])
-                
-                # 3. Atvaizduojame
-                draw_ascii_table(headers, rows, title="Knygų Sąrašas")
-                # -------------------------------------
+                for line in format_report(report):
+                    print(line)
             pause()
 
         elif choice == '0':
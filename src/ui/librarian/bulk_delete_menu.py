@@ -7,11 +7,10 @@ VEIKIMO PRINCIPAS:
   3. Vartotojas patvirtina veiksmą.
   4. Sistema surenka knygų ID ir siunčia juos į InventoryService masiniam trynimui.
 RYŠIAI:
-  - Naudoja: library.book_repository (paieškai).
+  - Naudoja: library.book_repository (paieškai per autoriaus/žanro/metų indeksus).
   - Naudoja: library.inventory_service (trynimui).
 """
 
-from datetime import datetime, timedelta
 from src.ui.common import get_int_input, pause, clear_screen
 from src.ui.ascii_styler import draw_ascii_table, draw_ascii_menu
 
@@ -30,95 +29,40 @@ def run(library):
                 
         choice = input("\nPasirinkimas: ")
         
-        # 1. Paimame VISAS knygas iš repozitorijos
-        all_books = library.book_repository.get_all()
+        # Kandidatai imami iš BookRepository antrinių indeksų (be viso sąrašo perrinkimo)
+        repo = library.book_repository
         candidates = []
 
         if choice == '1':
-            author_input = input("Įveskite autoriaus vardą (arba jo dalį): ").strip().lower()
+            author_input = input("Įveskite autoriaus vardą (arba jo dalį): ").strip()
             
-            # PAKEITIMAS: Naudojame 'in' vietoje '=='
-            # Tai leis rasti "George Orwell" įvedus tik "orwell"
-            candidates = [
-                b for b in all_books 
-                if b.author and author_input in b.author.lower()
-            ]
+            # Dalinis atitikimas: "orwell" randa "George Orwell"
+            candidates = repo.get_by_author(author_input, partial=True)
             _confirm_and_delete(library, candidates)
             
         elif choice == '2':
-            genre_input = input("Įveskite žanrą (arba dalį): ").strip().lower()
+            genre_input = input("Įveskite žanrą (arba dalį): ").strip()
             
-            # PAKEITIMAS: Taip pat ir žanrui
-            candidates = [
-                b for b in all_books 
-                if b.genre and genre_input in b.genre.lower()
-            ]
+            candidates = repo.get_by_genre(genre_input, partial=True)
             _confirm_and_delete(library, candidates)
             
         elif choice == '3':
             year_limit = get_int_input("Ištrinti senesnes nei (metai): ")
-            # Filtruojame pagal metus
-            candidates = [
-                b for b in all_books 
-                if b.year < year_limit
-            ]
+            # Metų indeksas: tik knygos, išleistos iki year_limit (neimtinai)
+            candidates = repo.get_by_year_range(max_year=year_limit - 1)
             _confirm_and_delete(library, candidates)
             
         elif choice == '4':
-            # --- LOGIKA PRARASTOMS KNYGOMS (Per Vartotojus) ---
+            # --- PRARASTOS KNYGOS (per paskolų terminų indeksą) ---
             years = get_int_input("Kiek metų vėluoja grąžinimas?: ")
             
-            # Data: Šiandien minus X metų
-            cutoff_date = datetime.now() - timedelta(days=years*365)
+            # Knygos, kurių grąžinimo terminas senesnis nei "šiandien minus X metų"
+            candidates = library.get_candidates_lost(years)
             
-            lost_book_ids = []
+            if not candidates and years > 100:
+                print("Patarimas: Patikrinkite, ar teisingai įvedėte metus.")
             
-            # 1. Gauname visus vartotojus
-            if hasattr(library, 'user_repository'):
-                users = library.user_repository.get_all()
-                
-                print(f"DEBUG: Tikrinami {len(users)} vartotojai dėl vėlavimų...")
-
-                for user in users:
-                    # Tikriname, ar vartotojas turi pasiskolintų knygų sąrašą
-                    # Dažniausiai tai būna 'borrowed_books' arba 'loans'
-                    loans = getattr(user, 'borrowed_books', [])
-                    
-                    for loan in loans:
-                        # Priklausomai nuo to, ar loan yra žodynas (dict), ar objektas
-                        # Bandome gauti datą ir knygos ID
-                        if isinstance(loan, dict):
-                            due_date_str = loan.get('due_date') or loan.get('return_date')
-                            book_id = loan.get('book_id') or loan.get('id')
-                        else:
-                            # Jei tai objektas
-                            due_date_str = getattr(loan, 'due_date', None)
-                            book_id = getattr(loan, 'book_id', None)
-
-                        if due_date_str and book_id:
-                            try:
-                                # Konvertuojame datą iš string į datetime
-                                # Tikimės formato YYYY-MM-DD
-                                due_dt = datetime.strptime(due_date_str, "%Y-%m-%d")
-                                
-                                # Jei grąžinimo data yra senesnė nei riba -> knyga prarasta
-                                if due_dt < cutoff_date:
-                                    lost_book_ids.append(book_id)
-                            except ValueError:
-                                # Jei data blogo formato, ignoruojame
-                                continue
-
-                # 2. Surandame knygų objektus pagal rastus ID
-                # (tik tas knygas, kurios vis dar egzistuoja bibliotekoje)
-                candidates = [b for b in all_books if b.id in lost_book_ids]
-                
-                if not candidates and years > 100:
-                    print("Patarimas: Patikrinkite, ar teisingai įvedėte metus.")
-                
-                _confirm_and_delete(library, candidates)
-            else:
-                print("\nKLAIDA: Nerasta 'user_repository'.")
-                pause()
+            _confirm_and_delete(library, candidates)
 
         # elif choice == '9':
         #     print("\n--- DUOMENŲ ATSTATYMAS ---")
@@ -1,6 +1,6 @@
 from src.ui.common import pause, clear_screen
 # Importuojame sub-meniu modulius
-from src.ui.librarian import books_menu, users_menu, stats_menu
+from src.ui.librarian import books_menu, users_menu, stats_menu, perf_menu
 from src.ui.ascii_styler import draw_ascii_menu
 
 def run_menu(library, user):
@@ -14,6 +14,7 @@ def run_menu(library, user):
             ("1", "Knygų valdymas"),
             ("2", "Vartotojų valdymas"),
             ("3", "Statistika"),
+            ("4", "Našumo ataskaita"),
             ("0", "Atsijungti")
         ]
         draw_ascii_menu("BIBLIOTEKININKO MENIU", menu_options)
@@ -27,6 +28,8 @@ def run_menu(library, user):
             users_menu.run(library)
         elif choice == '3':
             stats_menu.run(library)
+        elif choice == '4':
+            perf_menu.run(library)
         elif choice == '0':
             break
         else:
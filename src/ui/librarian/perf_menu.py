@@ -0,0 +1,49 @@
+"""
+FAILAS: src/ui/librarian/perf_menu.py
+PASKIRTIS: Našumo ataskaita: kiek kartų ir kiek laiko vykdyti servisų ir repozitorijų veiksmai.
+RYŠIAI:
+  - Duomenys - src/perf.py registras (REGISTRY), pildomas @instrumented ir measure().
+  - Naudoja draw_ascii_table iš ui/ascii_styler.py.
+"""
+
+from src import perf
+from src.ui.common import pause, clear_screen
+from src.ui.ascii_styler import draw_ascii_menu, draw_ascii_table
+
+def run(library):
+    """Našumo ataskaitos sub-meniu."""
+    while True:
+        clear_screen()
+        menu_options = [
+            ("1", "Rodyti ataskaitą"),
+            ("2", "Įrašyti ataskaitą į JSON failą"),
+            ("3", "Išvalyti matavimus"),
+            ("0", "Grįžti atgal")
+        ]
+        draw_ascii_menu("NAŠUMO ATASKAITA", menu_options)
+
+        choice = input("\nPasirinkimas: ")
+
+        if choice == '1':
+            clear_screen()
+            # draw_ascii_table pati praneša, jei matavimų dar nėra
+            draw_ascii_table(perf.REPORT_HEADERS, perf.REGISTRY.report_rows(),
+                             title="Veiksmai (daugiausiai laiko užėmę - viršuje)")
+            pause()
+        elif choice == '2':
+            path = input("Failo vardas [perf.json]: ").strip() or "perf.json"
+            try:
+                perf.REGISTRY.dump_json(path)
+                print(f"Ataskaita įrašyta: {path}")
+            except OSError as e:
+                print(f"Klaida įrašant į failą {path}: {e}")
+            pause()
+        elif choice == '3':
+            perf.REGISTRY.reset()
+            print("Matavimai išvalyti.")
+            pause()
+        elif choice == '0':
+            break
+        else:
+            print("Neteisingas pasirinkimas.")
+            pause()
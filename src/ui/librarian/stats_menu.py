@@ -18,6 +18,7 @@ def run(library):
             ("1", "Bendroji bibliotekos statistika"),
             ("2", "Vėluojančių knygų sąrašas"),
             ("3", "Išplėstinė analizė"),
+            ("4", "Skolinimų istorija (TOP 10)"),
             ("0", "Grįžti atgal")
         ]
         draw_ascii_menu("STATISTIKA", menu_options)
@@ -83,6 +84,17 @@ def run(library):
                     
             pause()
 
+        elif choice == '4':
+            top_books = library.get_most_borrowed_books(10)
+            clear_screen()
+            if not top_books:
+                print("Istorijos nėra (įjunkite LOAN_JOURNAL_ENABLED faile config.py).")
+            else:
+                table_data = [[i, title, count] for i, (title, count) in enumerate(top_books, 1)]
+                draw_ascii_table(["Nr.", "Knyga", "Skolinta kartų"], table_data,
+                                 title="Populiariausios Knygos")
+            pause()
+
         elif choice == '0':
             break
         else:
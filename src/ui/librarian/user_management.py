@@ -98,18 +98,16 @@ def _edit_librarian(library, user):
         if choice == '1':
             new_name = input("Naujas vartotojo vardas: ").strip()
             if new_name:
-                # Tiesioginis atnaujinimas ir išsaugojimas
-                user.username = new_name
-                library.user_repository.save()
+                # Per repozitoriją, kad atsinaujintų vardų indeksas
+                library.user_repository.rename(user, new_name)
                 print("Vardas atnaujintas.")
             pause()
             
         elif choice == '2':
             new_pwd = input("Naujas slaptažodis: ").strip()
             if new_pwd:
-                # Tiesioginis atnaujinimas ir išsaugojimas
-                user.password = new_pwd
-                library.user_repository.save()
+                # Per repozitoriją, kad pakeitimas būtų įrašytas (ir SQLite saugykloje)
+                library.user_repository.set_password(user, new_pwd)
                 print("Slaptažodis atnaujintas.")
             pause()
             
@@ -6,11 +6,21 @@ RELATIONSHIPS:
   - Grąžina pasirinktą knygos objektą arba None.
 CONTEXT:
   - Atskirtas nuo pasiėmimo logikos, kad būtų galima lengviau tobulinti paiešką.
+  - Katalogas ir paieškos rezultatai rodomi puslapiais (BookRepository.page):
+    iš repozitorijos paimamas tik matomas puslapis, o ne visos knygos.
 """
 
-from src.ui.common import clear_screen, pause, get_int_input, select_object_from_list
+from src.ui.common import browse_pages
 from src.ui.ascii_styler import draw_ascii_table
 
+def _show_catalog_page(page, title):
+    headers = ["Nr.", "Autorius", "Pavadinimas", "Žanras", "Likutis"]
+    data = []
+    for i, b in enumerate(page.items, page.offset + 1):
+        availability = f"{b.available_copies}/{b.total_copies}"
+        data.append([i, b.author, b.title, b.genre, availability])
+    draw_ascii_table(headers, data, title=title)
+
 def search_books(library):
     """
     Vykdo knygų paiešką pagal vartotojo įvestį.
@@ -18,48 +28,23 @@ def search_books(library):
     """
     print("\n--- Knygų Paieška ---")
     query = input("Įveskite pavadinimą arba autorių: ")
-    
-    results = library.book_manager.search_books(query)
-    
-    if not results:
-        print("Nieko nerasta.")
-        pause()
-        return None
-        
-    return select_object_from_list(results, "Pasirinkite knygą peržiūrai")
+
+    # Paieška ir puslapiavimas vyksta repozitorijoje (rikiuojama pagal atitikimą)
+    return browse_pages(
+        lambda offset, limit: library.book_manager.page(offset, limit, sort_key=None, filter=query),
+        lambda page: _show_catalog_page(page, f"PAIEŠKA: {query}"),
+        select_prompt="Pasirinkite knygą peržiūrai",
+        empty_message="Nieko nerasta."
+    )
 
 def list_all_books(library):
     """
-    Rodo visas bibliotekos knygas lentelėje.
+    Rodo bibliotekos knygas lentelėje (puslapiais, pagal pavadinimą).
     Grąžina pasirinktą knygą arba None.
     """
-    clear_screen()
-    books = library.book_manager.get_all_books()
-    
-    if not books:
-        print("Biblioteka tuščia.")
-        pause()
-        return None
-
-    # Paruošiame duomenis lentelei
-    headers = ["Nr.", "Autorius", "Pavadinimas", "Žanras", "Likutis"]
-    data = []
-    
-    for i, b in enumerate(books, 1):
-        availability = f"{b.available_copies}/{b.total_copies}"
-        data.append([i, b.author, b.title, b.genre, availability])
-    
-    draw_ascii_table(headers, data, title="KNYGŲ KATALOGAS")
-    
-    print("0. Grįžti")
-    choice = get_int_input("\nPasirinkite knygos numerį pasiėmimui (arba 0): ")
-    
-    if choice == 0:
-        return None
-        
-    if 1 <= choice <= len(books):
-        return books[choice - 1]
-    else:
-        print("Neteisingas pasirinkimas.")
-        pause()
-        return None
\ No newline at end of file
+    return browse_pages(
+        lambda offset, limit: library.book_manager.page(offset, limit, sort_key='title'),
+        lambda page: _show_catalog_page(page, "KNYGŲ KATALOGAS"),
+        select_prompt="Pasirinkite knygos numerį pasiėmimui",
+        empty_message="Biblioteka tuščia."
+    )
@@ -10,12 +10,13 @@ CONTEXT:
 """
 
 import streamlit as st # sukuria web UI
-import pandas as pd # duomenų lentelėms
-import plotly.express as px # diagramoms
 import uuid # unikalių ID knygoms generavimui
 from datetime import datetime # datos valdymui
 
 from src.models import Book # knygų modelis reikalingas naujos knygos sukūrimui
+from src.web.frame_cache import get_frame, page_frame, diff_frame # lentelės perkuriamos tik pasikeitus duomenims
+from src.services.inventory_service import EDITABLE_FIELDS
+from src.web.pagination import book_page, editor_key # tik matomas knygų puslapis
 
 def render_dashboard(library):
     # --- SIDEBAR ---
@@ -25,7 +26,7 @@ def render_dashboard(library):
         
         st.divider()
         st.caption(f"Viso vartotojų: {len(library.user_repository.get_all())}")
-        total_books = sum(b.total_copies for b in library.book_repository.books)
+        total_books = library.get_advanced_statistics()['total_copies'] # Palaikoma suma, ne perrinkimas
         st.caption(f"Viso knygų: {total_books}")
 
         st.divider()
@@ -42,6 +43,21 @@ def render_dashboard(library):
     elif page == "Statistika":
         _render_stats_view(library)
 
+# --- LENTELIŲ EILUTĖS (frame_cache) ---
+
+def _user_row(u):
+    return {
+        "id": u.id,
+        "Vardas": u.username,
+        "Rolė": "Skaitytojas" if u.role == 'reader' else "Admin",
+        "Kortelė": u.id,
+    }
+
+def _book_row(b):
+    item = b.to_dict()
+    item["Šalinti"] = False
+    return item
+
 # --- VIEW FUNKCIJOS ---
 
 def _render_users_view(library):
@@ -82,19 +98,9 @@ def _render_users_view(library):
         st.info("Vartotojų nėra.")
         return
 
-    # Paruošiame duomenis
-    user_data = []
-    for u in users:
-        user_data.append({
-            "id": u.id,
-            "Vardas": u.username,
-            "Rolė": "Skaitytojas" if u.role == 'reader' else "Admin",
-            "Kortelė": u.id,
-        })
-    df = pd.DataFrame(user_data)
-    
-    # ID naudojame kaip indeksą, kad paslėptume jį vaizde
-    df.set_index("id", inplace=True)
+    # Lentelė laikoma atmintyje ir atnaujinama tik pasikeitus vartotojams
+    # (ID naudojame kaip indeksą, kad paslėptume jį vaizde)
+    df = get_frame(library.user_repository, "admin_users", _user_row)
     
     st.write("Paspauskite ant eilutės redagavimui:")
     selection = st.dataframe(
@@ -109,9 +115,9 @@ def _render_users_view(library):
     if selection.selection.rows:
         # Paimame objektą pagal ID (kuris dabar yra indeksas)
         # selection.selection.rows grąžina eilučių numerius (0, 1, 2...)
-        # Mums reikia susieti eilutės numerį su vartotojų sąrašu
+        # Eilutės numerį susiejame su lentelės indeksu (ID), o ne su sąrašo pozicija
         selected_row_idx = selection.selection.rows[0]
-        selected_user = users[selected_row_idx]
+        selected_user = library.user_repository.get_by_id(df.index[selected_row_idx])
 
         with st.container(border=True):
             st.subheader(f"Redaguojamas: {selected_user.username}")
@@ -121,8 +127,7 @@ def _render_users_view(library):
                 new_name = st.text_input("Vardas", value=selected_user.username, key=f"n_{selected_user.id}")
                 if st.button("Atnaujinti vardą"):
                     if new_name:
-                        selected_user.username = new_name
-                        library.user_repository.save()
+                        library.user_repository.rename(selected_user, new_name)
                         st.success("Išsaugota!")
                         st.rerun()
 
@@ -138,8 +143,7 @@ def _render_users_view(library):
                     new_pass = st.text_input("Naujas slaptažodis", type="password", key=f"p_{selected_user.id}")
                     if st.button("Keisti slaptažodį"):
                         if new_pass:
-                            selected_user.password = new_pass
-                            library.user_repository.save()
+                            library.user_repository.set_password(selected_user, new_pass)
                             st.success("Pakeista.")
 
             with c2:
@@ -231,12 +235,13 @@ def _render_books_view(library):
                 if ids_input.strip():
                     id_list = [line.strip() for line in ids_input.split('\n') if line.strip()]
                     books_to_delete, skipped = [], []
-                    for bid in id_list:
-                        book = library.book_repository.get_by_id(bid)
-                        if book:
-                            s, m = library.safe_delete_book(book)
-                            if s: books_to_delete.append(book) # Tik vizualizacijai, nes safe_delete jau ištrynė
-                            else: skipped.append(bid)
+                    with library.unit_of_work(): # Vienas įrašymas visam sąrašui
+                        for bid in id_list:
+                            book = library.book_repository.get_by_id(bid)
+                            if book:
+                                s, m = library.safe_delete_book(book)
+                                if s: books_to_delete.append(book) # Tik vizualizacijai, nes safe_delete jau ištrynė
+                                else: skipped.append(bid)
                     
                     if books_to_delete: st.success(f"Ištrinta: {len(books_to_delete)}")
                     if skipped: st.error(f"Nepavyko (paskolinta/nerasta): {len(skipped)}")
@@ -245,30 +250,29 @@ def _render_books_view(library):
         # B. Pagal metus
         with tab_year:
             year_threshold = st.number_input("Ištrinti iki metų (imtinai):", min_value=-1000, max_value=datetime.now().year + 1, value=1990)
-            candidates = [b for b in library.book_repository.books if b.year <= year_threshold]
+            candidates = library.book_repository.get_by_year_range(max_year=year_threshold)
             if candidates:
                 if st.button(f"Trinti senas knygas ({len(candidates)} rasta)"):
                     deleted_count = 0
-                    for b in list(candidates): # Kuriame kopiją iteravimui
-                        s, m = library.safe_delete_book(b)
-                        if s: deleted_count += 1
+                    with library.unit_of_work():
+                        for b in list(candidates): # Kuriame kopiją iteravimui
+                            s, m = library.safe_delete_book(b)
+                            if s: deleted_count += 1
                     st.session_state.delete_success_msg = f"Sėkmingai ištrinta knygų: {deleted_count}"
                     st.rerun()
             else: st.info("Nėra senų knygų.")
 
         # C. Pagal Autorių
         with tab_author:
-            # 1. Gauname visų autorių sąrašą
-            # Pastaba: geriau naudoti get_all(), jei repo tai palaiko, vietoj tiesioginio .books
-            all_books = library.book_repository.get_all() 
-            authors = sorted(list(set(b.author for b in all_books if b.author)))
+            # 1. Gauname visų autorių sąrašą (iš autorių indekso, be knygų perrinkimo)
+            authors = library.book_repository.get_authors()
             
             if authors:
                 sel_auth = st.selectbox("Pasirinkite autorių", authors)
                 
                 # 2. IŠ ANKSTO susirandame kandidatus trynimui
                 # Taip kodas tampa švaresnis ir nereikia skaičiuoti mygtuko viduje
-                candidates = [b for b in all_books if b.author == sel_auth]
+                candidates = library.book_repository.get_by_author(sel_auth)
                 candidate_count = len(candidates)
                 
                 # 3. Mygtukas rodo iš anksto suskaičiuotą kiekį
@@ -289,18 +293,14 @@ def _render_books_view(library):
 
         # D. Pagal Žanrą
         with tab_genre:
-            # 1. Gauname visus duomenis
-            all_books = library.book_repository.get_all()
-            
-            # 2. Išfiltruojame unikalius žanrus
-            # (b.genre if b.genre - apsauga, kad neįtrauktume tuščių reikšmių)
-            genres = sorted(list(set(b.genre for b in all_books if b.genre)))
+            # 1-2. Unikalūs žanrai iš žanrų indekso (tušti žanrai neįtraukiami)
+            genres = library.book_repository.get_genres()
             
             if genres:
                 sel_genre = st.selectbox("Pasirinkite žanrą", genres)
                 
                 # 3. IŠ ANKSTO surandame kandidatus (kad parodytume skaičių mygtuke)
-                candidates = [b for b in all_books if b.genre == sel_genre]
+                candidates = library.book_repository.get_by_genre(sel_genre)
                 candidate_count = len(candidates)
                 
                 # 4. Mygtukas
@@ -333,14 +333,12 @@ def _render_books_view(library):
         st.info("Bibliotekoje knygų nėra. Pridėkite naują viršuje!")
         return
 
-    data_for_df = []
-    for b in books:
-        item = b.to_dict()
-        item["Šalinti"] = False
-        data_for_df.append(item)
-    
-    df = pd.DataFrame(data_for_df)
-    df.set_index("id", inplace=True)
+    # Redaguojamas tik matomas puslapis (paieška ir rikiavimas - repozitorijoje)
+    page = book_page(library.book_repository, "admin_books")
+    if not page.items:
+        st.info("Nieko nerasta.")
+        return
+    df = page_frame(page.items, _book_row) # Tik matomos eilutės, viso katalogo lentelė nekuriama
 
     column_config = {
         "title": st.column_config.TextColumn("Pavadinimas", width="large", required=True),
@@ -354,44 +352,15 @@ def _render_books_view(library):
     }
     
     st.info("Redaguokite duomenis tiesiogiai lentelėje.")
-    edited_df = st.data_editor(df, column_config=column_config, hide_index=True, width='stretch', key="book_editor")
+    edited_df = st.data_editor(df, column_config=column_config, hide_index=True, width='stretch',
+                               key=editor_key("book_editor", "admin_books", page))
 
     if st.button("💾 Išsaugoti pakeitimus lentelėje", type="primary"):
-        changes = 0
-        errors = []
-        
-        for book_id, row in edited_df.iterrows():
-            book = library.book_repository.get_by_id(book_id)
-            if not book: continue
-
-            # 1. TRYNIMAS
-            if row['Šalinti']:
-                s, m = library.safe_delete_book(book)
-                if s: changes += 1
-                else: errors.append(m)
-                continue
-
-            # 2. REDAGAVIMAS
-            modified = False
-            if book.title != row['title']: book.title = row['title']; modified = True
-            if book.author != row['author']: book.author = row['author']; modified = True
-            if int(book.year) != int(row['year']): book.year = int(row['year']); modified = True
-            if book.genre != row['genre']: book.genre = row['genre']; modified = True
-            
-            # Kiekio keitimas
-            new_total = int(row['total_copies'])
-            if int(book.total_copies) != new_total:
-                diff = new_total - book.total_copies
-                if book.available_copies + diff < 0:
-                    errors.append(f"Knyga '{book.title}': negalima mažinti kiekio (paskolinta).")
-                else:
-                    book.total_copies = new_total
-                    book.available_copies += diff
-                    modified = True
-            
-            if modified: changes += 1
-        
-        library.book_repository.save()
+        # 1. Skirtumas su originalu - stulpeliais (pandas), o ne eilutė po eilutės
+        updates, deleted = diff_frame(df, edited_df, EDITABLE_FIELDS, flag_column="Šalinti")
+
+        # 2. Trynimai ir redagavimai - vienu praėjimu ir vienu įrašymu
+        changes, errors = library.inventory_service.apply_changes(updates, deleted)
         
         if errors:
             for e in errors: st.error(e)
@@ -401,13 +370,14 @@ def _render_books_view(library):
 
 def _render_stats_view(library):
     """Statistika su pyragu."""
+    import pandas as pd # Importuojama tik atidarius statistiką (lėti importai)
+    import plotly.express as px
     stats = library.get_advanced_statistics()
     st.subheader("Bendroji Statistika")
     
-    # 1. Duomenų paruošimas diagramai
-    all_books = library.book_repository.books
-    total_copies = sum(b.total_copies for b in all_books)
-    available_copies = sum(b.available_copies for b in all_books)
+    # 1. Duomenų paruošimas diagramai (kopijų sumos jau palaikomos StatsService)
+    total_copies = stats['total_copies']
+    available_copies = stats['available_copies']
     borrowed_copies = total_copies - available_copies
 
     # Padaliname ekraną: Skaičiai | Diagrama
@@ -416,7 +386,7 @@ def _render_stats_view(library):
     with col_metrics:
         st.write("### Skaičiai")
         st.metric("Viso Knygų (Kopijų)", total_copies)
-        st.metric("Skaitytojų", len([u for u in library.user_repository.users if u.role == 'reader']))
+        st.metric("Skaitytojų", stats['reader_count'])
         st.metric("Paskolinta šiuo metu", borrowed_copies)
         st.metric("Vėlavimų vidurkis", stats.get('avg_overdue_per_reader', '-'))
 
@@ -0,0 +1,175 @@
+"""
+FILE: src/web/frame_cache.py
+PURPOSE: Atmintyje laikomos (materializuotos) pandas lentelės Streamlit vaizdams.
+RELATIONSHIPS:
+  - Prenumeruoja repozitorijų įvykius (BaseRepository.subscribe) ir tikrina jų 'version'.
+  - Naudojama admin_ui (vartotojų lentelė - get_frame; knygų puslapis - page_frame)
+    ir reader_ui (katalogo puslapis - page_frame).
+CONTEXT:
+  - Streamlit perpaleidžia visą skriptą po KIEKVIENO paspaudimo. Anksčiau kiekvieną kartą
+    DataFrame buvo kuriamas iš naujo iš visų objektų to_dict().
+  - Dabar lentelė sukuriama vieną kartą ir laikoma. Jei repozitorijos versija nepasikeitė,
+    grąžinama ta pati lentelė; jei pasikeitė keli įrašai - perrašomos tik tos eilutės.
+  - Grąžintos lentelės NEKEISKITE vietoje (ji bendra visiems perpaleidimams ir,
+    kadangi Library dalijama, visoms sesijoms).
+  - Puslapiuojamiems vaizdams (katalogas, admin knygų lentelė) viso katalogo lentelė
+    nelaikoma: page_frame() sukuria lentelę tik iš matomo puslapio knygų (kelios dešimtys eilučių).
+  - diff_frame() randa, ką vartotojas pakeitė redaguojamoje lentelėje (stulpeliais, vektoriškai).
+  - Lentelė atnaujinama laikant repozitorijos read() užraktą (kitos gijos tuo metu
+    nekeičia duomenų) ir savo užraktą (dvi sesijos neatnaujina jos vienu metu).
+"""
+
+import threading
+import weakref
+from src.repositories.base_repository import (RESET, ADDED, REMOVED, CHANGING, CHANGED,
+                                               LOAN_ADDED, LOAN_REMOVED)
+
+# Jei pasikeitė daugiau nei ši lentelės dalis, pigiau perkurti visą lentelę
+_REBUILD_FRACTION = 0.1
+
+class VersionedFrame:
+    def __init__(self, repository, row_builder, drop_id=True):
+        """
+        Parametrai:
+        - repository: knygų arba vartotojų repozitorija (get_all, get_by_id, subscribe).
+        - row_builder: funkcija objektas -> žodynas (viena lentelės eilutė, su 'id').
+        - drop_id: ar 'id' stulpelis paliekamas tik kaip indeksas.
+        """
+        self._repository = repository
+        self._row = row_builder
+        self._drop_id = drop_id
+        self._frame = None
+        self._version = None
+        self._dirty = {}        # Pasikeitusių įrašų ID (žodynas - kad išliktų eilės tvarka)
+        self._reset = True
+        self.rebuilds = 0       # Kiek kartų lentelė kurta iš naujo (diagnostikai ir testams)
+        self._lock = threading.Lock()
+        repository.subscribe(self._on_event)
+
+    def _on_event(self, event, item):
+        if event == RESET:
+            self._reset = True
+        elif event in (ADDED, REMOVED, CHANGING, CHANGED):
+            # CHANGING - dėl seno ID (pvz., pakeitus kortelės numerį)
+            self._dirty[item.id] = None
+        elif event in (LOAN_ADDED, LOAN_REMOVED):
+            self._dirty[item[0].id] = None
+
+    def _build(self, pd, objects):
+        return _build_frame(pd, objects, self._row, self._drop_id)
+
+    def get(self):
+        """Grąžina aktualią lentelę (perkuriama arba papildoma tik jei duomenys pasikeitė)."""
+        with self._repository.lock.read(), self._lock:
+            return self._refresh()
+
+    def _refresh(self):
+        version = self._repository.version
+        if self._frame is not None and version == self._version:
+            return self._frame
+
+        import pandas as pd # Tik kai lentelės tikrai reikia
+
+        objects = self._repository.get_all()
+        if (self._frame is None or self._reset or self._frame.empty
+                or len(self._dirty) > max(1, len(objects)) * _REBUILD_FRACTION):
+            self._frame = self._build(pd, objects)
+            self.rebuilds += 1
+        elif self._dirty:
+            self._frame = self._patch(pd, self._frame)
+
+        self._version = version
+        self._dirty = {}
+        self._reset = False
+        return self._frame
+
+    def _patch(self, pd, frame):
+        """
+        Perrašo tik pasikeitusias eilutes: pašalina, atnaujina, prideda.
+        Grąžina NAUJĄ lentelę: senoji jau atiduota kitoms sesijoms ir jos keisti vietoje negalima.
+        """
+        dropped, changed, added = [], [], []
+        for key in self._dirty:
+            obj = self._repository.get_by_id(key)
+            if obj is None:
+                if key in frame.index:
+                    dropped.append(key)
+            elif key in frame.index:
+                changed.append(obj)
+            else:
+                added.append(obj)
+
+        if dropped:
+            frame = frame.drop(index=dropped)
+        if changed:
+            rows = self._build(pd, changed)
+            if frame is self._frame: # drop() dar nesukūrė kopijos
+                frame = frame.copy()
+            frame.loc[rows.index, rows.columns] = rows
+        if added:
+            frame = pd.concat([frame, self._build(pd, added)])
+        return frame
+
+def _build_frame(pd, objects, row_builder, drop_id):
+    frame = pd.DataFrame([row_builder(obj) for obj in objects])
+    if not frame.empty:
+        frame = frame.set_index('id', drop=drop_id)
+    return frame
+
+# Viena lentelė kiekvienai (repozitorija, pavadinimas) porai
+_FRAMES = weakref.WeakKeyDictionary()
+_FRAMES_LOCK = threading.Lock()
+
+def get_frame(repository, name, row_builder, drop_id=True):
+    """
+    Grąžina repozitorijos lentelę pagal pavadinimą (pvz., "admin_users").
+    Pirmą kartą sukuria VersionedFrame, vėliau naudoja tą patį.
+    """
+    with _FRAMES_LOCK:
+        frames = _FRAMES.setdefault(repository, {})
+        if name not in frames:
+            frames[name] = VersionedFrame(repository, row_builder, drop_id)
+        frame = frames[name]
+    return frame.get()
+
+def page_frame(items, row_builder, drop_id=True):
+    """
+    Lentelė tik iš puslapio objektų (Page.items) - nekaupiama, nes puslapis mažas.
+    Indeksas ir stulpeliai tokie pat, kaip get_frame() lentelės.
+    """
+    import pandas as pd
+    return _build_frame(pd, items, row_builder, drop_id)
+
+def diff_frame(original, edited, columns, flag_column=None):
+    """
+    Palygina redaguotą lentelę (st.data_editor rezultatą) su originalu stulpeliais, be ciklo
+    per eilutes. Abi lentelės turi tą patį indeksą (ID).
+
+    Grąžina (pakeitimai, pažymėti):
+    - pakeitimai: {ID: {stulpelis: nauja reikšmė}} - tik eilutės ir laukai, kurie pasikeitė;
+    - pažymėti: ID, kuriose flag_column reikšmė True (pvz., "Šalinti"); jų pakeitimai praleidžiami.
+    """
+    flagged = []
+    if flag_column is not None:
+        flags = edited[flag_column].fillna(False).astype(bool)
+        flagged = edited.index[flags].tolist()
+        edited = edited[~flags]
+
+    new = edited[list(columns)]
+    old = original.loc[new.index, list(columns)]
+    # NaN != NaN, todėl abu tušti laukai laikomi nepasikeitusiais
+    mask = (old != new) & ~(old.isna() & new.isna())
+    rows = mask.any(axis=1)
+    if not rows.any():
+        return {}, flagged
+
+    mask, new = mask[rows], new[rows]
+    changes = {}
+    for book_id, changed, values in zip(new.index, mask.to_numpy(), new.to_numpy(dtype=object)):
+        changes[book_id] = {column: _plain(value)
+                            for column, is_changed, value in zip(columns, changed, values) if is_changed}
+    return changes, flagged
+
+def _plain(value):
+    """numpy skaliaras -> paprastas Python tipas (int, float, str)."""
+    return value.item() if hasattr(value, 'item') else value
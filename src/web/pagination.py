@@ -0,0 +1,54 @@
+"""
+FILE: src/web/pagination.py
+PURPOSE: Puslapiavimo valdikliai Streamlit lentelėms (paieška, rikiavimas, puslapis).
+RELATIONSHIPS:
+  - Duomenis ima per BookRepository.page() (paieška ir rikiavimas vyksta serveryje).
+  - Naudojama reader_ui (katalogas) ir admin_ui (knygų lentelė).
+CONTEXT:
+  - Anksčiau į st.data_editor buvo siunčiamas visas katalogas (didelio katalogo atveju -
+    megabaitai kiekvieno paspaudimo metu). Dabar naršyklė gauna tik matomą puslapį.
+  - st.data_editor nepatvirtintus pakeitimus (varneles, redagavimus) saugo pagal eilutės
+    numerį, todėl jo raktas susiejamas su puslapiu (editor_key) - kitaip perjungus puslapį
+    ar paiešką pažymėjimai atsidurtų ant kitų knygų.
+"""
+
+import streamlit as st
+from src.config import WEB_PAGE_SIZE
+
+# Rikiavimo pasirinkimai: rodomas pavadinimas -> BookRepository.page sort_key
+SORT_OPTIONS = {
+    "Pavadinimas": 'title',
+    "Autorius": 'author',
+    "Metai": 'year',
+    "Žanras": 'genre',
+}
+
+def book_page(repository, key, page_size=WEB_PAGE_SIZE):
+    """
+    Nupiešia paieškos laukelį, rikiavimą ir puslapio numerį, grąžina Page.
+    'key' - unikalus valdiklių prefiksas (kad kelios lentelės nesusipainiotų).
+    """
+    col_search, col_sort, col_page = st.columns([3, 1, 1])
+    query = col_search.text_input("🔍 Paieška", key=f"{key}_query").strip()
+    sort_options = (["Atitikimas"] if query else []) + list(SORT_OPTIONS)
+    sort_label = col_sort.selectbox("Rikiuoti", sort_options, key=f"{key}_sort")
+    sort_key = SORT_OPTIONS.get(sort_label) # "Atitikimas" -> None (pagal paieškos rangą)
+
+    number = col_page.number_input("Puslapis", min_value=1, value=1, step=1, key=f"{key}_page")
+    page = repository.page((int(number) - 1) * page_size, page_size, sort_key, filter=query)
+    pages = max(1, (page.total + page_size - 1) // page_size)
+    if not page.items and page.total:
+        # Puslapio numeris per didelis (pvz., susiaurinus paiešką) - rodome paskutinį
+        page = repository.page((pages - 1) * page_size, page_size, sort_key, filter=query)
+    st.caption(f"Puslapis {page.offset // page_size + 1} iš {pages} · rodoma "
+               f"{page.offset + 1 if page.items else 0}–{page.offset + len(page.items)} iš {page.total}")
+    return page
+
+def editor_key(name, key, page):
+    """
+    st.data_editor raktas šiam puslapiui: pavadinimas + puslapio pradžia, rikiavimas ir paieška.
+    'key' - tas pats prefiksas, kuris buvo perduotas book_page().
+    """
+    query = st.session_state.get(f"{key}_query", "").strip()
+    sort_label = st.session_state.get(f"{key}_sort", "")
+    return f"{name}_{page.offset}_{sort_label}_{query}"
@@ -4,9 +4,10 @@ PURPOSE: Skaitytojo sąsaja (Knygų paieška ir paskyra).
 """
 
 import streamlit as st
-import pandas as pd
 import time
 from src.web.auth import logout
+from src.web.frame_cache import page_frame
+from src.web.pagination import book_page, editor_key
 
 def render_dashboard():
     library = st.session_state.library
@@ -25,29 +26,30 @@ def render_dashboard():
     elif menu == "Mano knygos":
         _render_my_books(library, user)
 
+def _catalog_row(b):
+    row = b.to_dict()
+    row['Pasirinkti'] = False
+    row['Likutis'] = f"{b.available_copies}/{b.total_copies}"
+    return row
+
 def _render_catalog(library, user):
     st.header("🔎 Knygų Katalogas")
-    books = library.book_repository.get_all()
-    
-    if not books:
+    if not library.book_repository.get_all():
         st.warning("Tuščia.")
         return
 
-    data = []
-    for b in books:
-        row = b.to_dict()
-        row['Pasirinkti'] = False
-        row['Likutis'] = f"{b.available_copies}/{b.total_copies}"
-        data.append(row)
+    # Paieška, rikiavimas ir puslapiavimas - repozitorijoje; naršyklei siunčiamas tik puslapis
+    page = book_page(library.book_repository, "cat")
+    if not page.items:
+        st.info("Nieko nerasta.")
+        return
 
-    df = pd.DataFrame(data)
-    search = st.text_input("🔍 Paieška")
-    if search:
-        df = df[df['title'].str.contains(search, case=False) | df['author'].str.contains(search, case=False)]
+    # Lentelė tik iš matomo puslapio knygų (viso katalogo lentelė nekuriama)
+    df = page_frame(page.items, _catalog_row, drop_id=False).reset_index(drop=True)
 
     st.caption("Pažymėkite knygas norėdami pasiimti 👇")
     edited = st.data_editor(
-        df, key="cat_ed", width="stretch",
+        df, key=editor_key("cat_ed", "cat", page), width="stretch",
         column_config={
             "Pasirinkti": st.column_config.CheckboxColumn("Imti?", width="small"),
             "title": st.column_config.TextColumn("Pavadinimas"),
@@ -64,11 +66,10 @@ def _render_catalog(library, user):
     selected = edited[edited['Pasirinkti'] == True]
     if not selected.empty:
         if st.button(f"Pasiimti ({len(selected)})", type="primary"):
-            succ_count = 0
-            for _, row in selected.iterrows():
-                succ, _ = library.borrow_book(user.id, row['id'])
-                if succ: succ_count += 1
-            
+            # Viena transakcija: patikrinimai vieną kartą, įrašymas vieną kartą
+            results = library.borrow_many(user.id, selected['id'].tolist())
+            succ_count = sum(1 for _, succ, _ in results if succ)
+
             if succ_count > 0:
                 st.toast(f"Paimta: {succ_count}!", icon="✅")
                 time.sleep(1.5)
@@ -84,10 +85,11 @@ def _render_my_books(library, user):
 
     data = []
     for l in user.active_loans:
-        r = l.copy()
+        r = dict(l) # Paskola -> paprastas žodynas lentelei
         r['Grąžinti'] = False
         data.append(r)
     
+    import pandas as pd # Tik kai yra ką rodyti lentelėje
     df = pd.DataFrame(data)
     edited = st.data_editor(
         df, key="my_ed", width="stretch",
@@ -103,8 +105,7 @@ def _render_my_books(library, user):
     to_return = edited[edited['Grąžinti'] == True]
     if not to_return.empty:
         if st.button(f"Grąžinti ({len(to_return)})", type="primary"):
-            for _, row in to_return.iterrows():
-                library.return_book(user.id, row['book_id'])
+            library.return_many(user.id, to_return['book_id'].tolist())
             st.success("Grąžinta!")
             time.sleep(1)
             st.rerun()
\ No newline at end of file
@@ -0,0 +1,154 @@
+import random
+import threading
+import unittest
+
+from src.library import Library
+from src.models import Book, Reader
+from src.repositories.rwlock import RWLock
+
+class TestRWLock(unittest.TestCase):
+    def test_reentrant_and_no_upgrade(self):
+        lock = RWLock()
+        with lock.write():
+            with lock.write(), lock.read():
+                pass
+        with lock.read():
+            with lock.read():
+                pass
+            with self.assertRaises(RuntimeError):
+                lock.acquire_write()
+        # Po visų blokų užraktas laisvas kitai gijai
+        acquired = []
+        def other():
+            with lock.write():
+                acquired.append(1)
+        worker = threading.Thread(target=other)
+        worker.start()
+        worker.join(timeout=2)
+        self.assertEqual(acquired, [1])
+
+class TestConcurrentLoans(unittest.TestCase):
+    THREADS = 16
+    ROUNDS = 150
+
+    def setUp(self):
+        # Atminties saugykla: tas pats bendras užraktas ir save()/flush() logika, tik be disko
+        self.library = Library(
+            backend="memory",
+            books=[Book(f"Knyga {i}", "Autorius", 2000, "Romanas",
+                        total_copies=3, available_copies=3, id=f"B{i}") for i in range(5)],
+            users=[Reader(f"Skaitytojas{i}", "reader", id=f"RD{i:04d}") for i in range(self.THREADS)],
+        )
+        self.books = self.library.book_repository
+        self.users = self.library.user_repository
+        self.stats = self.library.stats_service
+        self.loans = self.library.loan_service
+
+    def _worker(self, user_id, seed, errors):
+        rnd = random.Random(seed)
+        try:
+            for _ in range(self.ROUNDS):
+                book_id = f"B{rnd.randrange(5)}"
+                action = rnd.random()
+                if action < 0.5:
+                    self.loans.borrow_book(user_id, book_id)
+                elif action < 0.9:
+                    self.loans.return_book(user_id, book_id)
+                elif action < 0.95:
+                    self.loans.return_all_books(user_id)
+                else:
+                    self.stats.get_advanced_statistics()
+                    self.books.search("knyga")
+        except Exception as exc: # pragma: no cover - tik nesėkmės atveju
+            errors.append(exc)
+
+    def test_many_threads_borrow_and_return(self):
+        errors = []
+        threads = [threading.Thread(target=self._worker, args=(f"RD{i:04d}", i, errors))
+                   for i in range(self.THREADS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=60)
+
+        self.assertFalse(any(t.is_alive() for t in threads), "Gijos užstrigo")
+        self.assertEqual(errors, [])
+        self._assert_copies_consistent()
+
+    def test_delete_users_while_others_borrow(self):
+        errors = []
+        deleted = []
+        victims = self.users.get_all()[: self.THREADS // 2]
+
+        def deleter():
+            rnd = random.Random(-1)
+            try:
+                for _ in range(self.ROUNDS * 4):
+                    pending = [u for u in victims if u not in deleted]
+                    if not pending:
+                        return
+                    user = rnd.choice(pending)
+                    success, _ = self.library.safe_delete_user(user)
+                    if success:
+                        deleted.append(user)
+            except Exception as exc: # pragma: no cover - tik nesėkmės atveju
+                errors.append(exc)
+
+        threads = [threading.Thread(target=self._worker, args=(f"RD{i:04d}", i, errors))
+                   for i in range(self.THREADS)]
+        threads.append(threading.Thread(target=deleter))
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=60)
+
+        self.assertFalse(any(t.is_alive() for t in threads), "Gijos užstrigo")
+        self.assertEqual(errors, [])
+        for user in deleted:
+            self.assertIsNone(self.users.get_by_id(user.id))
+            # Po ištrynimo paskola negalėjo atsirasti (kitaip kopija būtų "pamesta")
+            self.assertEqual(user.active_loans, [])
+            self.assertFalse(self.loans.borrow_book(user.id, "B0")[0])
+        self.assertEqual(len(self.users.get_all()), self.THREADS - len(deleted))
+        self._assert_copies_consistent()
+
+    def _assert_copies_consistent(self):
+        on_loan = {}
+        for user in self.users.get_all():
+            for loan in user.active_loans:
+                on_loan[loan['book_id']] = on_loan.get(loan['book_id'], 0) + 1
+        for book in self.books.get_all():
+            self.assertGreaterEqual(book.available_copies, 0)
+            self.assertEqual(book.available_copies + on_loan.get(book.id, 0), book.total_copies)
+        self.assertTrue(self.stats.check_consistency())
+
+class TestSafeDeleteUser(unittest.TestCase):
+    def test_delete_blocks_concurrent_borrow(self):
+        book = Book("Metai", "K. Donelaitis", 1818, "Poema", id="B1")
+        reader = Reader("Ona", "reader", id="ON0001")
+        library = Library(backend="memory", books=[book], users=[reader])
+
+        borrowed = []
+        borrower = threading.Thread(target=lambda: borrowed.append(library.borrow_book("ON0001", "B1")))
+        remove = library.user_repository.remove
+        blocked = []
+
+        def remove_while_borrowing(user):
+            # Tarp patikrinimo ir šalinimo kita gija bando pasiskolinti - ji turi laukti užrakto
+            borrower.start()
+            borrower.join(timeout=0.3)
+            blocked.append(borrower.is_alive())
+            return remove(user)
+
+        library.user_repository.remove = remove_while_borrowing
+        success, _ = library.safe_delete_user(reader)
+        borrower.join(timeout=5)
+
+        self.assertTrue(success)
+        self.assertEqual(blocked, [True])
+        self.assertFalse(borrowed[0][0]) # Vartotojas jau ištrintas
+        self.assertEqual(book.available_copies, book.total_copies)
+        self.assertIsNone(library.user_repository.get_by_id("ON0001"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import os
+import stat
+import tempfile
+import unittest
+
+from src import data_manager
+from src.tools import convert_store
+
+class TestAtomicSave(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'books.json')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_save_and_load_roundtrip(self):
+        data = [{"id": "B1", "title": "Žalias lapas"}]
+        data_manager.save_data(self.path, data)
+        self.assertEqual(data_manager.load_data(self.path), data)
+        self.assertEqual(os.listdir(self.tmp_dir.name), ['books.json'])
+
+    def test_failed_write_keeps_old_file(self):
+        data_manager.save_data(self.path, [{"id": "B1"}])
+        # object() neserializuojamas - json.dump nutrūksta rašymo viduryje
+        with self.assertRaises(TypeError):
+            data_manager.save_data(self.path, [{"id": "B2"}, {"bad": object()}])
+        self.assertEqual(data_manager.load_data(self.path), [{"id": "B1"}])
+        self.assertEqual(os.listdir(self.tmp_dir.name), ['books.json'])
+
+    def test_rolling_backup_keeps_previous_version(self):
+        data_manager.save_data(self.path, [{"id": "v1"}], backup=True)
+        data_manager.save_data(self.path, [{"id": "v2"}], backup=True)
+        backup_path = data_manager.get_backup_path(self.path)
+        self.assertTrue(backup_path.endswith('books_backup.json'))
+        with open(backup_path, encoding='utf-8') as f:
+            self.assertEqual(json.load(f), [{"id": "v1"}])
+
+    def test_save_keeps_file_permissions(self):
+        data_manager.save_data(self.path, [{"id": "v1"}], backup=True)
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o666 & ~data_manager._UMASK)
+
+        os.chmod(self.path, 0o640)
+        data_manager.save_data(self.path, [{"id": "v2"}], backup=True)
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o640)
+        backup_path = data_manager.get_backup_path(self.path)
+        self.assertEqual(stat.S_IMODE(os.stat(backup_path).st_mode), 0o640)
+
+    def test_corrupted_file_falls_back_to_backup(self):
+        data_manager.save_data(self.path, [{"id": "v1"}], backup=True)
+        data_manager.save_data(self.path, [{"id": "v2"}], backup=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('[{"id": "v3", "tit')  # Nutrūkęs įrašas
+
+        self.assertEqual(data_manager.load_data(self.path), [{"id": "v1"}])
+        self.assertTrue(os.path.exists(self.path + ".corrupt"))
+
+class TestStorageCodecs(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data = [{"id": "B1", "title": "Šilelis", "year": 1860},
+                     {"id": "B2", "title": "Metai", "year": 1818}]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_every_codec_roundtrips(self):
+        for fmt in data_manager.CODECS:
+            name = data_manager.get_store_filename('books.json', fmt)
+            path = os.path.join(self.tmp_dir.name, fmt + "-" + name)
+            data_manager.save_data(path, self.data, backup=False, fmt=fmt)
+            self.assertEqual(data_manager.load_data(path, fmt=fmt), self.data, fmt)
+
+    def test_format_is_inferred_from_extension(self):
+        path = os.path.join(self.tmp_dir.name, 'books.marshal')
+        data_manager.save_data(path, self.data, backup=False)
+        self.assertEqual(data_manager.load_data(path), self.data)
+
+    def test_convert_store(self):
+        data_manager.save_data(os.path.join(self.tmp_dir.name, 'books.json'), self.data, backup=False)
+        convert_store.convert_store("json", "jsonl", data_dir=self.tmp_dir.name)
+        converted = data_manager.load_data(os.path.join(self.tmp_dir.name, 'books.jsonl'))
+        self.assertEqual(converted, self.data)
+
+if __name__ == '__main__':
+    unittest.main()
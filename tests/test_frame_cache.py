@@ -0,0 +1,81 @@
+import importlib.util
+import unittest
+
+from src.models import Book
+from src.repositories.memory_repository import MemoryBookRepository
+
+HAS_PANDAS = importlib.util.find_spec("pandas") is not None
+if HAS_PANDAS:
+    import pandas as pd
+    from src.web.frame_cache import VersionedFrame, diff_frame, page_frame
+
+def _row(book):
+    return {"id": book.id, "title": book.title, "available_copies": book.available_copies}
+
+@unittest.skipUnless(HAS_PANDAS, "pandas neįdiegtas")
+class TestVersionedFrame(unittest.TestCase):
+    def setUp(self):
+        self.repo = MemoryBookRepository()
+        self.repo.books = [Book(f"Knyga {i}", "Autorius", 2000, "Žanras", id=f"B{i}") for i in range(50)]
+        self.frame = VersionedFrame(self.repo, _row)
+
+    def test_unchanged_repository_returns_same_frame(self):
+        first = self.frame.get()
+        self.assertIs(self.frame.get(), first)
+        self.assertEqual(self.frame.rebuilds, 1)
+
+    def test_changes_are_patched_without_rebuild(self):
+        self.frame.get()
+        version = self.repo.version
+        self.repo.update(self.repo.get_by_id("B3"), available_copies=0)
+        self.repo.remove_without_save("B4")
+        self.repo.add(Book("Nauja", "Autorius", 2020, "Žanras", id="B99"))
+        self.assertGreater(self.repo.version, version)
+
+        df = self.frame.get()
+        self.assertEqual(self.frame.rebuilds, 1)
+        self.assertEqual(df.loc["B3", "available_copies"], 0)
+        self.assertNotIn("B4", df.index)
+        self.assertEqual(df.index[-1], "B99")
+        self.assertEqual(len(df), 50)
+
+    def test_patch_does_not_modify_frame_already_returned(self):
+        first = self.frame.get()
+        self.repo.update(self.repo.get_by_id("B3"), available_copies=0)
+
+        second = self.frame.get()
+        self.assertIsNot(second, first)
+        self.assertEqual(second.loc["B3", "available_copies"], 0)
+        self.assertEqual(first.loc["B3", "available_copies"], 1) # Kita sesija mato seną būseną
+
+    def test_reset_rebuilds(self):
+        self.frame.get()
+        self.repo.books = self.repo.books[:5]
+        self.assertEqual(len(self.frame.get()), 5)
+        self.assertEqual(self.frame.rebuilds, 2)
+
+    def test_page_frame_holds_only_page_rows(self):
+        page = self.repo.page(10, 5, sort_key='title')
+        df = page_frame(page.items, _row)
+        self.assertEqual(list(df.index), [b.id for b in page.items])
+        self.assertEqual(list(df.columns), ["title", "available_copies"])
+        self.assertEqual(page_frame([], _row).shape, (0, 0))
+
+@unittest.skipUnless(HAS_PANDAS, "pandas neįdiegtas")
+class TestDiffFrame(unittest.TestCase):
+    def test_only_changed_cells_and_flagged_rows(self):
+        original = pd.DataFrame({"title": ["A", "B", "C"], "year": [2000, 2001, 2002],
+                                 "genre": ["X", None, "Z"], "Šalinti": [False] * 3},
+                                index=["B1", "B2", "B3"])
+        edited = original.copy()
+        edited.loc["B1", "year"] = 1999
+        edited.loc["B3", ["title", "Šalinti"]] = ["CC", True]
+
+        changes, flagged = diff_frame(original, edited, ("title", "year", "genre"), flag_column="Šalinti")
+        self.assertEqual(changes, {"B1": {"year": 1999}}) # None == None nelaikomas pakeitimu
+        self.assertIsInstance(changes["B1"]["year"], int)
+        self.assertEqual(flagged, ["B3"])
+        self.assertEqual(diff_frame(original, original.copy(), ("title",)), ({}, []))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from src.models import Book
+from src.repositories.book_repository import BookRepository
+from src.services.inventory_service import InventoryService
+from src.tools.import_books import read_records
+
+class TestBulkImport(unittest.TestCase):
+    def setUp(self):
+        self.repo = BookRepository()
+        self.repo._write = MagicMock()
+        self.repo.books = [Book("Metai", "K. Donelaitis", 1818, "Poema", id="B1")]
+        self.service = InventoryService(self.repo)
+
+    def _write_file(self, suffix, text):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_csv_import_dedupes_merges_and_writes_once(self):
+        path = self._write_file(".csv",
+            "title,author,year,genre,copies\n"
+            "metai,k. donelaitis,1818,Poema,2\n"        # Esama knyga -> +2 kopijos
+            "Dievų miškas,B. Sruoga,1957,Romanas,\n"
+            "Dievų miškas,B. Sruoga,1957,Romanas,3\n"   # Dublikatas faile -> sujungiama
+            "Ateities knyga,Nežinomas,3000,Fantastika,1\n"
+            ",Be pavadinimo,2000,Proza,1\n")
+        report = self.service.import_books(read_records(path))
+
+        self.assertEqual((report['rows'], report['added'], report['merged'], report['errors']), (5, 1, 1, 2))
+        self.assertEqual([row for row, _ in report['error_details']], [4, 5])
+        self.assertEqual(self.repo.get_by_id("B1").total_copies, 3)
+        sruoga = self.repo.find_by_details("DIEVŲ MIŠKAS", "b. sruoga")
+        self.assertEqual((sruoga.total_copies, sruoga.available_copies), (4, 4))
+        self.assertEqual(self.repo._write.call_count, 1)
+
+    def test_jsonl_import_skips_broken_lines(self):
+        path = self._write_file(".jsonl",
+            '{"title": "Altorių šešėly", "author": "V. Mykolaitis-Putinas", "year": "1933", "genre": "Romanas"}\n'
+            '\n'
+            'ne json\n')
+        report = self.service.import_books(read_records(path))
+        self.assertEqual((report['added'], report['errors']), (1, 1))
+        self.assertEqual(self.repo.search("altoriu")[0].year, 1933)
+
+    def test_large_import_rebuilds_indexes_once(self):
+        records = ({"title": f"Knyga {i}", "author": "Autorius", "year": 2000, "genre": "Proza"}
+                   for i in range(1500))
+        report = self.service.import_books(records)
+        self.assertEqual(report['added'], 1500)
+        self.assertEqual(len(self.repo.get_by_author("autorius")), 1500)
+        self.assertIsNotNone(self.repo.find_by_details("knyga 1499", "autorius"))
+
+class TestApplyChanges(unittest.TestCase):
+    def setUp(self):
+        self.repo = BookRepository()
+        self.repo._write = MagicMock()
+        self.repo.books = [
+            Book("Metai", "K. Donelaitis", 1818, "Poema", total_copies=3, available_copies=1, id="B1"),
+            Book("Dievų miškas", "B. Sruoga", 1957, "Romanas", id="B2"),
+            Book("Altorių šešėly", "V. Mykolaitis-Putinas", 1933, "Romanas", id="B3", available_copies=0),
+        ]
+        self.service = InventoryService(self.repo)
+
+    def test_changes_and_deletions_are_written_once(self):
+        count, errors = self.service.apply_changes(
+            {"B1": {"title": "Metų laikai", "total_copies": 4}, "B2": {"year": 1958.0, "genre": "Romanas"}},
+            deletions=["B3", "B2", "NERA"])
+        self.assertEqual(count, 2) # B2 ištrinta (jos pakeitimas praleidžiamas), B1 pakeista
+        self.assertEqual(len(errors), 1) # B3 paskolinta
+        book = self.repo.get_by_id("B1")
+        self.assertEqual((book.title, book.total_copies, book.available_copies), ("Metų laikai", 4, 2))
+        self.assertIsNone(self.repo.get_by_id("B2"))
+        self.assertEqual(self.repo._write.call_count, 1)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        count, errors = self.service.apply_changes({
+            "B1": {"total_copies": 1},       # 2 kopijos paskolintos
+            "B2": {"year": 3000},
+            "B3": {"author": "V. Putinas"},
+        })
+        self.assertEqual((count, len(errors)), (1, 2))
+        self.assertEqual(self.repo.get_by_id("B1").total_copies, 3)
+        self.assertEqual([b.id for b in self.repo.get_by_author("v. putinas")], ["B3"])
+
+if __name__ == '__main__':
+    unittest.main()
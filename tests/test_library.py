@@ -42,19 +42,14 @@ class TestAuthService(unittest.TestCase):
 
 class TestBookLending(unittest.TestCase):
     def setUp(self):
-        self.library = Library()
-        # Išjungiame failų rašymą
-        self.library.book_repository.save = MagicMock()
-        self.library.user_repository.save = MagicMock()
-        
         self.book = Book(
             title="Test Knyga", author="Test", year=2020, 
             total_copies=2, available_copies=2, genre="Test", id="B1"
         )
         self.reader = Reader("Test Skaitytojas", "reader", id="XX0001")
-        
-        self.library.book_manager.books = [self.book]
-        self.library.user_manager.users = [self.reader]
+
+        # Duomenys tik atmintyje: failai neskaitomi ir nerašomi
+        self.library = Library(backend="memory", books=[self.book], users=[self.reader])
 
     def test_borrow_book_success(self):
         success, msg = self.library.borrow_book(self.reader.id, self.book.id)
@@ -93,12 +88,41 @@ class TestBookLending(unittest.TestCase):
         self.assertTrue(success)
         self.assertEqual(self.book.available_copies, 2)
 
+class TestBatchLoans(unittest.TestCase):
+    def setUp(self):
+        self.reader = Reader("Skaitytojas", "reader", id="XX0001")
+        self.library = Library(backend="memory", users=[self.reader], books=[
+            Book(f"Knyga {i}", "Autorius", 2020, "Test", total_copies=1, available_copies=1, id=f"B{i}")
+            for i in range(7)
+        ])
+        self.library.book_manager.get_by_id("B6").available_copies = 0
+
+    def test_borrow_many_reports_per_item_and_writes_once(self):
+        results = self.library.borrow_many(self.reader.id, ["B0", "B0", "B6", "NERA", "B1", "B2", "B3", "B4", "B5"])
+        self.assertEqual([ok for _, ok, _ in results], [True, False, False, False, True, True, True, True, False])
+        self.assertIn("limitas", results[-1][2])
+        self.assertEqual(len(self.reader.active_loans), 5)
+        self.assertEqual(self.library.book_repository.writes, 1)
+        self.assertEqual(self.library.user_repository.writes, 1)
+
+    def test_all_or_nothing_leaves_state_unchanged(self):
+        results = self.library.borrow_many(self.reader.id, ["B0", "B6"], all_or_nothing=True)
+        self.assertFalse(any(ok for _, ok, _ in results))
+        self.assertEqual(self.reader.active_loans, [])
+        self.assertEqual(self.library.book_manager.get_by_id("B0").available_copies, 1)
+
+    def test_return_all_books_uses_one_transaction(self):
+        self.library.borrow_many(self.reader.id, ["B0", "B1", "B2"])
+        writes = self.library.user_repository.writes
+        success, msg = self.library.return_all_books(self.reader.id)
+        self.assertTrue(success)
+        self.assertIn("3", msg)
+        self.assertEqual(self.reader.active_loans, [])
+        self.assertEqual(self.library.book_manager.get_by_id("B1").available_copies, 1)
+        self.assertEqual(self.library.user_repository.writes, writes + 1)
+
 class TestBookManagement(unittest.TestCase):
     def setUp(self):
-        self.library = Library()
-        self.library.book_repository.save = MagicMock()
-        self.library.book_repository.remove = MagicMock()
-        
         # Pataisymas: Nurodome konkrečiai, kas yra kas
         self.book = Book(
             title="Trinama",
@@ -109,7 +133,8 @@ class TestBookManagement(unittest.TestCase):
             genre="Genre",
             id="DEL1"
         )
-        self.library.book_manager.books = [self.book]
+        self.library = Library(backend="memory", books=[self.book])
+        self.library.book_repository.remove = MagicMock()
 
     def test_delete_book_success(self):
         # Dabar tai veiks, nes sukūrėme safe_delete_book metode Library
@@ -125,5 +150,24 @@ class TestBookManagement(unittest.TestCase):
         # Knyga vis dar turi būti sąraše
         self.assertIn(self.book, self.library.book_manager.books)
 
+class TestMemoryBackend(unittest.TestCase):
+    def test_seeded_from_dicts_and_never_touches_disk(self):
+        library = Library(backend="memory",
+                          books=[{"id": "B1", "title": "Metai", "author": "K. Donelaitis",
+                                  "year": 1818, "genre": "Poema", "total_copies": 1, "available_copies": 1}],
+                          users=[{"id": "XX0001", "username": "Jonas", "role": "reader"},
+                                 {"id": "LIB1", "username": "admin", "role": "librarian", "password": "x"}])
+        self.assertEqual(library.book_repository.search("metai")[0].id, "B1")
+        self.assertEqual(library.user_repository.get_by_username("admin").role, "librarian")
+
+        success, _ = library.borrow_book("XX0001", "B1")
+        self.assertTrue(success)
+        self.assertEqual((library.book_repository.writes, library.user_repository.writes), (1, 1))
+        self.assertFalse(library.book_repository.restore_backup()[0])
+
+    def test_seed_is_rejected_for_file_backends(self):
+        with self.assertRaises(ValueError):
+            Library(backend="json", books=[])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,151 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from src.models import Book, Reader
+from src.repositories.book_repository import BookRepository
+from src.repositories.user_repository import UserRepository
+from src.repositories.loan_journal import LoanJournal
+from src.services.loan_service import LoanService
+from src.services.stats_service import StatsService
+from src.services.parallel_reports import scan_history, scan_shard, split_shards
+
+class TestLoanJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.journal_path = os.path.join(self.tmp_dir.name, 'loan_journal.jsonl')
+        self.history_path = os.path.join(self.tmp_dir.name, 'loan_history.jsonl')
+
+        self.books = self._book_repo()
+        self.users = self._user_repo()
+        self.journal = LoanJournal(self.journal_path, self.history_path)
+        self.users.attach_journal(self.journal)
+        self.loans = LoanService(self.books, self.users, self.journal)
+
+    def tearDown(self):
+        self.journal.close()
+        self.tmp_dir.cleanup()
+
+    def _book_repo(self):
+        repo = BookRepository()
+        repo._write = MagicMock()
+        repo.books = [Book(f"Knyga {i}", "Autorius", 2000, "Žanras", total_copies=2,
+                           available_copies=2, id=f"B{i}") for i in range(3)]
+        return repo
+
+    def _user_repo(self):
+        """Imituoja users.json snapshot: skaitytojas be paskolų."""
+        repo = UserRepository()
+        repo._write = MagicMock()
+        repo.users = [Reader("Jonas", "reader", id="JN0001")]
+        return repo
+
+    def _restart(self):
+        """Naujas procesas: tas pats snapshot + žurnalo pakartojimas."""
+        users = self._user_repo()
+        users.attach_journal(LoanJournal(self.journal_path, self.history_path))
+        return users
+
+    def test_loans_append_to_journal_instead_of_rewriting_users(self):
+        self.loans.borrow_book("JN0001", "B0")
+        self.loans.borrow_book("JN0001", "B1")
+        self.assertEqual(self.users._write.call_count, 0)
+        self.assertEqual(self.journal.pending, 2)
+
+    def test_replay_rebuilds_reader_state(self):
+        self.loans.borrow_book("JN0001", "B0")
+        self.loans.borrow_book("JN0001", "B1")
+        self.loans.return_book("JN0001", "B0")
+        success, _ = self.loans.renew_book("JN0001", "B1")
+        self.assertTrue(success)
+
+        expected = list(self.users.get_by_id("JN0001").active_loans)
+        restored = self._restart().get_by_id("JN0001").active_loans
+        self.assertEqual(restored, expected)
+
+    def test_snapshot_compacts_journal_and_keeps_history(self):
+        self.loans.borrow_book("JN0001", "B0")
+        self.loans.return_book("JN0001", "B0")
+        self.loans.borrow_book("JN0001", "B0")
+
+        self.users.save() # Pilnas snapshot -> kompaktavimas
+        self.assertEqual(self.journal.pending, 0)
+        self.assertFalse(os.path.exists(self.journal_path))
+        self.assertEqual(len(list(self.journal.history())), 3)
+
+        stats = StatsService(self.books, self.users, self.journal)
+        self.assertEqual(stats.get_most_borrowed_books(1), [("Knyga 0", 2)])
+
+    def test_failed_snapshot_keeps_journal_and_retries(self):
+        self.loans.borrow_book("JN0001", "B0")
+        self.loans.borrow_book("JN0001", "B1")
+
+        # Tikras _write, bet users.json neįmanoma sukurti (tėvinis "aplankas" yra failas)
+        blocker = os.path.join(self.tmp_dir.name, 'blocker')
+        open(blocker, 'w').close()
+        del self.users._write
+        self.users.filepath = os.path.join(blocker, 'users.json')
+        self.users.save()
+
+        self.assertTrue(self.users.is_dirty)
+        self.assertTrue(os.path.exists(self.journal_path))
+        self.assertEqual(self.journal.pending, 2)
+        self.assertEqual(len(self._restart().get_by_id("JN0001").active_loans), 2)
+
+        self.users.filepath = os.path.join(self.tmp_dir.name, 'users.json')
+        self.assertTrue(self.users.flush()) # Kitas bandymas pavyksta -> kompaktuojama
+        self.assertFalse(self.users.is_dirty)
+        self.assertFalse(os.path.exists(self.journal_path))
+
+    def test_replay_is_idempotent_on_newer_snapshot(self):
+        self.loans.borrow_book("JN0001", "B0")
+        users = self._user_repo()
+        users.users[0].active_loans.append(dict(self.users.get_by_id("JN0001").active_loans[0]))
+        users.attach_journal(LoanJournal(self.journal_path, self.history_path))
+        self.assertEqual(len(users.get_by_id("JN0001").active_loans), 1)
+
+class TestParallelHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.paths = [os.path.join(self.tmp_dir.name, name)
+                      for name in ('loan_history.jsonl', 'loan_journal.jsonl')]
+        journal = LoanJournal(self.paths[1], self.paths[0])
+        journal.append_many([(LoanJournal.BORROW if i % 3 else LoanJournal.RETURN, "JN0001",
+                              f"B{i % 7}", f"Knyga {i % 7}", "2026-01-01") for i in range(500)])
+        journal.rotate() # -> loan_history.jsonl
+        journal.append_many([(LoanJournal.BORROW, "JN0001", "B1", "Naujas pavadinimas", "2026-01-01")])
+        journal.close()
+        with open(self.paths[0], 'a', encoding='utf-8') as f:
+            f.write('{"op": "borrow", "book_id": "B2"\n') # Nutrūkusi eilutė
+
+    def test_shards_give_same_result_as_single_pass(self):
+        serial = scan_history(self.paths)
+        self.assertEqual(serial[0]["B1"], 49)
+        self.assertEqual(serial[1]["B1"], "Naujas pavadinimas")
+        self.assertEqual(serial[2], 1)
+
+        for parts in (2, 7, 50):
+            merged = [scan_shard(*shard) for shard in split_shards(self.paths, parts)]
+            counts = sum((part[0] for part in merged), start=type(serial[0])())
+            self.assertEqual(counts, serial[0], parts)
+        self.assertEqual(scan_history(self.paths, workers=2), serial)
+
+    def test_stats_service_uses_history_scan(self):
+        books = BookRepository()
+        books._write = MagicMock()
+        books.books = [Book(f"Knyga {i}", "Autorius", 2000, "Poema" if i < 3 else "Romanas", id=f"B{i}")
+                       for i in range(6)]
+        users = UserRepository()
+        users._write = MagicMock()
+        journal = LoanJournal(self.paths[1], self.paths[0])
+        stats = StatsService(books, users, journal, workers=2)
+        stats.parallel_min_bytes = 0
+        self.assertEqual(stats.get_most_borrowed_books(1), [("Naujas pavadinimas", 49)])
+        history = stats.get_borrowed_genre_history()
+        self.assertEqual(sum(history.values()), 334)
+        self.assertEqual(history["Nežinomas"], 47) # B6 kataloge nebėra
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from src import database
+from src.tools.migrate_to_sqlite import iter_json_array, migrate
+
+BOOKS = [
+    {"id": "B1", "title": "Altorių šešėly", "author": "V. Mykolaitis-Putinas", "year": 1933,
+     "genre": "Romanas", "total_copies": 2, "available_copies": 1},
+    {"id": "B2", "title": "Metai", "author": "K. Donelaitis", "year": 1818,
+     "genre": "Poema", "total_copies": 1, "available_copies": 1},
+    {"id": "B3", "title": "Dievų miškas", "author": "B. Sruoga", "year": 1957,
+     "genre": "Romanas", "total_copies": 3, "available_copies": 3},
+]
+USERS = [
+    {"id": "LIB1", "username": "admin", "role": "librarian", "password": "admin"},
+    {"id": "ON0001", "username": "Ona", "role": "reader",
+     "active_loans": [{"book_id": "B1", "title": "Altorių šešėly", "due_date": "2024-01-30"}]},
+    {"id": "JO0002", "username": "Jonas", "role": "reader", "active_loans": []},
+]
+
+class TestMigrateToSqlite(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_file = self._path('library.db')
+        self.books_path = self._write('books.json', BOOKS)
+        self.users_path = self._write('users.json', USERS)
+
+    def tearDown(self):
+        database.close_all(self.db_file)
+        self.tmp_dir.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmp_dir.name, name)
+
+    def _write(self, name, data):
+        path = self._path(name)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+        return path
+
+    def test_stream_parser_matches_json_load_with_tiny_chunks(self):
+        self.assertEqual(list(iter_json_array(self.users_path, chunk_chars=7)), USERS)
+        self.assertEqual(list(iter_json_array(self._write('empty.json', []))), [])
+
+        with open(self._path('broken.json'), 'w', encoding='utf-8') as f:
+            f.write('[{"id": "B1"}, {"id": ')
+        with self.assertRaises(ValueError):
+            list(iter_json_array(self._path('broken.json'), chunk_chars=4))
+
+    def test_migrates_books_users_and_exploded_loans(self):
+        report = migrate(self.books_path, self.users_path, self.db_file)
+
+        self.assertEqual(report['verify']['problems'], [])
+        self.assertEqual(report['verify']['counts'], {'books': 3, 'users': 3, 'loans': 1})
+        conn = sqlite3.connect(self.db_file)
+        self.addCleanup(conn.close)
+        self.assertEqual(conn.execute("SELECT user_id, book_id, due_date FROM loans").fetchall(),
+                         [("ON0001", "B1", "2024-01-30")])
+        self.assertEqual(conn.execute("SELECT password FROM users WHERE id = 'LIB1'").fetchone()[0], "admin")
+
+    def test_verify_reports_broken_copy_invariants(self):
+        books = [dict(BOOKS[0], available_copies=2), BOOKS[1], dict(BOOKS[2], available_copies=5)]
+        report = migrate(self._write('bad_books.json', books), self.users_path, self.db_file)
+        problems = report['verify']['problems']
+        self.assertEqual(len(problems), 2)
+        self.assertIn("B3", problems[0]) # available > total
+        self.assertIn("B1", problems[1]) # paskola yra, bet kopija neišduota
+
+    def test_resumes_after_interruption_without_duplicates(self):
+        def crash(source, records, rows, seconds):
+            if source == "users" and records == 2:
+                raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            migrate(self.books_path, self.users_path, self.db_file, batch_size=1, commit_every=2,
+                    progress=crash)
+        report = migrate(self.books_path, self.users_path, self.db_file, batch_size=1, commit_every=2)
+
+        self.assertEqual(report['users']['resumed'], 2)
+        self.assertEqual(report['books']['new_rows'], 0) # Knygos perkeltos pirmo paleidimo metu
+        self.assertEqual(report['verify']['problems'], [])
+        self.assertEqual(report['verify']['counts'], {'books': 3, 'users': 3, 'loans': 1})
+
+    def test_refuses_to_overwrite_existing_data_without_replace(self):
+        migrate(self.books_path, self.users_path, self.db_file)
+        conn = sqlite3.connect(self.db_file)
+        conn.execute("DELETE FROM migration_state")
+        conn.commit()
+        conn.close()
+
+        with self.assertRaises(ValueError):
+            migrate(self.books_path, self.users_path, self.db_file)
+        report = migrate(self.books_path, self.users_path, self.db_file, replace=True)
+        self.assertEqual(report['verify']['counts']['books'], 3)
+
+if __name__ == '__main__':
+    unittest.main()
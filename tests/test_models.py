@@ -0,0 +1,38 @@
+import unittest
+
+from src.models import Book, BookTable, Loan, Reader
+
+class TestCompactModels(unittest.TestCase):
+    def test_book_is_slotted_and_interns_author(self):
+        a = Book("Metai", "".join(["K. ", "Donelaitis"]), 1818, "Poema")
+        b = Book("Pavasario linksmybės", "".join(["K. ", "Donelaitis"]), 1818, "Poema")
+        self.assertFalse(hasattr(a, '__dict__'))
+        self.assertIs(a.author, b.author)
+        self.assertEqual(Book(**a.to_dict()), a)
+
+    def test_loan_behaves_like_dict(self):
+        loan = Loan("B1", "Metai", "2026-01-05")
+        self.assertEqual(loan['due_date'], "2026-01-05")
+        self.assertEqual(loan.get('nėra', 'x'), 'x')
+        self.assertEqual(dict(loan), {"book_id": "B1", "title": "Metai", "due_date": "2026-01-05"})
+        loan['due_date'] = "2026-02-01"
+        self.assertEqual(loan.due - Loan("B1", "", "2026-01-05").due, 27)
+
+    def test_reader_round_trip_keeps_bad_dates(self):
+        data = {"id": "JN0001", "username": "Jonas", "role": "reader",
+                "active_loans": [{"book_id": "B1", "title": "Metai", "due_date": "bloga data"}]}
+        reader = Reader.from_dict(data)
+        self.assertIsInstance(reader.active_loans[0], Loan)
+        self.assertIsNone(reader.active_loans[0].due)
+        self.assertEqual(reader.to_dict(), data)
+
+    def test_book_table_columns(self):
+        books = [Book("A", "X", 2000, "Poema", id="1"), Book("B", "Y", 1990, "Poema", id="2")]
+        table = BookTable.from_books(books)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.mean_year(), 1995)
+        self.assertEqual(table.genre_counts()["Poema"], 2)
+        self.assertEqual(table.row(1), books[1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from src import perf, data_manager
+from src.models import Book, Reader
+from src.repositories.book_repository import BookRepository
+from src.repositories.user_repository import UserRepository
+from src.services.loan_service import LoanService
+
+class TestPerfRegistry(unittest.TestCase):
+    def test_histogram_and_percentiles(self):
+        registry = perf.Registry()
+        for ms in (0.05, 0.3, 0.3, 2, 700):
+            registry.record("veiksmas", ms / 1000)
+        metric = registry.get("veiksmas")
+        self.assertEqual(metric.count, 5)
+        self.assertEqual(metric.percentile(0.5), 0.5)
+        self.assertEqual(metric.percentile(0.95), 1000)
+        data = registry.snapshot()["veiksmas"]
+        self.assertEqual(sum(data["histogram"].values()), 5)
+        self.assertAlmostEqual(data["max_ms"], 700)
+
+    def test_services_and_storage_are_measured(self):
+        perf.REGISTRY.reset()
+        self.addCleanup(perf.REGISTRY.reset)
+        books, users = BookRepository(), UserRepository()
+        for repo in (books, users):
+            repo._write = MagicMock()
+        books.books = [Book("Metai", "K. Donelaitis", 1818, "Poema", id="B1")]
+        users.users = [Reader("Jonas", "reader", id="RD0001")]
+        loans = LoanService(books, users)
+
+        loans.borrow_book("RD0001", "B1")
+        loans.return_book("RD0001", "B1")
+        with self.assertRaises(Exception):
+            loans.borrow_book("RD0001", None, "per daug argumentų")
+
+        snapshot = perf.REGISTRY.snapshot()
+        self.assertEqual(snapshot["LoanService.borrow_book"]["count"], 2)
+        self.assertEqual(snapshot["LoanService.borrow_book"]["errors"], 1)
+        self.assertEqual(snapshot["LoanService.borrow_many"]["count"], 1) # borrow_book viduje
+        self.assertEqual(snapshot["BookRepository._write"]["count"], 2)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "books.json")
+            data_manager.save_data(path, [{"title": "Metai"}])
+            written = perf.REGISTRY.get("data_manager.save_data").bytes
+            self.assertEqual(written, os.path.getsize(path))
+
+            dump = os.path.join(tmp, "perf.json")
+            perf.REGISTRY.dump_json(dump)
+            with open(dump, encoding="utf-8") as f:
+                self.assertIn("LoanService.return_book", json.load(f)["metrics"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,273 @@
+import time
+import unittest
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+
+from src.models import Book, Reader, Librarian
+from src.repositories.book_repository import BookRepository
+from src.repositories.user_repository import UserRepository
+from src.repositories.memory_repository import MemoryBookRepository, MemoryUserRepository
+from src.services.auth_service import AuthService
+from src.services.inventory_service import InventoryService
+from src.services.loan_service import LoanService
+from src.services.stats_service import StatsService
+
+class TestRepositoryIndexes(unittest.TestCase):
+    def setUp(self):
+        self.books = MemoryBookRepository()
+        self.users = MemoryUserRepository()
+
+        self.books.books = [Book("Metai", "K. Donelaitis", 1818, "Poema", id="B1")]
+        self.users.users = [Reader("Jonas", "reader", id="JN0001"),
+                            Librarian("Admin", "librarian", password="x")]
+
+    def test_book_index_follows_add_and_remove(self):
+        book = Book("Anykščių šilelis", "A. Baranauskas", 1860, "Poema", id="B2")
+        self.books.add(book)
+        self.assertIs(self.books.get_by_id("B2"), book)
+
+        self.assertTrue(self.books.remove_without_save("B1"))
+        self.assertIsNone(self.books.get_by_id("B1"))
+        self.assertFalse(self.books.remove("B1"))
+
+    def test_username_lookup_is_case_insensitive(self):
+        self.assertEqual(self.users.get_by_username("ADMIN").role, "librarian")
+        self.assertIsNone(self.users.get_by_username("nėra"))
+
+    def test_rename_and_remove_keep_indexes(self):
+        reader = self.users.get_by_id("JN0001")
+        self.users.rename(reader, "Petras")
+        self.assertIsNone(self.users.get_by_username("jonas"))
+        self.assertIs(self.users.get_by_username("petras"), reader)
+
+        self.assertTrue(self.users.remove(reader))
+        self.assertIsNone(self.users.get_by_id("JN0001"))
+        self.assertIsNone(self.users.get_by_username("petras"))
+
+    def test_regenerate_card_id_reindexes(self):
+        reader = self.users.get_by_id("JN0001")
+        success, _ = AuthService(self.users).regenerate_card_id(reader, "ZZ9999")
+        self.assertTrue(success)
+        self.assertIsNone(self.users.get_by_id("JN0001"))
+        self.assertIs(self.users.get_by_id("ZZ9999"), reader)
+
+class TestSecondaryIndexes(unittest.TestCase):
+    def setUp(self):
+        self.books = MemoryBookRepository()
+        self.books.books = [
+            Book("Metai", "K. Donelaitis", 1818, "Poema", id="B1"),
+            Book("Anykščių šilelis", "A. Baranauskas", 1860, "Poema", id="B2"),
+            Book("Altorių šešėly", "V. Mykolaitis-Putinas", 1933, "Romanas", id="B3"),
+            Book("Dievų miškas", "B. Sruoga", 1957, "Romanas", id="B4", available_copies=0),
+        ]
+
+    def test_genre_and_author_lookups_are_normalised(self):
+        self.assertEqual([b.id for b in self.books.get_by_genre(" POEMA ")], ["B1", "B2"])
+        self.assertEqual([b.id for b in self.books.get_by_author("b. sruoga")], ["B4"])
+        self.assertEqual([b.id for b in self.books.get_by_author("putin", partial=True)], ["B3"])
+        self.assertEqual(self.books.get_genres(), ["Poema", "Romanas"])
+
+    def test_year_range_is_inclusive(self):
+        self.assertEqual([b.id for b in self.books.get_by_year_range(1860, 1957)], ["B2", "B3", "B4"])
+        self.assertEqual([b.id for b in self.books.get_by_year_range(max_year=1859)], ["B1"])
+        self.assertEqual([b.id for b in self.books.get_candidates_by_year(1958)], ["B1", "B2", "B3"])
+
+    def test_update_and_remove_keep_secondary_indexes(self):
+        book = self.books.get_by_id("B1")
+        self.books.update(book, genre="Epas", year=1999)
+        self.assertEqual([b.id for b in self.books.get_by_genre("poema")], ["B2"])
+        self.assertEqual([b.id for b in self.books.get_by_year_range(1990)], ["B1"])
+
+        self.books.remove_without_save("B2")
+        self.assertEqual(self.books.get_by_genre("poema"), [])
+        self.assertEqual([b.id for b in self.books.get_by_year_range(max_year=1900)], [])
+
+class TestPagination(unittest.TestCase):
+    def setUp(self):
+        self.books = MemoryBookRepository()
+        self.books.books = [
+            Book(f"Knyga {i:02d}", "Autorius " + "ABC"[i % 3], 1900 + i, "Poema" if i % 2 else "Romanas", id=f"B{i:02d}")
+            for i in range(30)
+        ]
+
+    def ids(self, page):
+        return [b.id for b in page.items]
+
+    def test_pages_are_sorted_slices_with_total(self):
+        page = self.books.page(10, 5, sort_key='title')
+        self.assertEqual(self.ids(page), ["B10", "B11", "B12", "B13", "B14"])
+        self.assertEqual((page.total, page.offset, page.limit), (30, 10, 5))
+        self.assertEqual(self.ids(self.books.page(0, 2, sort_key='year', descending=True)), ["B29", "B28"])
+        self.assertEqual(self.books.page(28, 10).items[-1].id, "B29")
+        with self.assertRaises(ValueError):
+            self.books.page(sort_key='isbn')
+
+    def test_filters_use_indexes(self):
+        page = self.books.page(0, 3, sort_key='year', filter={'genre': 'poema', 'min_year': 1910})
+        self.assertEqual(self.ids(page), ["B11", "B13", "B15"])
+        self.assertEqual(page.total, 10)
+        page = self.books.page(0, 5, sort_key=None, filter="knyga 1")
+        self.assertEqual(page.total, 10) # "1" - prefiksas: 10..19
+        self.assertEqual(self.ids(page), ["B10", "B11", "B12", "B13", "B14"])
+        self.assertEqual(self.books.page(filter={'author': 'autorius c', 'max_year': 1905}).total, 2)
+
+    def test_sorted_order_follows_changes(self):
+        self.books.page(0, 1, sort_key='author') # Sukuriamas rikiavimo indeksas
+        self.books.update(self.books.get_by_id("B05"), author="Aaa")
+        self.books.remove_without_save("B00")
+        self.assertEqual(self.ids(self.books.page(0, 2, sort_key='author')), ["B05", "B03"])
+        self.assertEqual(self.books.page(sort_key='author').total, 29)
+
+class TestRemoval(unittest.TestCase):
+    def setUp(self):
+        self.books = MemoryBookRepository()
+        self.books.books = [Book(f"Knyga {i:03d}", "Autorius", 1900 + i % 50, "Poema" if i % 2 else "Romanas",
+                                 id=f"B{i:03d}") for i in range(200)]
+
+    def test_remove_many_keeps_order_and_indexes(self):
+        self.books.page(0, 1, sort_key='title') # Sukuriamas rikiavimo indeksas
+        removed = [f"B{i:03d}" for i in range(0, 200, 2)]
+        self.assertEqual(self.books.remove_many(removed + ["NERA"]), 100)
+        self.assertEqual(self.books.writes, 1)
+
+        self.assertEqual([b.id for b in self.books.get_all()], [f"B{i:03d}" for i in range(1, 200, 2)])
+        self.assertIsNone(self.books.get_by_id("B000"))
+        self.assertEqual(self.books.get_by_genre("romanas"), [])
+        self.assertEqual(self.books.page(sort_key='title').total, 100)
+        self.assertEqual(len(self.books.get_by_year_range(1900, 1949)), 100)
+        self.assertEqual(self.books.search("knyga 000"), [])
+        # Po masinio trynimo pavienis šalinimas vis dar randa teisingą vietą sąraše
+        self.assertTrue(self.books.remove("B001"))
+        self.assertTrue(self.books.remove("B199"))
+        self.assertEqual(len(self.books.get_all()), 98)
+        self.assertNotIn("B001", [b.id for b in self.books.get_all()])
+
+    def test_bulk_delete_cost_is_bounded(self):
+        self.books.books = [Book(f"Knyga {i}", f"Autorius {i % 100}", 1900 + i % 100, f"Žanras {i % 5}",
+                                 id=f"B{i}") for i in range(50_000)]
+        self.books.page(0, 1, sort_key='author')
+        ids = [b.id for b in self.books.get_candidates_by_genre("Žanras 0")]
+
+        # Knygos nelyginamos su visu sąrašu (list.remove kviestų __eq__ kiekvienam elementui)
+        with patch.object(Book, '__eq__', side_effect=AssertionError("O(n) paieška sąraše")):
+            start = time.perf_counter()
+            self.assertEqual(InventoryService(self.books).batch_delete(ids), 10_000)
+            for book_id in ("B1", "B2", "B3"):
+                self.books.remove(book_id)
+            elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 2.0)
+        self.assertEqual(len(self.books.get_all()), 39_997)
+        self.assertEqual(self.books.page(sort_key='author').total, 39_997)
+
+class TestDueDateIndex(unittest.TestCase):
+    def setUp(self):
+        self.books = MemoryBookRepository()
+        self.users = MemoryUserRepository()
+
+        def days_ago(n):
+            return (date.today() - timedelta(days=n)).isoformat()
+
+        self.books.books = [Book(f"Knyga {i}", "Autorius", 2000, "Žanras", id=f"B{i}") for i in range(4)]
+        self.users.users = [
+            Reader("Jonas", "reader", id="JN0001", active_loans=[
+                {"book_id": "B0", "title": "Knyga 0", "due_date": days_ago(3 * 365)},
+                {"book_id": "B1", "title": "Knyga 1", "due_date": days_ago(-7)},
+            ]),
+            Reader("Ona", "reader", id="ON0001", active_loans=[
+                {"book_id": "B2", "title": "Knyga 2", "due_date": days_ago(10)},
+                {"book_id": "B3", "title": "Knyga 3", "due_date": "bloga data"},
+            ]),
+        ]
+        self.loans = LoanService(self.books, self.users)
+        self.stats = StatsService(self.books, self.users)
+
+    def test_overdue_and_lost_are_range_scans(self):
+        report = self.stats.get_all_overdue_report()
+        self.assertEqual([r['title'] for r in report], ["Knyga 0", "Knyga 2"])
+        self.assertEqual([b.id for b in self.stats.get_lost_books_candidates(2)], ["B0"])
+        self.assertEqual(self.users.count_loans_due_before(date.today().toordinal()), 2)
+
+    def test_fine_uses_active_loans(self):
+        fine, details = self.loans.calculate_fine(self.users.get_by_id("ON0001"))
+        self.assertEqual([d['days'] for d in details], [10])
+        self.assertGreater(fine, 0)
+
+    def test_index_follows_return_renew_and_id_change(self):
+        self.loans.return_book("ON0001", "B2")
+        ona = self.users.get_by_id("ON0001")
+        AuthService(self.users).regenerate_card_id(ona, "ZZ9999")
+        jonas = self.users.get_by_id("JN0001")
+        self.users.set_loan_due(jonas, jonas.active_loans[0], date.today().isoformat())
+        self.assertEqual(self.stats.get_all_overdue_report(), [])
+
+class TestWriteBehind(unittest.TestCase):
+    def setUp(self):
+        self.books = BookRepository()
+        self.users = UserRepository()
+        # Fizinį rašymą pakeičiame skaitikliu - tikriname, KIEK kartų rašoma
+        self.books._write = MagicMock()
+        self.users._write = MagicMock()
+
+        self.books.books = [Book(f"Knyga {i}", "Autorius", 2000, "Žanras", id=f"B{i}") for i in range(3)]
+        self.users.users = [Reader("Jonas", "reader", id="JN0001")]
+        self.loans = LoanService(self.books, self.users)
+
+    def test_save_outside_batch_writes_immediately(self):
+        self.books.save()
+        self.assertEqual(self.books._write.call_count, 1)
+        self.assertFalse(self.books.is_dirty)
+
+    def test_batch_borrowing_writes_once(self):
+        with self.books.batch(), self.users.batch():
+            for i in range(3):
+                success, _ = self.loans.borrow_book("JN0001", f"B{i}")
+                self.assertTrue(success)
+            self.assertEqual(self.books._write.call_count, 0)
+        self.assertEqual(self.books._write.call_count, 1)
+        self.assertEqual(self.users._write.call_count, 1)
+
+    def test_return_all_books_writes_once(self):
+        for i in range(3):
+            self.loans.borrow_book("JN0001", f"B{i}")
+        self.books._write.reset_mock()
+        self.users._write.reset_mock()
+
+        success, _ = self.loans.return_all_books("JN0001")
+        self.assertTrue(success)
+        self.assertEqual(self.books._write.call_count, 1)
+        self.assertEqual(self.users._write.call_count, 1)
+
+    def test_write_behind_timer_coalesces_saves(self):
+        self.books.write_behind_seconds = 0.05
+        self.books.save()
+        self.books.save()
+        self.assertEqual(self.books._write.call_count, 0)
+        time.sleep(0.2)
+        self.assertEqual(self.books._write.call_count, 1)
+        self.assertFalse(self.books.flush())
+
+class TestLazyLoading(unittest.TestCase):
+    def test_data_is_loaded_once_on_first_access(self):
+        books = BookRepository()
+        users = UserRepository()
+        stats = StatsService(books, users) # Neturi versti skaityti failų
+        self.assertFalse(books.is_loaded or users.is_loaded)
+
+        books._load = MagicMock(side_effect=lambda: setattr(
+            books, 'books', [Book("Metai", "K. Donelaitis", 1818, "Poema", id="B1")]))
+        users._load = MagicMock(side_effect=lambda: setattr(
+            users, 'users', [Reader("Jonas", "reader", id="RD0001")]))
+
+        self.assertEqual(books.get_by_id("B1").title, "Metai")
+        self.assertEqual(books.search("metai")[0].id, "B1")
+        self.assertEqual(books._load.call_count, 1)
+        self.assertFalse(users.is_loaded)
+
+        # Statistika užkrauna trūkstamas repozitorijas skaitymo užrakto viduje
+        self.assertEqual(stats.get_advanced_statistics()['reader_count'], 1)
+        self.assertEqual(users._load.call_count, 1)
+        self.assertTrue(stats.check_consistency())
+
+if __name__ == '__main__':
+    unittest.main()
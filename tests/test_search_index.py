@@ -0,0 +1,81 @@
+import unittest
+
+from src.models import Book
+from src.repositories.memory_repository import MemoryBookRepository
+from src.repositories.search_index import SearchIndex, normalize
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.books = [
+            Book("Žalgirio mūšis", "Jonas Biliūnas", 1910, "Istorija", id="B1"),
+            Book("Haris Poteris ir išminties akmuo", "J. K. Rowling", 1997, "Fantastika", id="B2"),
+            Book("Haris Poteris ir paslapčių kambarys", "J. K. Rowling", 1998, "Fantastika", id="B3"),
+            Book("Metai", "Kristijonas Donelaitis", 1818, "Poema", id="B4"),
+        ]
+        self.index = SearchIndex()
+        self.index.rebuild(self.books)
+
+    def test_diacritics_are_folded(self):
+        self.assertEqual(normalize("Šešėlių Žemė"), "seseliu zeme")
+        self.assertEqual(self.index.search("zalgirio"), ["B1"])
+        self.assertEqual(self.index.search("BILIŪNAS"), ["B1"])
+
+    def test_prefix_and_all_terms_must_match(self):
+        self.assertEqual(self.index.search("haris pot"), ["B2", "B3"])
+        self.assertEqual(self.index.search("haris paslap"), ["B3"])
+        self.assertEqual(self.index.search("haris donelaitis"), [])
+        self.assertIsNone(self.index.search("  ,  "))
+
+    def test_title_matches_rank_above_author_matches(self):
+        # "jonas" - pilnas žodis autoriuje (B1), "kristijonas" neprasideda "jonas"
+        extra = Book("Jonas ir draugai", "Nežinomas", 2000, "Proza", id="B5")
+        self.index.add(extra)
+        self.assertEqual(self.index.search("jonas"), ["B5", "B1"])
+        self.assertEqual(self.index.search("haris", limit=1), ["B2"])
+
+    def test_remove_and_readd_update_index(self):
+        self.index.remove("B2")
+        self.assertEqual(self.index.search("isminties"), [])
+        self.books[3].title = "Metų laikai"
+        self.index.add(self.books[3])
+        self.assertEqual(self.index.search("laikai"), ["B4"])
+        self.assertEqual(len(self.index), 3)
+
+    def test_single_letter_is_whole_word_and_limit_matches_full_ranking(self):
+        self.index.add(Book("A ir B", "Nežinomas", 2000, "Proza", id="B5"))
+        self.index.add(Book("Pasakos", "Haris Kalnas", 2001, "Vaikams", id="B6"))
+        self.assertEqual(self.index.search("a"), ["B5"]) # Ne "akmuo", ne "Haris"
+        self.assertEqual(self.index.count("a"), 1)
+
+        full = self.index.search("ha")
+        self.assertEqual(full, ["B2", "B3", "B6"]) # Pavadinimo prefiksas, tada autoriaus
+        for limit in (1, 2, 3, 10):
+            self.assertEqual(self.index.search("ha", limit=limit), full[:limit])
+        self.assertEqual(self.index.count("ha"), 3)
+        self.assertEqual(self.index.count("haris pa"), 2) # B3 (paslapčių) ir B6 (Pasakos)
+
+        self.index.remove("B6") # Kešuotos aibės ir sąrašai atnaujinami
+        self.assertEqual(self.index.search("ha", limit=10), ["B2", "B3"])
+        self.assertEqual(self.index.count("ha"), 2)
+
+class TestBookRepositorySearch(unittest.TestCase):
+    def setUp(self):
+        self.repo = MemoryBookRepository()
+        self.repo.books = [Book("Metai", "K. Donelaitis", 1818, "Poema", id="B1")]
+
+    def test_update_reindexes_title(self):
+        book = self.repo.get_by_id("B1")
+        self.repo.update(book, title="Pavasario linksmybės")
+        self.assertEqual(self.repo.search("metai"), [])
+        self.assertEqual(self.repo.search("pavasario"), [book])
+        self.assertEqual(len(self.repo.search("")), 1)
+
+    def test_query_page_ranks_only_up_to_page_end(self):
+        self.repo.add_many(Book(f"Pasaka {i:02d}", "Autorius", 2000, "Vaikams", id=f"P{i:02d}")
+                           for i in range(30))
+        page = self.repo.page(10, 5, sort_key=None, filter={'query': "pasak", 'genre': ''})
+        self.assertEqual(page.total, 30)
+        self.assertEqual([book.id for book in page.items], [f"P{i:02d}" for i in range(10, 15)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from src import database
+from src.models import Book, Reader
+from src.repositories.sqlite_book_repository import SqliteBookRepository
+from src.repositories.sqlite_user_repository import SqliteUserRepository
+from src.services.loan_service import LoanService
+
+class TestSqliteRepositories(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_file = os.path.join(self.tmp_dir.name, 'library.db')
+        self.books = SqliteBookRepository(self.db_file)
+        self.users = SqliteUserRepository(self.db_file)
+
+        self.book = Book("Altorių šešėly", "Vincas Mykolaitis-Putinas", 1933, "Romanas",
+                         total_copies=2, available_copies=2, id="B1")
+        self.reader = Reader("Ona", "reader", id="ON0001")
+        self.books.add(self.book)
+        self.users.add(self.reader)
+
+    def tearDown(self):
+        database.close_all(self.db_file)
+        self.tmp_dir.cleanup()
+
+    def test_add_and_reload(self):
+        reloaded = SqliteBookRepository(self.db_file)
+        self.assertEqual(len(reloaded.get_all()), 1)
+        self.assertEqual(reloaded.get_by_id("B1").title, "Altorių šešėly")
+        self.assertEqual(len(reloaded.search("putinas")), 1)
+
+    def test_borrow_persists_loan_rows(self):
+        service = LoanService(self.books, self.users)
+        success, _ = service.borrow_book("ON0001", "B1")
+        self.assertTrue(success)
+
+        books = SqliteBookRepository(self.db_file)
+        users = SqliteUserRepository(self.db_file)
+        self.assertEqual(books.get_by_id("B1").available_copies, 1)
+        loans = users.get_by_id("ON0001").active_loans
+        self.assertEqual(len(loans), 1)
+        self.assertEqual(loans[0]['title'], "Altorių šešėly")
+
+        service = LoanService(books, users)
+        success, _ = service.return_book("ON0001", "B1")
+        self.assertTrue(success)
+        self.assertEqual(SqliteUserRepository(self.db_file).get_by_id("ON0001").active_loans, [])
+
+    def test_save_writes_only_changed_rows(self):
+        extra = [Book(f"Knyga {i}", "Autorius", 2000, "Žanras", id=f"X{i}") for i in range(20)]
+        self.books.books = self.books.books + extra
+        self.books.save()
+
+        # Trigeris užfiksuoja kiekvieną į 'books' įrašytą eilutę
+        conn = sqlite3.connect(self.db_file)
+        conn.execute("CREATE TABLE writes (id TEXT)")
+        conn.execute("CREATE TRIGGER count_writes AFTER INSERT ON books "
+                     "BEGIN INSERT INTO writes VALUES (NEW.id); END")
+        conn.commit()
+        conn.close()
+
+        self.books.update(self.books.get_by_id("X3"), available_copies=0) # update() išsaugo
+
+        conn = sqlite3.connect(self.db_file)
+        written = [row[0] for row in conn.execute("SELECT id FROM writes")]
+        conn.close()
+        self.assertEqual(written, ["X3"])
+        self.assertEqual(SqliteBookRepository(self.db_file).get_by_id("X3").available_copies, 0)
+
+    def test_user_changes_are_tracked_by_id(self):
+        from src.models import Librarian
+        admin = Librarian("admin", "librarian", id="LIB1", password="senas")
+        self.users.add(admin)
+        self.users.add(Reader("Jonas", "reader", id="JO0002"))
+        self.users.set_password(admin, "naujas")
+        self.users.change_id(self.reader, "ON0009")
+        self.assertFalse(self.users._changed_ids or self.users._removed_ids)
+
+        reloaded = SqliteUserRepository(self.db_file)
+        self.assertEqual(reloaded.get_by_id("LIB1").password, "naujas")
+        self.assertIsNone(reloaded.get_by_id("ON0001"))
+        self.assertEqual(reloaded.get_by_id("ON0009").username, "Ona")
+        self.assertEqual(len(reloaded.get_all()), 3)
+
+        # Visas sąrašas pakeistas (RESET) -> lentelės perrašomos visos
+        reloaded.users = [user for user in reloaded.users if user.id != "JO0002"]
+        reloaded.save()
+        self.assertEqual(sorted(u.id for u in SqliteUserRepository(self.db_file).get_all()),
+                         ["LIB1", "ON0009"])
+
+    def test_locked_database_keeps_changes_for_next_save(self):
+        locked = sqlite3.OperationalError("database is locked")
+        book = Book("Metai", "K. Donelaitis", 1818, "Poema", id="B2")
+        reader = Reader("Jonas", "reader", id="JO0002")
+        with patch.object(database, 'bulk_upsert', side_effect=locked), \
+             self.assertLogs('src.repositories.base_repository', level='ERROR'):
+            self.books.add(book) # Klaida neišeina pas kviečiantįjį
+            self.users.add(reader)
+        self.assertTrue(self.books.is_dirty)
+        self.assertTrue(self.users.is_dirty)
+        self.assertIsNone(SqliteBookRepository(self.db_file).get_by_id("B2"))
+
+        self.assertTrue(self.books.flush())
+        self.assertTrue(self.users.flush())
+        self.assertEqual(SqliteBookRepository(self.db_file).get_by_id("B2").title, "Metai")
+        self.assertIsNotNone(SqliteUserRepository(self.db_file).get_by_id("JO0002"))
+
+    def test_remove_deletes_row(self):
+        self.assertTrue(self.books.remove("B1"))
+        self.assertIsNone(SqliteBookRepository(self.db_file).get_by_id("B1"))
+
+    def test_pool_reuses_connection_per_thread_with_wal(self):
+        conn = database.connection(self.db_file)
+        self.assertIs(database.connection(self.db_file), conn)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+        other = []
+        worker = threading.Thread(target=lambda: other.append(database.connection(self.db_file)))
+        worker.start()
+        worker.join()
+        self.assertIsNot(other[0], conn) # Kita gija - kitas ryšys
+
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        for name in ("idx_loans_user_id", "idx_loans_book_id", "idx_loans_due_date",
+                     "idx_books_author", "idx_books_genre", "idx_books_year"):
+            self.assertIn(name, indexes)
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM loans WHERE user_id = ?", ("ON0001",)).fetchall()
+        self.assertIn("idx_loans_user_id", " ".join(row[-1] for row in plan))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Moduliai, kurių terminalo programai paleisti nereikia (lėti importai)
+HEAVY_MODULES = ('turtle', 'tkinter', 'pandas', 'plotly', 'streamlit', 'concurrent.futures.process')
+
+class TestStartup(unittest.TestCase):
+    def _import_main(self, code="import main"):
+        """Paleidžia 'import main' atskirame procese su -X importtime."""
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                                cwd=ROOT, capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        times = {} # modulis -> kaupiamasis importo laikas (mikrosekundėmis)
+        for line in result.stderr.splitlines():
+            if line.startswith("import time:") and "|" in line:
+                _, cumulative, name = line.split("|")
+                if cumulative.strip().isdigit():
+                    times[name.strip()] = int(cumulative)
+        return result.stdout, times
+
+    def test_import_is_light_and_reads_no_data(self):
+        log_file = os.path.join(ROOT, "src", "debug.log")
+        log_existed = os.path.exists(log_file)
+
+        stdout, times = self._import_main(
+            "import main; print(main.library.book_repository.is_loaded, "
+            "main.library.user_repository.is_loaded)")
+
+        self.assertIn("main", times)
+        self.assertEqual([m for m in HEAVY_MODULES if m in times], [])
+        # Duomenų failai neskaitomi, kol jų neprireikia
+        self.assertEqual(stdout.strip(), "False False")
+        if not log_existed:
+            self.assertFalse(os.path.exists(log_file), "Importas neturi kurti debug.log")
+        # Dosnus limitas (lėtoms CI mašinoms): dabar ~40 ms, anksčiau ~60 ms + failų skaitymas
+        self.assertLess(times["main"], 2_000_000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from src.models import Book, Reader
+from src.repositories.memory_repository import MemoryBookRepository, MemoryUserRepository
+from src.services.inventory_service import InventoryService
+from src.services.loan_service import LoanService
+from src.services.stats_service import StatsService
+
+class TestIncrementalStats(unittest.TestCase):
+    def setUp(self):
+        self.books = MemoryBookRepository()
+        self.users = MemoryUserRepository()
+
+        self.books.books = [
+            Book("Metai", "K. Donelaitis", 1818, "Poema", total_copies=2, available_copies=2, id="B1"),
+            Book("Dievų miškas", "B. Sruoga", 1957, "Romanas", id="B2"),
+        ]
+        self.users.users = [Reader("Jonas", "reader", id="JN0001")]
+        self.stats = StatsService(self.books, self.users)
+        self.loans = LoanService(self.books, self.users)
+
+    def test_aggregates_follow_repository_events(self):
+        self.loans.borrow_book("JN0001", "B2")
+        stats = self.stats.get_advanced_statistics()
+        self.assertEqual(stats['borrowed_top_genre'], "Romanas (1 skolinimai)")
+        self.assertEqual((stats['total_copies'], stats['available_copies']), (3, 2))
+
+        InventoryService(self.books).add_book("Metai", "K. Donelaitis", 1818, "Poema")
+        self.books.update(self.books.get_by_id("B2"), genre="Drama")
+        self.books.add(Book("Eglė žalčių karalienė", "S. Nėris", 1940, "Poema", id="B3"))
+        stats = self.stats.get_advanced_statistics()
+        self.assertEqual(stats['inventory_top_genre'], "Poema (2 vnt.)")
+        self.assertEqual(stats['borrowed_top_genre'], "Drama (1 skolinimai)")
+        self.assertEqual(stats['avg_book_year'], "1905 metai")
+
+        self.loans.return_book("JN0001", "B2")
+        self.books.remove_without_save("B1")
+        self.assertTrue(self.stats.check_consistency())
+        self.assertEqual(self.stats.get_advanced_statistics()['borrowed_top_genre'],
+                         "Nėra aktyvių skolinimų")
+
+    def test_consistency_check_repairs_direct_changes(self):
+        # Pakeitimas, apeinantis repozitoriją - suvestinės to nemato
+        self.books.get_by_id("B1").available_copies = 0
+        self.assertFalse(self.stats.check_consistency())
+        self.assertEqual(self.stats.get_advanced_statistics()['available_copies'], 1)
+        self.assertTrue(self.stats.check_consistency())
+
+if __name__ == '__main__':
+    unittest.main()